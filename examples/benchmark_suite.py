@@ -0,0 +1,340 @@
+"""
+pyrtcm Performance benchmark suite
+
+Reports throughput and memory allocation per message type and per
+processing stage (framing, CRC, decode, str, repr, parse_msm), with
+optional JSON output for regression tracking.
+
+The benchmark corpus comprises the sample messages from benchmark.py,
+plus synthetic messages generated using `encode_payload()` for every
+other message type which pyrtcm can decode (legacy observations,
+ephemerides, MSM1-7 for each constellation, SSR, IGS 4076 etc.).
+Runs entirely offline.
+
+Usage (kwargs optional):
+
+python3 benchmark_suite.py cycles=200 types=MSM,SSR output=bench.json baseline=prev.json
+
+- cycles: number of times each stage is repeated for each message type (200)
+- types: comma-separated list of message categories or identities to include (all)
+- output: path of JSON results file (None)
+- baseline: path of previous JSON results file to compare against (None)
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: semuadmin © 2026
+:license: BSD 3-Clause
+"""
+
+# pylint: disable=invalid-name
+
+import json
+import tracemalloc
+from io import BytesIO
+from platform import python_version
+from platform import version as osver
+from sys import argv
+from time import perf_counter_ns
+
+from benchmark import RTCMMESSAGES
+
+from pyrtcm import (
+    RTCM_MSGIDS,
+    RTCMMessage,
+    RTCMReader,
+    calc_crc24q,
+    encode_payload,
+    parse_msm,
+)
+from pyrtcm._version import __version__ as rtcmver
+from pyrtcm.exceptions import RTCMMessageError, RTCMTypeError
+from pyrtcm.rtcmplan import OP_COND, OP_FIELD, get_plan
+
+SYNTHETIC_GROUP_SIZE = 8
+"""Size of repeating groups in synthetic messages"""
+
+SYNTHETIC_MSM_MASKS = {
+    "DF394": 0b1011011101 << 54,  # 7 satellites
+    "DF395": 0b101 << 29,  # 2 signals
+    "DF396": 0b11111111111101,  # 13 cells
+}
+"""Masks of synthetic MSM messages"""
+
+
+def category(identity: str) -> str:
+    """
+    Get benchmark category of message type.
+
+    :param str identity: message identity
+    :return: category
+    :rtype: str
+    """
+
+    num = int(identity[0:4])
+    if 1001 <= num <= 1012:
+        return "LEGACY"
+    if num in (1019, 1020, 1041, 1042, 1044, 1045, 1046):
+        return "EPHEMERIS"
+    if "MSM" in RTCM_MSGIDS.get(identity, ""):
+        return "MSM"
+    if 1057 <= num <= 1068 or 1240 <= num <= 1264:
+        return "SSR"
+    if num == 4076:
+        return "IGS"
+    return "OTHER"
+
+
+def synthetic_payload(identity: str) -> bytes:
+    """
+    Generate synthetic message payload, with non-empty top-level
+    repeating groups and MSM masks.
+
+    :param str identity: message identity
+    :return: payload
+    :rtype: bytes
+    :raises: RTCMTypeError if message definition is invalid
+    """
+
+    kwargs = {**SYNTHETIC_MSM_MASKS}
+    for op in get_plan(identity):
+        if op[0] not in (OP_FIELD, OP_COND) and isinstance(op[2], str):
+            kwargs.setdefault(op[2].split("+")[0], SYNTHETIC_GROUP_SIZE)
+    return encode_payload(identity, **kwargs)
+
+
+def build_corpus(types: set = None) -> dict:
+    """
+    Build benchmark corpus of raw frames for each message type.
+
+    :param set types: message categories or identities to include (None = all)
+    :return: dict of {identity: list of raw frames}
+    :rtype: dict
+    """
+
+    corpus = {}
+    for raw, parsed in RTCMReader(BytesIO(b"".join(RTCMMESSAGES))):
+        corpus.setdefault(parsed.identity, []).append(raw)
+    for identity in RTCM_MSGIDS:
+        idn = "4076_201" if identity == "4076" else identity
+        if idn in corpus:
+            continue
+        try:
+            if get_plan(idn) is None:
+                continue
+            corpus[idn] = [RTCMMessage(payload=synthetic_payload(idn)).serialize()]
+        except (RTCMMessageError, RTCMTypeError):  # e.g. invalid definition
+            continue
+    if types:
+        corpus = {
+            idn: frames
+            for idn, frames in corpus.items()
+            if idn in types or category(idn) in types
+        }
+    return dict(sorted(corpus.items()))
+
+
+def stage_functions(frames: list) -> dict:
+    """
+    Get function implementing each stage for list of frames.
+
+    :param list frames: raw frames
+    :return: dict of {stage: function}
+    :rtype: dict
+    """
+
+    data = b"".join(frames)
+    payloads = [raw[3:-3] for raw in frames]
+    msgs = [RTCMMessage(payload=payload) for payload in payloads]
+
+    def framing():
+        return list(RTCMReader(BytesIO(data), parsed=False))
+
+    def crc():
+        return [calc_crc24q(raw) for raw in frames]
+
+    def decode():
+        return [RTCMMessage(payload=payload) for payload in payloads]
+
+    def strs():
+        return [str(msg) for msg in msgs]
+
+    def reprs():
+        return [repr(msg) for msg in msgs]
+
+    def msm():
+        return [parse_msm(msg) for msg in msgs]
+
+    funcs = {
+        "framing": framing,
+        "crc": crc,
+        "decode": decode,
+        "str": strs,
+        "repr": reprs,
+    }
+    if msgs[0].ismsm:
+        funcs["parse_msm"] = msm
+    return funcs
+
+
+def measure(func: object, nmsgs: int, cycles: int) -> dict:
+    """
+    Measure throughput and memory allocation of stage function.
+
+    Time is measured without tracing. Allocation is then measured with
+    `tracemalloc` for a single call, as both the peak and the retained
+    (i.e. still referenced by the result) memory allocated per message.
+
+    :param object func: stage function
+    :param int nmsgs: number of messages processed by each call
+    :param int cycles: number of timed calls
+    :return: dict of results
+    :rtype: dict
+    """
+
+    func()  # warm up any caches
+    start = perf_counter_ns()
+    for _ in range(cycles):
+        func()
+    duration = perf_counter_ns() - start
+
+    tracemalloc.start()
+    base = tracemalloc.get_traced_memory()[0]
+    res = func()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del res
+
+    return {
+        "msgs_per_sec": round(nmsgs * cycles * 1e9 / duration, 1),
+        "ns_per_msg": round(duration / (nmsgs * cycles), 1),
+        "peak_bytes_per_msg": round((peak - base) / nmsgs),
+        "retained_bytes_per_msg": round((current - base) / nmsgs),
+    }
+
+
+def benchmark(**kwargs) -> dict:
+    """
+    Run benchmark suite.
+
+    :param int cycles: (kwarg) number of repetitions of each stage (200)
+    :param str types: (kwarg) comma-separated categories or identities (all)
+    :param str output: (kwarg) path of JSON results file (None)
+    :param str baseline: (kwarg) path of JSON baseline results file (None)
+    :return: results
+    :rtype: dict
+    """
+
+    cycles = int(kwargs.get("cycles", 200))
+    types = kwargs.get("types", None)
+    types = set(types.upper().split(",")) if types else None
+    corpus = build_corpus(types)
+
+    results = {
+        "pyrtcm": rtcmver,
+        "python": python_version(),
+        "os": osver(),
+        "cycles": cycles,
+        "types": {},
+        "categories": {},
+    }
+    print(
+        f"\nOperating system: {results['os']}",
+        f"\nPython version: {results['python']}",
+        f"\npyrtcm version: {rtcmver}",
+        f"\nTest cycles: {cycles:,}",
+        f"\nMessage types: {len(corpus):,}\n",
+    )
+
+    for identity, frames in corpus.items():
+        cat = category(identity)
+        res = {
+            "category": cat,
+            "bytes_per_msg": round(sum(len(f) for f in frames) / len(frames)),
+            "stages": {},
+        }
+        for stage, func in stage_functions(frames).items():
+            res["stages"][stage] = measure(func, len(frames), cycles)
+            # accumulate per category time per message
+            catres = results["categories"].setdefault(cat, {})
+            catres.setdefault(stage, []).append(res["stages"][stage]["ns_per_msg"])
+        results["types"][identity] = res
+        print(_format_row(identity, res))
+
+    for cat, stages in results["categories"].items():
+        results["categories"][cat] = {
+            stage: round(sum(vals) / len(vals), 1) for stage, vals in stages.items()
+        }
+    print("\nMean ns per message by category:")
+    for cat, stages in results["categories"].items():
+        print(
+            f"{cat:<10}"
+            + "".join(f"{stage}={val:,.0f} " for stage, val in stages.items())
+        )
+
+    baseline = kwargs.get("baseline", None)
+    if baseline is not None:
+        with open(baseline, "r", encoding="utf-8") as infile:
+            compare(json.load(infile), results)
+
+    output = kwargs.get("output", None)
+    if output is not None:
+        with open(output, "w", encoding="utf-8") as outfile:
+            json.dump(results, outfile, indent=2)
+        print(f"\nResults written to {output}")
+
+    return results
+
+
+def compare(baseline: dict, results: dict):
+    """
+    Print percentage change in time per message from baseline results,
+    for each message type and stage present in both.
+
+    :param dict baseline: baseline results
+    :param dict results: current results
+    """
+
+    print(f"\nChange in ns per message from baseline (pyrtcm {baseline['pyrtcm']}):")
+    for identity, res in results["types"].items():
+        base = baseline["types"].get(identity, {}).get("stages", {})
+        changes = []
+        for stage, vals in res["stages"].items():
+            if stage in base:
+                old = base[stage]["ns_per_msg"]
+                changes.append(
+                    f"{stage}={(vals['ns_per_msg'] - old) * 100 / old:+.1f}%"
+                )
+        if changes:
+            print(f"{identity:<9}" + " ".join(changes))
+
+
+def _format_row(identity: str, res: dict) -> str:
+    """
+    Format results for message type as console output row.
+
+    :param str identity: message identity
+    :param dict res: results
+    :return: formatted row
+    :rtype: str
+    """
+
+    stages = " ".join(
+        f"{stage}={vals['ns_per_msg']:,.0f}ns/{vals['peak_bytes_per_msg']:,}B"
+        for stage, vals in res["stages"].items()
+    )
+    return f"{identity:<9}{res['category']:<10}{res['bytes_per_msg']:>5}B  {stages}"
+
+
+def main():
+    """
+    CLI Entry point.
+
+    args as benchmark() method
+    """
+
+    benchmark(**dict(arg.split("=") for arg in argv[1:]))
+
+
+if __name__ == "__main__":
+    main()
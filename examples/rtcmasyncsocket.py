@@ -0,0 +1,49 @@
+"""
+rtcmasyncsocket.py
+
+A simple example implementation of a GNSS socket reader
+which reads RTCM3 data from several sockets concurrently in
+a single asyncio event loop, using the pyrtcm.AsyncRTCMReader
+asynchronous iterator functions.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: semuadmin © 2026
+:license: BSD 3-Clause
+"""
+
+import asyncio
+
+from pyrtcm import AsyncRTCMReader
+
+
+async def read(server: str, port: int):
+    """
+    Reads and parses RTCM3 message data from socket stream.
+    """
+
+    reader, writer = await asyncio.open_connection(server, port)
+    try:
+        async for _, parsed_data in AsyncRTCMReader(reader):
+            print(f"{server}:{port} {parsed_data}")
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def main(sources: list):
+    """
+    Reads from all sources concurrently.
+    """
+
+    await asyncio.gather(*(read(server, port) for server, port in sources))
+
+
+if __name__ == "__main__":
+    SOURCES = [("192.168.0.72", 50007), ("192.168.0.73", 50007)]
+
+    try:
+        asyncio.run(main(SOURCES))
+    except KeyboardInterrupt:
+        print("Session terminated by user")
@@ -16,9 +16,21 @@ from pyrtcm.exceptions import (
     RTCMStreamError,
     RTCMTypeError,
 )
+from pyrtcm.rtcmarrays import msm_observables, parse_msm_array, parse_msm_batch
+from pyrtcm.rtcmasyncreader import AsyncRTCMReader
+from pyrtcm.rtcmcache import DEFAULT_CACHE_IDENTITIES, RTCMMessageCache
+from pyrtcm.rtcmencoder import encode_payload
+from pyrtcm.rtcmephemeris import RTCMEphemerisStore
+from pyrtcm.rtcmepoch import MSMEpoch, RTCMEpochAssembler
+from pyrtcm.rtcmfileparser import RTCMFileParser
 from pyrtcm.rtcmhelpers import *
+from pyrtcm.rtcmmappedreader import RTCMMappedReader
 from pyrtcm.rtcmmessage import RTCMMessage
+from pyrtcm.rtcmmultireader import RTCMMultiReader
 from pyrtcm.rtcmreader import RTCMReader
+from pyrtcm.rtcmrinex import RINEXObsWriter
+from pyrtcm.rtcmscanner import RTCMScanner
+from pyrtcm.rtcmstatistics import RTCMStatistics
 from pyrtcm.rtcmtypes_core import *
 from pyrtcm.rtcmtypes_get import *
 from pyrtcm.rtcmtypes_get_igs import *
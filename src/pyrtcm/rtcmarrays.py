@@ -0,0 +1,485 @@
+"""
+Columnar decoding of RTCM3 MSM messages into NumPy arrays.
+
+MSM satellite and cell data fields (DF397 - DF420, PRN and signal ID)
+are extracted directly from the payload bits into typed NumPy arrays,
+without populating individual `RTCMMessage` attributes. Full MSM4-7
+observables can then be reconstructed from these arrays using
+vectorised array operations.
+
+NumPy is an optional dependency which must be installed separately
+e.g. ``python3 -m pip install numpy``.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: semuadmin © 2026
+:license: BSD 3-Clause
+"""
+
+from pyrtcm.exceptions import RTCMTypeError
+from pyrtcm.rtcmhelpers import get_identity, get_satcellmaps
+from pyrtcm.rtcmplan import (
+    OP_FIELD,
+    OP_GROUP,
+    S_CELLMASK,
+    S_SATMASK,
+    S_SIGMASK,
+    T_CELPRN,
+    T_CELSIG,
+    T_INT,
+    T_INTS,
+    T_PRN,
+    get_plan,
+)
+from pyrtcm.rtcmtables import (
+    CLIGHT,
+    FREQMAP,
+    MSM_INVALID_FINEPH,
+    MSM_INVALID_FINEPR,
+    MSM_INVALID_FINERATE,
+    MSM_INVALID_RATE,
+    MSM_INVALID_ROUGH,
+    PRNSIGMAP,
+)
+from pyrtcm.rtcmtypes_core import GNSSMAP, NA, NCELL, NSAT, RTCM_MSGIDS
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover
+    np = None
+
+MSM_COLUMNS = {}
+"""Cache of MSM column specifications keyed on message identity"""
+
+STR_WIDTH = max(
+    len(label)
+    for prnmap, sigmap in PRNSIGMAP.values()
+    for label in (
+        NA,
+        *prnmap.values(),
+        *(sig for sigs in sigmap.values() for sig in sigs),
+    )
+)
+"""Length of longest PRN or signal ID label (e.g. GIOVE-A)"""
+STR_DTYPE = f"U{STR_WIDTH}"
+"""NumPy dtype of PRN and signal ID columns"""
+INT_DTYPE = "i8"
+"""NumPy dtype of unscaled integer columns"""
+FLOAT_DTYPE = "f8"
+"""NumPy dtype of scaled columns"""
+
+FILL_VALUES = {STR_DTYPE: "", INT_DTYPE: -1, FLOAT_DTYPE: float("nan")}
+"""Batch fill values for columns absent from individual message types"""
+
+BATCH_KEYS = ("identity", "station", "epoch")
+"""Additional fields identifying the source message of batch array rows"""
+
+OBSERVABLES = (
+    "pseudorange",
+    "phaserange",
+    "phaserangerate",
+    "carrierphase",
+    "doppler",
+    "frequency",
+)
+"""Fields of observables array, in addition to CELLPRN, CELLSIG and any batch keys"""
+
+
+def _get_columns(identity: str) -> tuple:
+    """
+    Get MSM column specification for message identity, deriving it
+    from the compiled decode plan and caching it on first use.
+
+    The specification comprises a list of header attributes, followed by
+    lists of satellite and cell columns, each attribute or column being a
+    tuple of (name, type, size, scale, msb, special).
+
+    :param str identity: MSM message identity e.g. "1077"
+    :return: tuple of (header attributes, satellite columns, cell columns)
+    :rtype: tuple
+    :raises: RTCMTypeError if payload definition is invalid
+    """
+
+    try:
+        return MSM_COLUMNS[identity]
+    except KeyError:
+        hdr, sats, cells = [], [], []
+        for op in get_plan(identity):
+            if op[0] == OP_FIELD:
+                hdr.append((op[1], *op[2:7]))
+            else:  # OP_GROUP or OP_RUN
+                cols = sats if op[2] == NSAT else cells
+                for gop in op[5] if op[0] == OP_GROUP else (op[5],):
+                    cols.append((gop[1], *gop[2:7]))
+        MSM_COLUMNS[identity] = (hdr, sats, cells)
+        return hdr, sats, cells
+
+
+def _dtype(typ: int, scale: float) -> str:
+    """
+    Get NumPy dtype for column.
+
+    :param int typ: plan type code
+    :param float scale: scaling factor (0 = unscaled)
+    :return: dtype string
+    :rtype: str
+    """
+
+    if typ in (T_PRN, T_CELPRN, T_CELSIG):
+        return STR_DTYPE
+    return FLOAT_DTYPE if scale else INT_DTYPE
+
+
+def _column(
+    bits: object, offset: int, num: int, typ: int, asiz: int, scale: float, msb: int
+) -> object:
+    """
+    Extract column of fixed-width values from payload bit array.
+
+    :param numpy.ndarray bits: payload as array of bits
+    :param int offset: offset of first value in bits
+    :param int num: number of values
+    :param int typ: plan type code
+    :param int asiz: size of each value in bits
+    :param float scale: scaling factor (0 = unscaled)
+    :param int msb: most significant (sign) bit of signed values
+    :return: column values
+    :rtype: numpy.ndarray
+    """
+
+    weights = np.left_shift(1, np.arange(asiz - 1, -1, -1, dtype=np.int64))
+    vals = bits[offset : offset + num * asiz].reshape(num, asiz) @ weights
+    if typ == T_INT:  # 2's complement int
+        vals = vals - ((vals & msb) << 1)
+    elif typ == T_INTS:  # int, MSB indicates sign
+        vals = np.where(vals & msb, -(vals & (msb - 1)), vals & (msb - 1))
+    if scale:  # apply any scaling factor
+        vals = vals * scale
+    return vals
+
+
+def parse_msm_array(payload: object, labelmsm: int = 1) -> tuple:
+    """
+    Decode MSM message payload directly into NumPy structured arrays
+    of satellite and cell data.
+
+    Satellite array fields are PRN plus (depending on MSM type) DF397,
+    ExtSatInfo or DF419, DF398 and DF399. Cell array fields are CELLPRN,
+    CELLSIG plus (depending on MSM type) DF400 - DF408 and DF420. Scaled
+    fields are float64; unscaled fields are int64.
+
+    :param object payload: MSM message payload as bytes, or RTCMMessage
+    :param int labelmsm: MSM signal label (1 = RINEX, 2 = freq)
+    :return: tuple of (metadata as dict, satellite data, cell data) \
+        or None if message is not MSM
+    :rtype: tuple
+    :raises: RTCMTypeError if payload cannot be decoded
+    :raises: ImportError if NumPy is not installed
+    """
+
+    # pylint: disable=too-many-locals
+
+    if np is None:  # pragma: no cover
+        raise ImportError("parse_msm_array requires NumPy - pip install numpy")
+    payload = getattr(payload, "payload", payload)
+    identity = get_identity(payload)
+    if "MSM" not in RTCM_MSGIDS.get(identity, ""):
+        return None
+    hdr, satcols, cellcols = _get_columns(identity)
+    payblen = len(payload) * 8
+
+    # decode header attributes up to and including cell mask
+    meta = {}
+    offset = 0
+    payloadi = int.from_bytes(payload, "big")
+    for anam, _, asiz, _, _, special in hdr:
+        if special == S_CELLMASK:  # variable length
+            asiz = meta[NSAT] * meta["NSig"]
+        if offset + asiz > payblen:
+            raise RTCMTypeError(
+                f"Error processing attribute '{anam}' in message type {identity} "
+                f"payload too short ({len(payload)} bytes)"
+            )
+        meta[anam] = payloadi >> (payblen - offset - asiz) & ((1 << asiz) - 1)
+        offset += asiz
+        if special == S_SATMASK:
+            meta[NSAT] = meta[anam].bit_count()
+        elif special == S_SIGMASK:
+            meta["NSig"] = meta[anam].bit_count()
+        elif special == S_CELLMASK:
+            meta[NCELL] = meta[anam].bit_count()
+    nsat, ncell = meta[NSAT], meta[NCELL]
+    satmap, cellmap = get_satcellmaps(
+        identity, meta["DF394"], meta["DF395"], meta["DF396"], labelmsm
+    )
+
+    # check payload is long enough for all satellite and cell columns
+    datalen = sum(c[2] for c in satcols) * nsat + sum(c[2] for c in cellcols) * ncell
+    if offset + datalen > payblen:
+        raise RTCMTypeError(
+            f"Error processing attribute 'DF396' in message type {identity} "
+            f"payload too short ({len(payload)} bytes)"
+        )
+    bits = np.unpackbits(np.frombuffer(payload, dtype=np.uint8))
+
+    arrays = []
+    for cols, num in ((satcols, nsat), (cellcols, ncell)):
+        dtype = [(c[0], _dtype(c[1], c[3])) for c in cols]
+        arr = np.empty(num, dtype=dtype)
+        for anam, typ, asiz, scale, msb, _ in cols:
+            if typ == T_PRN:
+                arr[anam] = list(satmap.values())
+            elif typ == T_CELPRN:
+                arr[anam] = [c[0] for c in cellmap.values()]
+            elif typ == T_CELSIG:
+                arr[anam] = [c[1] for c in cellmap.values()]
+            else:
+                arr[anam] = _column(bits, offset, num, typ, asiz, scale, msb)
+                offset += num * asiz
+        arrays.append(arr)
+
+    gmap = GNSSMAP[identity[0:3]]
+    meta = {
+        "identity": identity,
+        "gnss": gmap[0],
+        "station": meta["DF003"],
+        "epoch": meta[gmap[1]],
+        "sats": nsat,
+        "cells": ncell,
+    }
+    return meta, arrays[0], arrays[1]
+
+
+def parse_msm_batch(payloads: object, labelmsm: int = 1) -> tuple:
+    """
+    Decode sequence of MSM message payloads (e.g. successive epochs from
+    one or more stations) into single stacked NumPy structured arrays of
+    satellite and cell data, each with additional 'identity', 'station'
+    and 'epoch' fields. Non-MSM payloads are ignored.
+
+    Fields which are absent from individual message types are filled
+    with NaN (float64), -1 (int64) or "" (string).
+
+    :param object payloads: iterable of MSM message payloads as bytes, or RTCMMessages
+    :param int labelmsm: MSM signal label (1 = RINEX, 2 = freq)
+    :return: tuple of (satellite data, cell data)
+    :rtype: tuple
+    :raises: RTCMTypeError if any payload cannot be decoded
+    :raises: ImportError if NumPy is not installed
+    """
+
+    results = []
+    for payload in payloads:
+        res = parse_msm_array(payload, labelmsm)
+        if res is not None:
+            results.append(res)
+
+    stacked = []
+    for i in (1, 2):  # satellite, cell arrays
+        dtype = {"identity": "U4", "station": INT_DTYPE, "epoch": INT_DTYPE}
+        for res in results:  # union of fields in order of appearance
+            for name in res[i].dtype.names:
+                dtype.setdefault(name, res[i].dtype[name].str[1:])
+        out = np.empty(sum(len(res[i]) for res in results), dtype=list(dtype.items()))
+        for name, dtyp in dtype.items():
+            out[name] = FILL_VALUES.get(dtyp, "")
+        start = 0
+        for meta, *arrs in results:
+            arr = arrs[i - 1]
+            end = start + len(arr)
+            for name in ("identity", "station", "epoch"):
+                out[name][start:end] = meta[name]
+            for name in arr.dtype.names:
+                out[name][start:end] = arr[name]
+            start = end
+        stacked.append(out)
+
+    return stacked[0], stacked[1]
+
+
+def _float_column(arr: object, name: str) -> object:
+    """
+    Get column as float64, or NaN if the column is absent.
+
+    :param numpy.ndarray arr: structured array
+    :param str name: column name
+    :return: column values
+    :rtype: numpy.ndarray
+    """
+
+    if name in arr.dtype.names:
+        return arr[name].astype(FLOAT_DTYPE)
+    return np.full(len(arr), np.nan)
+
+
+def _str_codes(arr: object) -> object:
+    """
+    Get unique integer code for each value of a fixed-width (up to 9
+    character) ASCII string column, for fast sorting and comparison.
+
+    :param numpy.ndarray arr: string column
+    :return: codes
+    :rtype: numpy.ndarray
+    """
+
+    chars = np.ascontiguousarray(arr).view(np.uint32).reshape(len(arr), -1)
+    weights = np.left_shift(1, np.arange(7 * chars.shape[1] - 7, -1, -7))
+    return chars.astype(INT_DTYPE) @ weights
+
+
+def _sat_index(sats: object, cells: object) -> object:
+    """
+    Get index of satellite array row corresponding to each cell array row,
+    matching on PRN and any batch keys.
+
+    Satellite and cell rows are sorted together on these keys, with each
+    satellite row preceding its cells, so each cell's satellite is the
+    most recent satellite row in sorted order.
+
+    :param numpy.ndarray sats: satellite array
+    :param numpy.ndarray cells: cell array
+    :return: satellite index of each cell
+    :rtype: numpy.ndarray
+    """
+
+    nsat = len(sats)
+    flags = (np.zeros(nsat, INT_DTYPE), np.ones(len(cells), INT_DTYPE))
+    keys = [np.concatenate(flags)]  # satellite rows precede cell rows
+    keys.append(_str_codes(np.concatenate((sats["PRN"], cells["CELLPRN"]))))
+    for name in BATCH_KEYS[::-1]:
+        if name in sats.dtype.names:
+            vals = np.concatenate((sats[name], cells[name]))
+            keys.append(_str_codes(vals) if name == "identity" else vals)
+    order = np.lexsort(keys)
+    cellpos = order >= nsat
+    # sorted position of most recent satellite row at each sorted position
+    latest = np.maximum.accumulate(np.where(cellpos, 0, np.arange(len(order))))
+    satidx = np.empty(len(cells), dtype=INT_DTYPE)
+    satidx[order[cellpos] - nsat] = order[latest[cellpos]]
+    return satidx
+
+
+def _frequencies(gnss: object, sats: object, cells: object, glofcn: dict) -> object:
+    """
+    Get carrier frequency of each cell array row. GLONASS frequency channel
+    numbers are taken from any valid DF419 (MSM5/7) for the same slot in the
+    satellite array, or else from glofcn.
+
+    :param numpy.ndarray gnss: identity prefix of each cell e.g. "107"
+    :param numpy.ndarray sats: satellite array
+    :param numpy.ndarray cells: cell array
+    :param dict glofcn: GLONASS frequency channel numbers keyed on slot
+    :return: frequency in Hz (NaN if unknown)
+    :rtype: numpy.ndarray
+    """
+
+    _, gnssidx = np.unique(gnss, return_inverse=True)
+    codes = gnssidx.reshape(-1) << 7 * STR_WIDTH | _str_codes(cells["CELLSIG"])
+    _, first, inv = np.unique(codes, return_index=True, return_inverse=True)
+    bases = np.full(len(first), np.nan)
+    steps = np.zeros(len(first))
+    for i, row in enumerate(first.tolist()):
+        freq = FREQMAP.get(str(gnss[row]), {}).get(str(cells["CELLSIG"][row])[0:1])
+        if isinstance(freq, tuple):  # GLONASS FDMA
+            bases[i], steps[i] = freq
+        elif freq is not None:
+            bases[i] = freq
+    inv = inv.reshape(-1)
+    bases, steps = bases[inv], steps[inv]
+    fdma = steps > 0
+    if not fdma.any():
+        return bases
+
+    fcns = {}
+    if glofcn:
+        fcns.update({f"{slot:03d}": fcn for slot, fcn in glofcn.items()})
+    if "DF419" in sats.dtype.names:
+        valid = (sats["DF419"] >= 0) & (sats["DF419"] <= 13)
+        fcns.update(zip(sats["PRN"][valid].tolist(), sats["DF419"][valid] - 7))
+    uniq, inv = np.unique(cells["CELLPRN"][fdma], return_inverse=True)
+    fcn = np.array([fcns.get(prn, np.nan) for prn in uniq.tolist()])
+    bases[fdma] += fcn[inv.reshape(-1)] * steps[fdma]
+    return bases
+
+
+def msm_observables(msm: object, glofcn: dict = None) -> object:
+    """
+    Reconstruct full MSM4-7 observables for each cell (satellite and
+    signal) from decoded MSM satellite and cell arrays, using vectorised
+    array operations.
+
+    The satellite rough range (DF397 + DF398) and rough phase range rate
+    (DF399) are combined with the cell fine pseudorange (DF400 or DF405),
+    fine phase range (DF401 or DF406) and fine phase range rate (DF404).
+    Observables which are invalid (according to the MSM invalid value
+    indicators) or not present in the message type are set to NaN.
+
+    Output fields are CELLPRN, CELLSIG, any batch keys ('identity',
+    'station', 'epoch'), 'pseudorange' (m), 'phaserange' (m),
+    'phaserangerate' (m/s), 'carrierphase' (cycles), 'doppler' (Hz) and
+    carrier 'frequency' (Hz). Carrier phase and Doppler require RINEX
+    signal labels (labelmsm=1) and, for GLONASS, the satellite frequency
+    channel number, which is taken from DF419 (MSM5/7) or `glofcn`.
+
+    :param object msm: MSM message payload as bytes, RTCMMessage, \
+        result of `parse_msm_array()` or result of `parse_msm_batch()`
+    :param dict glofcn: GLONASS frequency channel numbers (-7 to 6) \
+        keyed on slot number, for MSM4/6 (None)
+    :return: observables array, or None if message is not MSM
+    :rtype: numpy.ndarray
+    :raises: RTCMTypeError if payload cannot be decoded
+    :raises: ImportError if NumPy is not installed
+    """
+
+    # pylint: disable=too-many-locals
+
+    if not isinstance(msm, tuple):
+        msm = parse_msm_array(msm)
+        if msm is None:
+            return None
+    if len(msm) == 3:  # individual message
+        meta, sats, cells = msm
+        gnss = np.full(len(cells), meta["identity"][0:3])
+    else:  # batch
+        sats, cells = msm
+        gnss = cells["identity"].astype("U3")  # identity prefix
+    names = [name for name in BATCH_KEYS if name in cells.dtype.names]
+    obs = np.empty(
+        len(cells),
+        dtype=[("CELLPRN", STR_DTYPE), ("CELLSIG", STR_DTYPE)]
+        + [(name, cells.dtype[name]) for name in names]
+        + [(name, FLOAT_DTYPE) for name in OBSERVABLES],
+    )
+    if not len(cells):  # pylint: disable=use-implicit-booleaness-not-len
+        return obs
+    satidx = _sat_index(sats, cells)
+    freq = _frequencies(gnss, sats, cells, glofcn)
+
+    # satellite rough range (ms) and rough phase range rate (m/s)
+    rough = _float_column(sats, "DF397")
+    rough = np.where((rough >= 0) & (rough != MSM_INVALID_ROUGH), rough, np.nan)
+    rough = (rough + _float_column(sats, "DF398"))[satidx]
+    rate = _float_column(sats, "DF399")
+    rate = np.where(rate == MSM_INVALID_RATE, np.nan, rate)[satidx]
+
+    # cell fine values, from whichever of MSM4/5 or MSM6/7 fields is valid
+    fines = []
+    for invalids in (MSM_INVALID_FINEPR, MSM_INVALID_FINEPH):
+        fine = np.full(len(cells), np.nan)
+        for name, invalid in invalids.items():
+            vals = _float_column(cells, name)
+            fine = np.where(np.isnan(vals) | (vals == invalid), fine, vals)
+        fines.append(fine)
+    finerate = _float_column(cells, "DF404")
+    finerate = np.where(finerate == MSM_INVALID_FINERATE, np.nan, finerate)
+
+    for name in ["CELLPRN", "CELLSIG"] + names:
+        obs[name] = cells[name]
+    obs["pseudorange"] = (rough + fines[0]) * (CLIGHT / 1000)
+    obs["phaserange"] = (rough + fines[1]) * (CLIGHT / 1000)
+    obs["phaserangerate"] = rate + finerate
+    obs["carrierphase"] = obs["phaserange"] * freq / CLIGHT
+    obs["doppler"] = -obs["phaserangerate"] * freq / CLIGHT
+    obs["frequency"] = freq
+    return obs
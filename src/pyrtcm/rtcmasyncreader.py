@@ -0,0 +1,164 @@
+"""
+AsyncRTCMReader class.
+
+Reads and parses individual RTCM3 messages from any asyncio
+stream which supports an `async read(n) -> bytes` method returning
+up to n bytes (e.g. `asyncio.StreamReader`), allowing many streams
+to be read concurrently by a single event loop.
+
+Data read from the stream is fed to an `RTCMReader` with no datastream
+of its own, so frames are extracted, filtered, validated, parsed and
+recorded in any statistics by exactly the same code as `RTCMReader`.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: semuadmin © 2026
+:license: BSD 3-Clause
+"""
+
+from pyrtcm.rtcmreader import RTCMReader
+from pyrtcm.rtcmtypes_core import DEFAULT_READAHEAD, ERR_LOG, VALCKSUM
+
+
+class AsyncRTCMReader:
+    """
+    AsyncRTCMReader class.
+    """
+
+    def __init__(
+        self,
+        datastream,
+        validate: int = VALCKSUM,
+        quitonerror: int = ERR_LOG,
+        labelmsm: int = 1,
+        parsed: bool = True,
+        errorhandler: object = None,
+        readahead: int = DEFAULT_READAHEAD,
+        lazy: bool = False,
+        msgfilter: set = None,
+        fields: set = None,
+        cache: object = None,
+        statistics: object = None,
+    ):  # pylint: disable=too-many-arguments
+        """Constructor.
+
+        :param datastream stream: input data stream with `async read(n)` method
+        :param int validate: 0 = ignore invalid checksum, 1 = validate checksum (1)
+        :param int quitonerror: ERR_IGNORE (0) = ignore errors,  ERR_LOG (1) = log continue,
+            ERR_RAISE (2) = (re)raise (1)
+        :param int labelmsm: MSM NSAT and NCELL attribute label (1 = RINEX, 2 = freq)
+        :param bool parsed: 1 = return raw and parsed data, 0 = return only raw data \
+            (parsed = None) (1)
+        :param object errorhandler: error handling object or function (None)
+        :param int readahead: maximum number of bytes to read from the stream \
+            in each call; 0 = read only the bytes required (65536)
+        :param bool lazy: defer decoding of each message payload until one of its \
+            attributes is first accessed (False)
+        :param set msgfilter: set of message identities to be returned e.g. {"1005", "1077"}; \
+            frames of any other type are skipped without being parsed (None = all)
+        :param set fields: names of attributes to be decoded e.g. {"DF004", "DF405"}; \
+            all other attributes are skipped (None = all)
+        :param object cache: RTCMMessageCache (or other object with a compatible \
+            `parse()` method) used to parse messages (None)
+        :param object statistics: RTCMStatistics object in which to record stream \
+            statistics (None)
+        """
+
+        self._stream = datastream
+        self._readahead = readahead
+        self._reader = RTCMReader(
+            None,
+            validate=validate,
+            quitonerror=quitonerror,
+            labelmsm=labelmsm,
+            parsed=parsed,
+            errorhandler=errorhandler,
+            lazy=lazy,
+            msgfilter=msgfilter,
+            fields=fields,
+            cache=cache,
+            statistics=statistics,
+        )
+
+    def __aiter__(self):
+        """Asynchronous iterator."""
+
+        return self
+
+    async def __anext__(self) -> tuple:
+        """
+        Return next item in asynchronous iteration.
+
+        :return: tuple of (raw_data as bytes, parsed_data as RTCMMessage)
+        :rtype: tuple
+        :raises: StopAsyncIteration
+        """
+
+        raw_data, parsed_data = await self.read()
+        if raw_data is None and parsed_data is None:
+            raise StopAsyncIteration
+        return raw_data, parsed_data
+
+    async def read(self) -> tuple:
+        """
+        Read a single RTCM message from the stream buffer
+        and return both raw and parsed data.
+
+        'quitonerror' determines whether to raise, log or ignore parsing errors.
+
+        :return: tuple of (raw_data as bytes, parsed_data as RTCMMessage)
+        :rtype: tuple
+        :raises: RTCMStreamError (if unrecognised protocol in data stream)
+        """
+
+        return await self._read(False)
+
+    async def read_header(self) -> tuple:
+        """
+        Read a single RTCM message from the stream buffer
+        and return the raw data and message header only, without
+        parsing the payload.
+
+        'quitonerror' determines whether to raise, log or ignore parsing errors.
+
+        :return: tuple of (raw_data as bytes, header as tuple of \
+            (identity, station ID, epoch time) - see `RTCMReader.parse_header()`)
+        :rtype: tuple
+        :raises: RTCMStreamError (if unrecognised protocol in data stream)
+        """
+
+        return await self._read(True)
+
+    async def _read(self, header: bool) -> tuple:
+        """
+        Read next RTCM message of required type from the stream buffer,
+        awaiting data from the stream whenever more is needed.
+
+        :param bool header: return message header rather than parsed message
+        :return: tuple of (raw_data as bytes, parsed data or header)
+        :rtype: tuple
+        """
+
+        reader = self._reader
+        while True:
+            try:
+                return reader.read_header() if header else reader.read()
+            except BlockingIOError:  # feed reader more data
+                reader.feed(
+                    await self._stream.read(max(reader.needed, self._readahead))
+                )
+
+    @property
+    def datastream(self) -> object:
+        """
+        Getter for stream.
+
+        NB: the reader reads ahead from the stream, so any data which has
+        been read into the internal buffer will not be available on the stream.
+
+        :return: data stream
+        :rtype: object
+        """
+
+        return self._stream
@@ -0,0 +1,155 @@
+"""
+RTCMMessageCache class.
+
+Bounded cache of parsed RTCMMessage objects keyed on raw message bytes,
+for message types which are typically re-broadcast unchanged every few
+seconds (e.g. station coordinates, antenna descriptors and ephemerides).
+
+As RTCMMessage objects are immutable, a cached message can be returned
+for any subsequent identical frame without repeating the CRC check or
+payload decode. When the cache is full, the least recently used message
+is evicted.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: semuadmin © 2026
+:license: BSD 3-Clause
+"""
+
+from pyrtcm.rtcmhelpers import get_identity
+from pyrtcm.rtcmmessage import RTCMMessage
+from pyrtcm.rtcmreader import RTCMReader
+from pyrtcm.rtcmtypes_core import VALCKSUM
+
+DEFAULT_CACHE_IDENTITIES = frozenset(
+    (
+        "1005",
+        "1006",
+        "1007",
+        "1008",
+        "1033",
+        "1230",
+        "1019",
+        "1020",
+        "1041",
+        "1042",
+        "1044",
+        "1045",
+        "1046",
+    )
+)
+"""Message identities cached by default"""
+
+
+class RTCMMessageCache:
+    """
+    RTCMMessageCache class.
+    """
+
+    def __init__(self, maxsize: int = 256, identities: set = DEFAULT_CACHE_IDENTITIES):
+        """Constructor.
+
+        A single cache may be shared between any number of readers.
+
+        :param int maxsize: maximum number of messages cached (256)
+        :param set identities: message identities to be cached e.g. {"1005", "1033"} \
+            (DEFAULT_CACHE_IDENTITIES)
+        """
+
+        self._maxsize = maxsize
+        self._identities = frozenset(identities)
+        self._cache = {}  # messages keyed on (raw, validate, labelmsm, fields)
+        self._stats = {}  # [hits, misses] keyed on identity
+        self._evictions = 0
+
+    def __len__(self) -> int:
+        """
+        Number of messages cached.
+
+        :return: number of messages
+        :rtype: int
+        """
+
+        return len(self._cache)
+
+    def parse(
+        self,
+        message: bytes,
+        validate: int = VALCKSUM,
+        labelmsm: int = 1,
+        lazy: bool = False,
+        fields: set = None,
+    ) -> RTCMMessage:
+        """
+        Parse RTCM message to RTCMMessage object, returning the cached
+        object if an identical message has already been parsed with the
+        same arguments. Arguments are as for `RTCMReader.parse()`.
+
+        :param bytes message: RTCM raw message bytes
+        :param int validate: 0 = don't validate CRC, 1 = validate CRC (1)
+        :param int labelmsm: MSM NSAT and NCELL attribute label (1 = RINEX, 2 = freq)
+        :param bool lazy: defer decoding of payload until first attribute access (False)
+        :param set fields: names of attributes to be decoded (None = all)
+        :return: RTCMMessage object
+        :rtype: RTCMMessage
+        :raises: RTCMParseError (if data stream contains invalid data or unknown message type)
+        """
+
+        # pylint: disable=too-many-arguments, too-many-positional-arguments
+
+        identity = get_identity(message[3:-3])
+        if identity not in self._identities:
+            return RTCMReader.parse(message, validate, labelmsm, lazy, fields)
+        stats = self._stats.get(identity, None)
+        if stats is None:
+            stats = self._stats[identity] = [0, 0]
+        if fields is not None:
+            fields = frozenset(fields)
+        message = bytes(message)  # e.g. memoryview of mapped file
+        key = (message, validate & VALCKSUM, labelmsm, fields)
+        cache = self._cache
+        msg = cache.pop(key, None)
+        if msg is not None:  # move to most recently used
+            cache[key] = msg
+            stats[0] += 1
+            return msg
+
+        stats[1] += 1
+        msg = RTCMReader.parse(message, validate, labelmsm, lazy, fields)
+        cache[key] = msg
+        if len(cache) > self._maxsize:  # evict least recently used
+            del cache[next(iter(cache))]
+            self._evictions += 1
+        return msg
+
+    def clear(self):
+        """
+        Remove all cached messages and reset statistics.
+        """
+
+        self._cache = {}
+        self._stats = {}
+        self._evictions = 0
+
+    @property
+    def stats(self) -> dict:
+        """
+        Getter for cache statistics.
+
+        :return: dict of total hits, misses and evictions, current size, \
+            maximum size and hits and misses for each identity
+        :rtype: dict
+        """
+
+        return {
+            "hits": sum(s[0] for s in self._stats.values()),
+            "misses": sum(s[1] for s in self._stats.values()),
+            "evictions": self._evictions,
+            "size": len(self._cache),
+            "maxsize": self._maxsize,
+            "identities": {
+                identity: {"hits": hits, "misses": misses}
+                for identity, (hits, misses) in sorted(self._stats.items())
+            },
+        }
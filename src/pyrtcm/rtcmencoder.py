@@ -0,0 +1,263 @@
+"""
+RTCM3 message payload encoder.
+
+Encodes RTCM3 message payloads from individual attribute values
+(e.g. ``DF003=0``, ``DF405_01=0.000249``) by executing the same
+compiled payload plans (`rtcmplan.py`) used to decode them, in
+reverse. Values are inverse-scaled according to their `RTCM_DATA_FIELDS`
+resolution and packed as unsigned, 2's complement or sign-magnitude
+integers as appropriate.
+
+Repeating group sizes and conditional group outcomes are determined
+from the (encoded) values of the attributes which define them, exactly
+as when decoding. MSM satellite and cell group sizes are derived from
+the DF394, DF395 and DF396 masks; derived attributes such as NSat, NCell,
+PRN, CELLPRN and CELLSIG are ignored.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: semuadmin © 2026
+:license: BSD 3-Clause
+"""
+
+from pyrtcm.exceptions import RTCMMessageError, RTCMTypeError
+from pyrtcm.rtcmplan import (
+    OP_COND,
+    OP_FIELD,
+    OP_RUN,
+    S_CELLMASK,
+    S_SATMASK,
+    S_SIGMASK,
+    T_CHA,
+    T_INT,
+    T_INTS,
+    T_STR,
+    get_plan,
+)
+from pyrtcm.rtcmtypes_core import (
+    NCELL,
+    NHARMCOEFFC,
+    NHARMCOEFFS,
+    NSAT,
+    NSIG,
+    SSR_COEFF,
+)
+
+
+def encode_payload(identity: str, template: object = None, **kwargs) -> bytes:
+    """
+    Encode RTCM3 message payload from attribute values.
+
+    Attribute values are taken from the keyword arguments or, if not
+    specified, from the corresponding attribute of the template message
+    (if any). Any other attribute is set to 0 (or the empty string).
+    The message number DF002 (and IGS message number IDF002) are set
+    from the identity unless specified.
+
+    e.g. to modify and re-encode an existing message:
+    ``encode_payload(msg.identity, template=msg, DF003=1)``
+
+    :param str identity: message identity e.g. "1005", "4076_201"
+    :param object template: RTCMMessage providing default attribute values (None)
+    :param kwargs: attribute values e.g. DF003=0, DF405_01=0.000249
+    :return: message payload
+    :rtype: bytes
+    :raises: RTCMMessageError if message identity is unknown
+    :raises: RTCMTypeError if any attribute value is invalid or out of range
+    """
+
+    plan = get_plan(identity)
+    if plan is None:
+        raise RTCMMessageError(f"Unknown message type {identity}")
+    fields = {"DF002": int(identity[0:4])}
+    if "_" in identity:  # proprietary message subtype
+        fields["IDF002"] = int(identity[5:])
+    fields.update(kwargs)
+    defaults = {} if template is None else _TemplateValues(template)
+    out = []  # sequence of (bits, size)
+    _encode_plan(plan, identity, fields, defaults, {}, {}, out, [], "")
+    payloadi = 0
+    nbits = 0
+    for bits, asiz in out:
+        payloadi = payloadi << asiz | bits
+        nbits += asiz
+    pad = -nbits % 8  # pad to byte boundary
+    return (payloadi << pad).to_bytes((nbits + pad) // 8, "big")
+
+
+class _TemplateValues:
+    """
+    Default attribute values taken from template message.
+    """
+
+    def __init__(self, template: object):
+        """Constructor.
+
+        :param object template: template RTCMMessage
+        """
+
+        self._template = template
+
+    def get(self, name: str, default: object = None) -> object:
+        """
+        Get attribute value from template.
+
+        :param str name: attribute name
+        :param object default: value if attribute not in template
+        :return: attribute value
+        :rtype: object
+        """
+
+        return getattr(self._template, name, default)
+
+
+def _encode_plan(
+    plan: tuple,
+    identity: str,
+    fields: dict,
+    defaults: object,
+    refs: dict,
+    strpos: dict,
+    out: list,
+    index: list,
+    suffix: str,
+):  # pylint: disable=too-many-arguments, too-many-locals, too-many-branches
+    """
+    Recursive routine to execute compiled plan in reverse, appending
+    encoded attribute values to the output list.
+
+    :param tuple plan: compiled plan
+    :param str identity: message identity
+    :param dict fields: attribute values
+    :param object defaults: default attribute values (dict or template)
+    :param dict refs: values of referenced attributes (updated in place)
+    :param dict strpos: next character position of concatenated strings
+    :param list out: list of (bits, size) tuples (updated in place)
+    :param list index: repeating group index array
+    :param str suffix: attribute name suffix for current group indices e.g. "_01_02"
+    :raises: RTCMTypeError if any attribute value is invalid or out of range
+    """
+
+    for op in plan:
+        if op[0] == OP_FIELD:
+            anam = op[1]
+            special = op[6]
+            val = _encode_field(
+                op, anam + suffix, identity, fields, defaults, refs, strpos, out
+            )
+            if op[7]:  # value is referenced later in plan
+                refs[anam + suffix] = val
+            if special == S_SATMASK:
+                refs[NSAT] = val.bit_count()
+            elif special == S_SIGMASK:
+                refs[NSIG] = val.bit_count()
+            elif special == S_CELLMASK:
+                refs[NCELL] = val.bit_count()
+            elif special:  # S_SSRCOEFF
+                base1, base2 = SSR_COEFF[anam]
+                i = index[0]
+                N = refs[f"{base1}_{i:02d}"] + 1  # pylint: disable=invalid-name
+                M = refs[f"{base2}_{i:02d}"] + 1  # pylint: disable=invalid-name
+                nc = int(((N + 1) * (N + 2) / 2) - ((N - M) * (N - M + 1) / 2))
+                refs[NHARMCOEFFC] = nc
+                refs[NHARMCOEFFS] = int(nc - (N + 1))
+
+        elif op[0] == OP_COND:
+            _, _, anam, con, gplan = op
+            if refs[anam] == con:
+                _encode_plan(
+                    gplan, identity, fields, defaults, refs, strpos, out, index, suffix
+                )
+
+        else:  # OP_GROUP or OP_RUN
+            _, _, gsiz, nest, incr, gplan = op
+            if isinstance(gsiz, str):
+                for i in range(nest):
+                    gsiz += f"_{index[i]:02d}"
+                gsiz = refs[gsiz] + incr
+            if op[0] == OP_RUN:
+                gplan = (gplan,)
+            index.append(0)
+            for i in range(1, gsiz + 1):
+                index[-1] = i
+                _encode_plan(
+                    gplan,
+                    identity,
+                    fields,
+                    defaults,
+                    refs,
+                    strpos,
+                    out,
+                    index,
+                    f"{suffix}_{i:02d}",
+                )
+            index.pop()
+
+
+def _encode_field(
+    op: tuple,
+    name: str,
+    identity: str,
+    fields: dict,
+    defaults: object,
+    refs: dict,
+    strpos: dict,
+    out: list,
+) -> int:  # pylint: disable=too-many-arguments
+    """
+    Encode single attribute value.
+
+    :param tuple op: plan field operation
+    :param str name: attribute name including any group index suffix
+    :param str identity: message identity
+    :param dict fields: attribute values
+    :param object defaults: default attribute values (dict or template)
+    :param dict refs: values of referenced attributes
+    :param dict strpos: next character position of concatenated strings
+    :param list out: list of (bits, size) tuples (updated in place)
+    :return: unscaled integer value (or character or string)
+    :rtype: object
+    :raises: RTCMTypeError if value is invalid or out of range
+    """
+
+    _, anam, typ, asiz, scale, msb, special, _ = op
+    if special == S_CELLMASK:  # this MSM attribute has variable length
+        asiz = refs[NSAT] * refs[NSIG]
+    if typ > T_STR:  # derived PRN, CELLPRN or CELLSIG
+        return None
+
+    if typ == T_STR:  # concatenated string, one character per attribute
+        name = anam
+    val = fields.get(name, None)
+    if val is None:
+        val = defaults.get(name, "" if typ in (T_CHA, T_STR) else 0)
+    try:
+        if typ == T_STR:
+            pos = strpos.get(anam, 0)
+            strpos[anam] = pos + 1
+            bits = ord(val[pos]) if pos < len(val) else 0
+        elif typ == T_CHA:
+            bits = ord(val) if val else 0
+        else:
+            val = bits = round(val / scale) if scale else int(val)
+            if typ == T_INT:  # 2's complement int
+                if not -msb <= bits < msb:
+                    raise ValueError
+                bits &= (1 << asiz) - 1
+            elif typ == T_INTS:  # int, MSB indicates sign
+                if not -msb < bits < msb:
+                    raise ValueError
+                if bits < 0:
+                    bits = msb | -bits
+        if not 0 <= bits < 1 << asiz:  # T_UINT, T_CHA or T_STR
+            raise ValueError
+    except (TypeError, ValueError) as err:
+        raise RTCMTypeError(
+            (
+                f"Error processing attribute '{name}' "
+                f"in message type {identity} - invalid value {val!r}"
+            )
+        ) from err
+    out.append((bits, asiz))
+    return val
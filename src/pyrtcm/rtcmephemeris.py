@@ -0,0 +1,266 @@
+"""
+RTCMEphemerisStore class.
+
+Indexed store of broadcast ephemerides decoded from RTCM3 GPS (1019),
+GLONASS (1020), BeiDou (1042), QZSS (1044) and Galileo F/NAV (1045) and
+I/NAV (1046) ephemeris messages.
+
+Ephemerides are indexed by (message identity, PRN, IODE, toe), where IODE
+is the constellation's issue of data (GLONASS tb, BeiDou AODE, Galileo
+IODnav) and toe is the reference time of ephemeris as GPS time in seconds
+since the start of GPS time. Identical re-broadcasts are discarded.
+Ephemerides for each satellite are held in toe order, so the ephemeris
+nearest a given time can be found by binary search in O(log n).
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: semuadmin © 2026
+:license: BSD 3-Clause
+"""
+
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+
+from pyrtcm.rtcmepoch import GPSEPOCH, LEAPSECONDS
+
+S_WEEK = 604800
+"""Seconds per week"""
+S_DAY = 86400
+"""Seconds per day"""
+
+EPHEMERIS_TYPES = {
+    "1019": ("GPS", "DF009", "DF071", "DF093", "DF076", 0),
+    "1020": ("GLONASS", "DF038", "DF110", None, None, None),
+    "1042": ("BEIDOU", "DF488", "DF492", "DF505", "DF489", 1356),
+    "1044": ("QZSS", "DF429", "DF434", "DF442", "DF452", 0),
+    "1045": ("GALILEO", "DF252", "DF290", "DF304", "DF289", 1024),
+    "1046": ("GALILEO", "DF252", "DF290", "DF304", "DF289", 1024),
+}
+"""
+Map of ephemeris message identity to (constellation, PRN attribute,
+IODE attribute, toe attribute, week attribute, GPS week of week 0)
+"""
+
+GNSS_EPHEMERIS = {
+    "GPS": ("1019",),
+    "GLONASS": ("1020",),
+    "BEIDOU": ("1042",),
+    "QZSS": ("1044",),
+    "GALILEO": ("1046", "1045"),
+}
+"""Ephemeris message identities for each constellation, in order of preference"""
+
+MAX_TOE_DIFF = {
+    "GPS": 7200,
+    "GLONASS": 1800,
+    "BEIDOU": 3600,
+    "QZSS": 7200,
+    "GALILEO": 14400,
+}
+"""Default maximum difference between toe and requested time in seconds"""
+
+
+class RTCMEphemerisStore:
+    """
+    RTCMEphemerisStore class.
+    """
+
+    def __init__(self, maxage: int = None, rollover: int = 2):
+        """Constructor.
+
+        :param int maxage: age in seconds, relative to the latest toe received, \
+            after which a satellite's ephemerides are evicted when a new \
+            ephemeris for that satellite is added (None = never)
+        :param int rollover: number of GPS 1024-week rollovers used to resolve \
+            10-bit GPS and QZSS week numbers (2 = April 2019 to November 2038)
+        """
+
+        self._maxage = maxage
+        self._rollover = rollover
+        self._index = {}  # ephemerides keyed on (identity, prn, iode, toe)
+        self._sats = {}  # ([toe], [key]) in toe order keyed on (identity, prn)
+        self._latest = None  # latest toe received
+        self._duplicates = 0
+
+    def __len__(self) -> int:
+        """
+        Number of ephemerides held.
+
+        :return: number of ephemerides
+        :rtype: int
+        """
+
+        return len(self._index)
+
+    def __contains__(self, key: tuple) -> bool:
+        """
+        Check if ephemeris is held.
+
+        :param tuple key: (identity, prn, iode, toe)
+        :return: True if held
+        :rtype: bool
+        """
+
+        return key in self._index
+
+    def add(self, msg: object) -> bool:
+        """
+        Add ephemeris message to store. Any other message types are
+        ignored. An ephemeris with the same key as one already held
+        replaces it, unless its payload is identical.
+
+        :param RTCMMessage msg: parsed RTCM message
+        :return: True if ephemeris was added or updated, False if ignored
+        :rtype: bool
+        """
+
+        ephtype = EPHEMERIS_TYPES.get(msg.identity, None)
+        if ephtype is None:
+            return False
+        toe = self.ephemeris_time(msg)
+        if toe is None:  # GLONASS date unknown
+            return False
+        prn = getattr(msg, ephtype[1])
+        key = (msg.identity, prn, getattr(msg, ephtype[2]), toe)
+        if self._latest is None or toe > self._latest:
+            self._latest = toe
+
+        old = self._index.get(key, None)
+        if old is not None:
+            if bytes(old.payload) == bytes(msg.payload):  # re-broadcast
+                self._duplicates += 1
+                return False
+            self._index[key] = msg
+            return True
+        self._index[key] = msg
+        times, keys = self._sats.setdefault((msg.identity, prn), ([], []))
+        pos = bisect_right(times, toe)
+        times.insert(pos, toe)
+        keys.insert(pos, key)
+        if self._maxage is not None:
+            self._evict(times, keys, self._latest - self._maxage)
+        return True
+
+    def get(self, gnss: str, prn: int, tim: float, maxdiff: float = None) -> object:
+        """
+        Get best ephemeris for satellite at time, i.e. the ephemeris with
+        toe nearest the time (preferring the latest received if several
+        have the same toe).
+
+        :param str gnss: constellation name e.g. "GPS", or message identity e.g. "1045"
+        :param int prn: satellite PRN or slot number
+        :param float tim: time as GPS time in seconds since start of GPS time
+        :param float maxdiff: maximum difference between toe and time in \
+            seconds (None = constellation default in `MAX_TOE_DIFF`)
+        :return: ephemeris message, or None if none within maxdiff
+        :rtype: RTCMMessage
+        """
+
+        if gnss in EPHEMERIS_TYPES:
+            identities = (gnss,)
+            gnss = EPHEMERIS_TYPES[gnss][0]
+        else:
+            identities = GNSS_EPHEMERIS.get(gnss, ())
+        if maxdiff is None:
+            maxdiff = MAX_TOE_DIFF.get(gnss, 0)
+        bestdiff = bestkey = None
+        for identity in identities:
+            times, keys = self._sats.get((identity, prn), ((), ()))
+            pos = bisect_right(times, tim)
+            candidates = [pos - 1] if pos else []  # latest received toe <= time
+            if pos < len(times):  # latest received toe > time
+                candidates.append(bisect_right(times, times[pos]) - 1)
+            for i in candidates:
+                diff = abs(times[i] - tim)
+                if diff <= maxdiff and (bestdiff is None or diff < bestdiff):
+                    bestdiff, bestkey = diff, keys[i]
+        return None if bestkey is None else self._index[bestkey]
+
+    def evict(self, before: float) -> int:
+        """
+        Evict all ephemerides with toe before time.
+
+        :param float before: time as GPS time in seconds since start of GPS time
+        :return: number of ephemerides evicted
+        :rtype: int
+        """
+
+        count = len(self._index)
+        for times, keys in self._sats.values():
+            self._evict(times, keys, before)
+        return count - len(self._index)
+
+    def _evict(self, times: list, keys: list, before: float):
+        """
+        Evict satellite's ephemerides with toe before time.
+
+        :param list times: satellite toes, in order
+        :param list keys: satellite ephemeris keys, in toe order
+        :param float before: time as GPS time in seconds since start of GPS time
+        """
+
+        num = bisect_left(times, before)
+        if num:
+            for key in keys[:num]:
+                del self._index[key]
+            del times[:num]
+            del keys[:num]
+
+    def ephemeris_time(self, msg: object) -> float:
+        """
+        Get reference time of ephemeris (toe) as GPS time. For GLONASS this
+        is tb, on the day given by NT and N4 if available (DF131 = 1), or
+        otherwise on the day nearest the latest toe received.
+
+        :param RTCMMessage msg: ephemeris message
+        :return: GPS time in seconds since start of GPS time, or None if unknown
+        :rtype: float
+        """
+
+        _, _, _, toe, week, week0 = EPHEMERIS_TYPES[msg.identity]
+        if toe is not None:
+            week = getattr(msg, week)
+            if week0 == 0:  # 10-bit week
+                week += self._rollover * 1024
+            tim = (week + week0) * S_WEEK + getattr(msg, toe)
+            if msg.identity == "1042":  # BeiDou time -> GPS
+                tim += 14
+            return tim
+
+        # GLONASS tb is in 15 minute intervals in UTC(SU) + 3h
+        tod = msg.DF110 * 900 - 10800 + LEAPSECONDS
+        if msg.DF131 and msg.DF129 and msg.DF134:
+            year = 1996 + 4 * (msg.DF134 - 1)
+            day = (datetime(year, 1, 1) - GPSEPOCH).days + msg.DF129 - 1
+            return day * S_DAY + tod
+        if self._latest is None:
+            return None
+        tim = self._latest - self._latest % S_DAY + tod % S_DAY
+        if tim - self._latest > S_DAY / 2:
+            tim -= S_DAY
+        elif self._latest - tim > S_DAY / 2:
+            tim += S_DAY
+        return tim
+
+    @property
+    def duplicates(self) -> int:
+        """
+        Getter for number of identical re-broadcasts discarded.
+
+        :return: number of duplicates
+        :rtype: int
+        """
+
+        return self._duplicates
+
+    @property
+    def keys(self) -> list:
+        """
+        Getter for keys of ephemerides held, as (identity, prn, iode, toe).
+
+        :return: list of keys
+        :rtype: list
+        """
+
+        return list(self._index)
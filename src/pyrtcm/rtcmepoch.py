@@ -0,0 +1,270 @@
+"""
+RTCMEpochAssembler class.
+
+Groups a stream of decoded RTCM3 MSM messages into complete observation
+epochs, across all constellations in `GNSSMAP`.
+
+Each MSM message's epoch time (DF004, DF416/DF034, DF248, DF427, DF428,
+DF546) is converted to GPS time of week, so that messages for the same
+epoch from different constellations are assigned to the same epoch. An
+epoch is emitted as soon as its last message (DF393 multiple message
+bit = 0) arrives. An epoch whose last message never arrives (e.g. due
+to a CRC failure) is emitted as incomplete once a message for an epoch
+at least `window` ms away is received, or when a later epoch from the
+same reference station completes, so that each station's epochs are
+always emitted in the order they started.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: semuadmin © 2026
+:license: BSD 3-Clause
+"""
+
+from collections import deque
+from datetime import datetime
+
+from pyrtcm.rtcmtypes_core import GNSSMAP
+
+GPSEPOCH = datetime(1980, 1, 6)
+"""Start of GPS time"""
+LEAPSECONDS = 18
+"""GPS - UTC offset in seconds (correct as from 1/1/2017)"""
+MS_DAY = 86400000
+"""Milliseconds per day"""
+MS_WEEK = 7 * MS_DAY
+"""Milliseconds per week"""
+GLONASS_OFFSET = LEAPSECONDS * 1000 - 10800000
+"""GLONASS (UTC(SU) + 3h) to GPS time offset in ms"""
+BEIDOU_OFFSET = 14000
+"""BeiDou to GPS time offset in ms"""
+
+NO_EPOCHS = ()
+"""Empty tuple returned when no epochs are ready"""
+
+
+class MSMEpoch:
+    """
+    Observation epoch assembled by RTCMEpochAssembler.
+    """
+
+    __slots__ = ("station", "tow", "messages", "complete", "seq")
+
+    def __init__(self, station: int, tow: int, seq: int):
+        """Constructor.
+
+        :param int station: reference station ID (DF003)
+        :param int tow: epoch time as GPS time of week in ms
+        :param int seq: sequence number of epoch
+        """
+
+        self.station = station
+        self.tow = tow
+        self.messages = []
+        self.complete = False
+        self.seq = seq
+
+    def __repr__(self) -> str:
+        """
+        Machine readable representation.
+
+        :return: representation
+        :rtype: str
+        """
+
+        return (
+            f"MSMEpoch(station={self.station}, tow={self.tow}, "
+            f"messages={[msg.identity for msg in self.messages]}, "
+            f"complete={self.complete})"
+        )
+
+
+class RTCMEpochAssembler:
+    """
+    RTCMEpochAssembler class.
+    """
+
+    def __init__(self, window: int = 1000):
+        """Constructor.
+
+        :param int window: time in ms after which an incomplete epoch \
+            is emitted (1000)
+        """
+
+        self._window = window
+        self._pending = {}  # epochs awaiting completion keyed on (station, tow)
+        self._stations = {}  # epochs awaiting completion for each station
+        self._latest = None  # most recent epoch time received
+        self._seq = 0
+        self._epochs = 0
+        self._incomplete = 0
+
+    def add(self, msg: object) -> tuple:
+        """
+        Add MSM message to its epoch. Non-MSM messages are ignored.
+
+        :param RTCMMessage msg: parsed RTCM message
+        :return: tuple of MSMEpoch objects now ready, in epoch order (may be empty)
+        :rtype: tuple
+        """
+
+        if not msg.ismsm:
+            return NO_EPOCHS
+        tow = self.epoch_tow(msg)
+        key = (msg.DF003, tow)
+        self._latest = tow
+        pending = self._pending
+        epoch = pending.get(key, None)
+        if epoch is None:
+            epoch = pending[key] = MSMEpoch(msg.DF003, tow, self._seq)
+            self._seq += 1
+            queue = self._stations.get(msg.DF003, None)
+            if queue is None:
+                queue = self._stations[msg.DF003] = deque()
+            queue.append(epoch)
+        epoch.messages.append(msg)
+
+        ready = NO_EPOCHS
+        if not msg.DF393:  # last message of epoch
+            epoch.complete = True
+            self._epochs += 1
+            ready = self._complete(epoch) + (epoch,)
+        if pending:
+            ready += self._expire(self._window)
+        return ready
+
+    def flush(self) -> tuple:
+        """
+        Emit all pending incomplete epochs.
+
+        :return: tuple of MSMEpoch objects, in epoch order
+        :rtype: tuple
+        """
+
+        return self._expire(0)
+
+    def assemble(self, messages: object):
+        """
+        Generator yielding complete (and expired incomplete) epochs
+        from an iterable of parsed messages, e.g. an RTCMReader. Items
+        may be RTCMMessage objects or tuples whose last element is the
+        parsed message. Any incomplete epochs are flushed at the end.
+
+        :param object messages: iterable of messages or message tuples
+        :return: next epoch
+        :rtype: MSMEpoch
+        """
+
+        for msg in messages:
+            if isinstance(msg, tuple):
+                msg = msg[-1]
+            if msg is not None:
+                yield from self.add(msg)
+        yield from self.flush()
+
+    def epoch_tow(self, msg: object) -> int:
+        """
+        Get MSM message epoch time as GPS time of week. If the GLONASS day
+        of week is unknown (DF416 = 7), the day is taken from the most
+        recent epoch received.
+
+        :param RTCMMessage msg: MSM message
+        :return: GPS time of week in ms
+        :rtype: int
+        """
+
+        gnss = msg.identity[0:3]
+        if gnss == "108":
+            tod = msg.DF034 + GLONASS_OFFSET
+            if msg.DF416 != 7:
+                return (msg.DF416 * MS_DAY + tod) % MS_WEEK
+            latest = self._latest or 0
+            tow = latest - latest % MS_DAY + tod % MS_DAY
+            if tow - latest > MS_DAY // 2:
+                tow -= MS_DAY
+            elif latest - tow > MS_DAY // 2:
+                tow += MS_DAY
+            return tow % MS_WEEK
+        tow = getattr(msg, GNSSMAP[gnss][1])
+        if gnss == "112":
+            tow += BEIDOU_OFFSET
+        return tow % MS_WEEK
+
+    def _complete(self, epoch: MSMEpoch) -> tuple:
+        """
+        Remove completed epoch from pending epochs, along with any
+        incomplete epochs from the same reference station which
+        started before it.
+
+        :param MSMEpoch epoch: completed epoch
+        :return: tuple of incomplete MSMEpoch objects, in epoch order
+        :rtype: tuple
+        """
+
+        pending = self._pending
+        queue = self._stations[epoch.station]
+        expired = []
+        while True:
+            older = queue.popleft()
+            del pending[(older.station, older.tow)]
+            if older is epoch:
+                break
+            expired.append(older)
+        self._incomplete += len(expired)
+        return tuple(expired)
+
+    def _expire(self, window: int) -> tuple:
+        """
+        Remove and return pending incomplete epochs, in epoch order, which
+        are at least window ms away from the most recent epoch received.
+
+        :param int window: time in ms (0 = all pending epochs)
+        :return: tuple of MSMEpoch objects
+        :rtype: tuple
+        """
+
+        pending = self._pending
+        expired = []
+        for epoch in pending.values():
+            age = (self._latest - epoch.tow) % MS_WEEK
+            if min(age, MS_WEEK - age) < window:
+                break
+            expired.append(epoch)
+        for epoch in expired:
+            del pending[(epoch.station, epoch.tow)]
+            self._stations[epoch.station].popleft()
+        self._incomplete += len(expired)
+        return tuple(expired)
+
+    @property
+    def epochs(self) -> int:
+        """
+        Getter for number of complete epochs emitted.
+
+        :return: number of epochs
+        :rtype: int
+        """
+
+        return self._epochs
+
+    @property
+    def incomplete(self) -> int:
+        """
+        Getter for number of incomplete epochs emitted.
+
+        :return: number of epochs
+        :rtype: int
+        """
+
+        return self._incomplete
+
+    @property
+    def pending(self) -> int:
+        """
+        Getter for number of epochs awaiting completion.
+
+        :return: number of epochs
+        :rtype: int
+        """
+
+        return len(self._pending)
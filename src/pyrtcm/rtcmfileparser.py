@@ -0,0 +1,210 @@
+"""
+RTCMFileParser class.
+
+Parses RTCM3 log files in parallel using a pool of worker processes.
+
+The file is read and split into RTCM3 frames in a single pass by the
+main process, using the same framing logic as RTCMReader. Consecutive
+frames are grouped into chunks, which are parsed in parallel by the
+worker processes. Results are returned in original file order.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: semuadmin © 2026
+:license: BSD 3-Clause
+"""
+
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from logging import getLogger
+
+from pyrtcm.exceptions import (
+    RTCMMessageError,
+    RTCMParseError,
+    RTCMStreamError,
+    RTCMTypeError,
+)
+from pyrtcm.rtcmreader import RTCMReader
+from pyrtcm.rtcmtypes_core import (
+    DEFAULT_CHUNKSIZE,
+    DEFAULT_READAHEAD,
+    ERR_LOG,
+    ERR_RAISE,
+    VALCKSUM,
+)
+
+
+def parse_chunk(chunk: list, validate: int = VALCKSUM, labelmsm: int = 1) -> list:
+    """
+    Parse chunk of raw RTCM3 frames. Invoked by worker processes.
+
+    Any parsing error is returned in place of the parsed message.
+
+    :param list chunk: list of raw RTCM3 frames
+    :param int validate: 0 = don't validate CRC, 1 = validate CRC (1)
+    :param int labelmsm: MSM NSAT and NCELL attribute label (1 = RINEX, 2 = freq)
+    :return: list of RTCMMessage objects or exceptions
+    :rtype: list
+    """
+
+    res = []
+    for raw in chunk:
+        try:
+            res.append(RTCMReader.parse(raw, validate=validate, labelmsm=labelmsm))
+        except (
+            RTCMMessageError,
+            RTCMParseError,
+            RTCMStreamError,
+            RTCMTypeError,
+        ) as err:
+            res.append(err)
+    return res
+
+
+class RTCMFileParser:
+    """
+    RTCMFileParser class.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        workers: int = None,
+        chunksize: int = DEFAULT_CHUNKSIZE,
+        validate: int = VALCKSUM,
+        quitonerror: int = ERR_LOG,
+        labelmsm: int = 1,
+        errorhandler: object = None,
+        msgfilter: set = None,
+    ):  # pylint: disable=too-many-arguments
+        """Constructor.
+
+        :param str path: path to RTCM3 log file
+        :param int workers: number of worker processes; 0 or 1 = parse in the \
+            calling process (None = number of CPUs)
+        :param int chunksize: approximate size in bytes of each chunk of frames \
+            passed to a worker process (1048576)
+        :param int validate: 0 = ignore invalid checksum, 1 = validate checksum (1)
+        :param int quitonerror: ERR_IGNORE (0) = ignore errors,  ERR_LOG (1) = log continue,
+            ERR_RAISE (2) = (re)raise (1)
+        :param int labelmsm: MSM NSAT and NCELL attribute label (1 = RINEX, 2 = freq)
+        :param object errorhandler: error handling object or function (None)
+        :param set msgfilter: set of message identities to be returned e.g. {"1005", "1077"}; \
+            frames of any other type are skipped without being parsed (None = all)
+        """
+
+        self._path = path
+        self._workers = os.cpu_count() if workers is None else workers
+        self._chunksize = chunksize
+        self._validate = validate
+        self._quitonerror = quitonerror
+        self._labelmsm = labelmsm
+        self._errorhandler = errorhandler
+        self._msgfilter = msgfilter
+        self._logger = getLogger(__name__)
+
+    def __iter__(self):
+        """
+        Iterate through file, returning parsed messages in file order.
+
+        :return: generator of tuples of (raw_data as bytes, parsed_data as RTCMMessage)
+        :rtype: generator
+        :raises: RTCMStreamError, RTCMParseError, RTCMTypeError \
+            if quitonerror = ERR_RAISE
+        """
+
+        if self._workers <= 1:
+            for chunk in self.chunks():
+                yield from self._results(chunk, parse_chunk(chunk, *self._args))
+            return
+
+        pool = ProcessPoolExecutor(max_workers=self._workers)
+        try:
+            pending = deque()  # chunks in flight, in file order
+            for chunk in self.chunks():
+                pending.append((chunk, pool.submit(parse_chunk, chunk, *self._args)))
+                if len(pending) >= self._workers * 2:  # limit work in flight
+                    chunk, future = pending.popleft()
+                    yield from self._results(chunk, future.result())
+            while pending:
+                chunk, future = pending.popleft()
+                yield from self._results(chunk, future.result())
+        finally:
+            pool.shutdown(cancel_futures=True)
+
+    def chunks(self):
+        """
+        Read file and split into chunks of consecutive raw RTCM3 frames.
+
+        :return: generator of lists of raw frames
+        :rtype: generator
+        :raises: RTCMStreamError if quitonerror = ERR_RAISE
+        """
+
+        with open(self._path, "rb") as stream:
+            rtr = RTCMReader(
+                stream,
+                quitonerror=self._quitonerror,
+                parsed=False,
+                errorhandler=self._errorhandler,
+                readahead=max(self._chunksize, DEFAULT_READAHEAD),
+                msgfilter=self._msgfilter,
+            )
+            chunk = []
+            size = 0
+            for raw, _ in rtr:
+                chunk.append(raw)
+                size += len(raw)
+                if size >= self._chunksize:
+                    yield chunk
+                    chunk = []
+                    size = 0
+            if chunk:
+                yield chunk
+
+    @property
+    def _args(self) -> tuple:
+        """
+        Getter for worker parse arguments.
+
+        :return: tuple of (validate, labelmsm)
+        :rtype: tuple
+        """
+
+        return self._validate, self._labelmsm
+
+    def _results(self, chunk: list, results: list):
+        """
+        Pair raw frames with parse results, handling any errors.
+
+        :param list chunk: list of raw frames
+        :param list results: list of parsed messages or exceptions
+        :return: generator of tuples of (raw_data, parsed_data)
+        :rtype: generator
+        """
+
+        for raw, parsed in zip(chunk, results):
+            if isinstance(parsed, Exception):
+                if self._quitonerror:
+                    self._do_error(parsed)
+            else:
+                yield raw, parsed
+
+    def _do_error(self, err: Exception):
+        """
+        Handle error.
+
+        :param Exception err: error message
+        :raises: Exception if quitonerror = 2
+        """
+
+        if self._quitonerror == ERR_RAISE:
+            raise err from err
+        if self._quitonerror == ERR_LOG:
+            # pass to error handler if there is one
+            if self._errorhandler is None:
+                self._logger.error(err)
+            else:
+                self._errorhandler(err)
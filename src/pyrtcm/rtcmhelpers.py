@@ -10,8 +10,18 @@ Created on 14 Feb 2022
 """
 
 from datetime import datetime, timedelta
+from functools import lru_cache
+from types import MappingProxyType
 
-from pyrtcm.rtcmtypes_core import GNSSMAP, RTCM_DATA_FIELDS, SSR_SPHER_COEFFS
+from pyrtcm.rtcmtables import PRNSIGMAP
+from pyrtcm.rtcmtypes_core import (
+    CRC24Q_POLY,
+    GNSSMAP,
+    NA,
+    RTCM_DATA_FIELDS,
+    SATCELLMAP_CACHE_SIZE,
+    SSR_SPHER_COEFFS,
+)
 
 
 def att2idx(att: str) -> int:
@@ -51,6 +61,20 @@ def att2name(att: str) -> str:
     return att.split("_")[0]
 
 
+def _crc24q_table() -> tuple:
+    """
+    Generate 256-entry CRC24Q lookup table.
+
+    :return: tuple of CRC values for each octet value
+    :rtype: tuple
+    """
+
+    table = []
+    for octet in range(256):
+        table.append(calc_crc24q_ref(bytes((octet,))))
+    return tuple(table)
+
+
 def calc_crc24q(message: bytes) -> int:
     """
     Perform CRC24Q cyclic redundancy check.
@@ -60,13 +84,49 @@ def calc_crc24q(message: bytes) -> int:
     If the message excludes the appended CRC bytes, the
     function will return the applicable CRC.
 
+    Uses the accelerated `crcmod` C extension if installed,
+    otherwise the table-driven implementation `calc_crc24q_table`.
+
+    :param bytes message: message
+    :return: CRC or 0
+    :rtype: int
+
+    """
+
+    return _CRC24Q(message)
+
+
+def calc_crc24q_table(message: bytes) -> int:
+    """
+    Perform CRC24Q cyclic redundancy check using
+    256-entry lookup table.
+
     :param bytes message: message
     :return: CRC or 0
     :rtype: int
 
     """
 
-    poly = 0x1864CFB
+    crc = 0
+    table = CRC24Q_TABLE
+    for octet in message:
+        crc = ((crc << 8) & 0xFFFFFF) ^ table[(crc >> 16) ^ octet]
+    return crc
+
+
+def calc_crc24q_ref(message: bytes) -> int:
+    """
+    Perform CRC24Q cyclic redundancy check bit by bit.
+
+    Reference implementation - use `calc_crc24q` for performance.
+
+    :param bytes message: message
+    :return: CRC or 0
+    :rtype: int
+
+    """
+
+    poly = CRC24Q_POLY
     crc = 0
     for octet in message:
         crc ^= octet << 16
@@ -77,6 +137,37 @@ def calc_crc24q(message: bytes) -> int:
     return crc & 0xFFFFFF
 
 
+CRC24Q_TABLE = _crc24q_table()
+"""CRC24Q lookup table"""
+
+try:  # use crcmod if available (accelerated if its C extension is installed)
+    from crcmod import mkCrcFun as _mkcrcfun
+
+    CRC24Q_NATIVE = _mkcrcfun(CRC24Q_POLY, initCrc=0, rev=False, xorOut=0)
+    """crcmod CRC24Q function, or None if not available"""
+except ImportError:  # pragma: no cover
+    CRC24Q_NATIVE = None
+
+_CRC24Q = calc_crc24q_table if CRC24Q_NATIVE is None else CRC24Q_NATIVE
+
+
+def get_identity(payload: bytes) -> str:
+    """
+    Get message identity from first 2 (or 3) bytes of payload.
+
+    :param bytes payload: message payload
+    :return: message identity e.g. "1005", "4076_201"
+    :rtype: str
+    :raises: IndexError if payload is too short
+    """
+
+    mid = payload[0] << 4 | payload[1] >> 4
+    if mid == 4076:  # proprietary IGS SSR message type
+        subtype = (payload[1] & 0x1) << 7 | payload[2] >> 1
+        return f"{mid}_{subtype:03d}"
+    return str(mid)
+
+
 def crc2bytes(message: bytes) -> bytes:
     """
     Generate CRC as 3 bytes, suitable for
@@ -183,6 +274,84 @@ def escapeall(val: bytes) -> str:
     return "b'{}'".format("".join(f"\\x{b:02x}" for b in val))
 
 
+def get_satcellmaps(
+    identity: str, satmask: int, sigmask: int, cellmask: int, labelmsm: int = 1
+) -> tuple:
+    """
+    Map MSM group indices to satellite PRN & signal ID values via
+    bitmasks DF394, DF395 and DF396.
+
+    Maps are cached by constellation, masks and label type in a bounded
+    LRU cache, as consecutive epochs from a station generally have
+    identical masks. The returned maps are read-only and shared. Cache
+    statistics are available via `get_satcellmaps.cache_info()`.
+
+    :param str identity: MSM message identity e.g. "1077"
+    :param int satmask: satellite mask DF394
+    :param int sigmask: signal mask DF395
+    :param int cellmask: cell mask DF396
+    :param int labelmsm: MSM signal label (1 = RINEX, 2 = freq)
+    :return: tuple of (satellite map {index: prn}, cell map {index: (prn, sig)})
+    :rtype: tuple
+    """
+
+    return _get_satcellmaps(
+        identity[0:3], satmask, sigmask, cellmask, 2 if labelmsm == 2 else 1
+    )
+
+
+@lru_cache(maxsize=SATCELLMAP_CACHE_SIZE)
+def _get_satcellmaps(
+    gnss: str, satmask: int, sigmask: int, cellmask: int, labelmsm: int
+) -> tuple:
+    """
+    Generate MSM satellite and cell maps (cached).
+
+    :param str gnss: MSM constellation prefix e.g. "107"
+    :param int satmask: satellite mask DF394
+    :param int sigmask: signal mask DF395
+    :param int cellmask: cell mask DF396
+    :param int labelmsm: MSM signal label (1 = RINEX, 2 = freq)
+    :return: tuple of (satellite map, cell map) as read-only mappings
+    :rtype: tuple
+    """
+
+    prnmap, sigmap = PRNSIGMAP[gnss]
+    sigcode = 0 if labelmsm == 2 else 1
+
+    satmap = {}
+    nsat = 0
+    for idx in range(65):
+        if satmask >> (64 - idx) & 1:
+            nsat += 1
+            satmap[nsat] = prnmap.get(idx, NA)
+
+    sigs = []
+    nsig = 0
+    for idx in range(33):
+        if sigmask >> (32 - idx) & 1:
+            sgc = sigmap.get(idx, NA)
+            fqc = sgc[1] if sigcode else sgc[0]
+            sigs.append(fqc)
+            nsig += 1
+
+    ncells = nsat * nsig
+    cellmap = {}
+    ncell = idx = 0
+    for sat in range(nsat):
+        for sig in range(nsig):
+            idx += 1
+            if cellmask >> (ncells - idx) & 1:
+                ncell += 1
+                cellmap[ncell] = (satmap[sat + 1], sigs[sig])
+
+    return MappingProxyType(satmap), MappingProxyType(cellmap)
+
+
+get_satcellmaps.cache_info = _get_satcellmaps.cache_info
+get_satcellmaps.cache_clear = _get_satcellmaps.cache_clear
+
+
 def parse_msm(msg: object) -> tuple:
     """
     Parse individual MSM message into iterable data arrays.
@@ -0,0 +1,136 @@
+"""
+RTCMMappedReader class.
+
+Reads and parses RTCM3 messages from a log file which is
+memory-mapped into the process address space, rather than
+read into an internal buffer.
+
+Frames are returned as memoryview slices of the mapped file, and
+RTCMMessage payloads are memoryview slices of those frames, so no
+intermediate copies of the file contents are made. File I/O is
+left to the operating system's page cache.
+
+NB: each raw frame and RTCMMessage holds a reference to the mapped
+file, which is only unmapped when the reader has been closed AND
+all its frames and messages have been discarded. Use `bytes(raw_data)`
+or `parsed_data.payload` to obtain independent copies.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: semuadmin © 2026
+:license: BSD 3-Clause
+"""
+
+import mmap
+
+from pyrtcm.rtcmreader import RTCMReader
+from pyrtcm.rtcmscanner import RTCMScanner
+from pyrtcm.rtcmtypes_core import ERR_LOG, VALCKSUM
+
+
+class RTCMMappedReader(RTCMReader):
+    """
+    RTCMMappedReader class.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        validate: int = VALCKSUM,
+        quitonerror: int = ERR_LOG,
+        labelmsm: int = 1,
+        parsed: bool = True,
+        errorhandler: object = None,
+        lazy: bool = False,
+        msgfilter: set = None,
+        fields: set = None,
+        cache: object = None,
+        statistics: object = None,
+    ):  # pylint: disable=too-many-arguments
+        """Constructor.
+
+        :param str path: path to RTCM3 log file
+        :param int validate: 0 = ignore invalid checksum, 1 = validate checksum (1)
+        :param int quitonerror: ERR_IGNORE (0) = ignore errors,  ERR_LOG (1) = log continue,
+            ERR_RAISE (2) = (re)raise (1)
+        :param int labelmsm: MSM NSAT and NCELL attribute label (1 = RINEX, 2 = freq)
+        :param bool parsed: 1 = return raw and parsed data, 0 = return only raw data \
+            (parsed = None) (1)
+        :param object errorhandler: error handling object or function (None)
+        :param bool lazy: defer decoding of each message payload until one of its \
+            attributes is first accessed (False)
+        :param set msgfilter: set of message identities to be returned e.g. {"1005", "1077"}; \
+            frames of any other type are skipped without being parsed (None = all)
+        :param set fields: names of attributes to be decoded e.g. {"DF004", "DF405"}; \
+            all other attributes are skipped (None = all)
+        :param object cache: RTCMMessageCache (or other object with a compatible \
+            `parse()` method) used to parse messages (None)
+        :param object statistics: RTCMStatistics object in which to record stream \
+            statistics (None)
+        :raises: OSError if file cannot be opened
+        """
+
+        with open(path, "rb") as stream:
+            super().__init__(
+                stream,
+                validate=validate,
+                quitonerror=quitonerror,
+                labelmsm=labelmsm,
+                parsed=parsed,
+                errorhandler=errorhandler,
+                lazy=lazy,
+                msgfilter=msgfilter,
+                fields=fields,
+                cache=cache,
+                statistics=statistics,
+            )
+            if stream.seek(0, 2):
+                self._mmap = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+            else:  # empty files cannot be mapped
+                self._mmap = None
+        # the whole file is the read-ahead buffer
+        buffer = b"" if self._mmap is None else self._mmap
+        self._view = memoryview(buffer)
+        self._scanner = RTCMScanner(buffer, self._view, statistics)
+
+    def __enter__(self):
+        """
+        Context manager enter routine.
+        """
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        """
+        Context manager exit routine.
+        """
+
+        self.close()
+
+    def close(self):
+        """
+        Close reader and unmap file. If any raw frames or messages
+        returned by the reader are still referenced, the file remains
+        mapped until they are discarded.
+        """
+
+        self._scanner = RTCMScanner(statistics=self._statistics)
+        self._view.release()
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:  # frames still exported; unmapped on release
+                pass
+            self._mmap = None
+
+    def _read_ahead(self, size: int) -> bytes:
+        """
+        Return no data, as the mapped file cannot be topped up.
+
+        :param int size: number of bytes required (ignored)
+        :return: empty bytes
+        :rtype: bytes
+        """
+
+        return b""
@@ -9,80 +9,254 @@ Created on 14 Feb 2022
 """
 
 from pyrtcm.exceptions import RTCMMessageError, RTCMStreamError, RTCMTypeError
-from pyrtcm.rtcmhelpers import crc2bytes, escapeall, len2bytes
-from pyrtcm.rtcmtables import PRNSIGMAP
+from pyrtcm.rtcmhelpers import (
+    crc2bytes,
+    escapeall,
+    get_identity,
+    get_satcellmaps,
+    len2bytes,
+)
+from pyrtcm.rtcmplan import (
+    OP_COND,
+    OP_FIELD,
+    OP_RUN,
+    OP_SKIP,
+    S_CELLMASK,
+    S_SATMASK,
+    S_SIGMASK,
+    T_CELPRN,
+    T_CELSIG,
+    T_CHA,
+    T_INT,
+    T_INTS,
+    T_PRN,
+    T_STR,
+    T_UINT,
+    get_header_plan,
+    get_layout,
+    get_payload_dict,
+    get_plan,
+)
 from pyrtcm.rtcmtypes_core import (
-    CELPRN,
-    CELSIG,
-    CHA,
-    INT,
-    INTS,
-    NA,
     NCELL,
     NHARMCOEFFC,
     NHARMCOEFFS,
     NSAT,
     NSIG,
-    PRN,
-    RTCM_DATA_FIELDS,
     RTCM_HDR,
     RTCM_MSGIDS,
     SSR_COEFF,
-    STR,
 )
-from pyrtcm.rtcmtypes_get import RTCM_PAYLOADS_GET
-from pyrtcm.rtcmtypes_get_igs import RTCM_PAYLOADS_GET_IGS
-from pyrtcm.rtcmtypes_get_msm import RTCM_PAYLOADS_GET_MSM
 
 BOOL = "B"
 
+# lazy decode states
+DECODED_NONE = 0
+"""Payload not yet decoded"""
+DECODED_HEADER = 1
+"""Message header attributes decoded"""
+DECODED_FULL = 2
+"""All payload attributes decoded"""
 
-class RTCMMessage:
-    """RTCM Message Class."""
+_setattr = object.__setattr__
+"""Set internal attribute, bypassing RTCMMessage immutability guard"""
+
+WORKING_SLOTS = ("_payloadi", "_refs", "_shape", "_strpos", "_satmap", "_cellmap")
+"""RTCMMessage working storage discarded after decoding"""
 
-    def __init__(self, payload: bytes = None, labelmsm: int = 1):
+LAYOUT_UNKNOWN = {"DF002": 0}
+"""Attribute layout for unknown message types"""
+
+
+class RTCMMessage:
+    """
+    RTCM Message Class.
+
+    Decoded payload attributes are held in a compact list of values,
+    together with a layout mapping attribute names to list indices
+    which is shared between messages of the same identity and shape.
+    Attributes are accessed by name in the normal way e.g. `msg.DF405_17`.
+
+    The object is immutable - internal state is only ever set (using
+    `object.__setattr__`) by the constructor and decoder, so decoding
+    does not incur the overhead of the `__setattr__` immutability guard.
+    """
+
+    __slots__ = (
+        "_decoded",
+        "_payload",
+        "_labelmsm",
+        "_fields",
+        "_unknown",
+        "_satmap",
+        "_cellmap",
+        "_values",
+        "_layout",
+        "_payloadi",
+        "_payblen",
+        "_refs",
+        "_shape",
+        "_strpos",
+    )
+
+    def __init__(
+        self,
+        payload: bytes = None,
+        labelmsm: int = 1,
+        lazy: bool = False,
+        fields: frozenset = None,
+    ):
         """Constructor.
 
-        :param bytes payload: message payload (mandatory)
+        If lazy is True, the payload is not decoded until one of its attributes
+        is first accessed. Accessing a message header attribute (e.g. DF002,
+        DF003 or the epoch time) decodes the header only; accessing any other
+        attribute decodes the full payload. Any decoding error will be raised
+        on first access rather than on instantiation.
+
+        If fields is specified, only the named attributes are decoded (in
+        every repeating group); all other attributes are skipped, except those
+        which determine the payload structure (e.g. repeating group sizes and
+        MSM masks). Attempting to access any other attribute raises AttributeError.
+
+        :param bytes payload: message payload as bytes or (zero-copy) memoryview (mandatory)
         :param int labelmsm: MSM NSAT and NCELL attribute label (1 = RINEX, 2 = freq)
+        :param bool lazy: defer decoding of payload until first access (False)
+        :param frozenset fields: names of attributes to decode e.g. \
+            {"DF004", "DF405", "DF406"} (None = all)
         :raises: RTCMMessageError
         """
 
-        # object is mutable during initialisation only
-        super().__setattr__("_immutable", False)
-
-        self._payload = payload
-        if self._payload is None:
+        if payload is None:
             raise RTCMMessageError("Payload must be specified")
-        self._payloadi = int.from_bytes(self._payload, "big")  # payload as int
-        self._payblen = len(self._payload) * 8  # length of payload in bits
-        self._labelmsm = labelmsm
-        self._unknown = False
-        self._satmap = None
-        self._cellmap = None
-        self._do_attributes()
+        _setattr(self, "_decoded", DECODED_NONE)
+        _setattr(self, "_payload", payload)
+        _setattr(self, "_labelmsm", labelmsm)
+        if fields is not None and not isinstance(fields, frozenset):
+            fields = frozenset(fields)
+        _setattr(self, "_fields", fields)
+        _setattr(self, "_unknown", False)
+        _setattr(self, "_satmap", None)
+        _setattr(self, "_cellmap", None)
+        _setattr(self, "_values", None)  # decoded attribute values
+        _setattr(self, "_layout", None)  # attribute name to value index mapping
+        _setattr(self, "_payloadi", None)
+        _setattr(self, "_payblen", 0)
+        _setattr(self, "_refs", None)
+        _setattr(self, "_shape", None)
+        _setattr(self, "_strpos", None)
+        if not lazy:
+            self._do_attributes()
+
+    def __getattr__(self, name: str) -> object:
+        """
+        Get payload attribute value by name, decoding payload on first
+        access if necessary (lazy mode only).
+
+        Only invoked if the name is not a class or instance attribute.
+
+        :param str name: attribute name
+        :return: attribute value
+        :rtype: object
+        :raises: AttributeError if attribute does not exist
+        :raises: RTCMTypeError if payload cannot be decoded
+        """
 
-        self._immutable = True  # once initialised, object is immutable
+        if name[:2] != "__" and name not in RTCMMessage.__slots__:
+            while True:
+                layout = self._layout
+                if layout is not None and name in layout:
+                    return self._values[layout[name]]
+                # private attributes do not trigger decoding
+                if name[0] == "_" or self._decoded == DECODED_FULL:
+                    break
+                if self._decoded == DECODED_NONE:
+                    hdr = get_header_plan(self.identity)
+                    self._decode(
+                        hdr is not None and name in hdr[1] and self._fields is None
+                    )
+                else:
+                    self._decode()
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'"
+        )
+
+    def __getstate__(self) -> dict:
+        """
+        Get object state for pickling.
+
+        :return: state
+        :rtype: dict
+        """
+
+        state = {att: getattr(self, att) for att in RTCMMessage.__slots__}
+        state["_payload"] = self.payload  # memoryview cannot be pickled
+        return state
+
+    def __setstate__(self, state: dict):
+        """
+        Restore object state when unpickling.
+
+        :param dict state: state
+        """
 
-    def _do_attributes(self):
+        for att, val in state.items():
+            _setattr(self, att, val)
+
+    def _decode(self, header: bool = False):
+        """
+        Decode deferred (lazy) payload.
+
+        :param bool header: decode message header only (False)
+        :raises: RTCMTypeError
         """
-        Populate RTCMMessage attributes from payload.
 
+        self._do_attributes(header)
+
+    def _do_attributes(self, header: bool = False):
+        """
+        Populate RTCMMessage attributes from payload by executing
+        the compiled decode plan for this message identity.
+
+        :param bool header: decode message header attributes only (False)
         :raises: RTCMTypeError
         """
 
         offset = 0  # payload offset in bits
-        index = []  # array of (nested) group indices
         anam = ""
         try:
-            # get payload definition dict for this message identity
-            pdict = self._get_dict()
-            if pdict is None:  # unknown (or not yet implemented) message identity
+            # get compiled decode plan for this message identity
+            if header:
+                plan, _, nbits = get_header_plan(self.identity)
+                nbytes = (nbits + 7) // 8
+                _setattr(self, "_decoded", DECODED_HEADER)
+            else:
+                plan = get_plan(self.identity, self._fields)
+                nbytes = len(self._payload)
+                _setattr(self, "_decoded", DECODED_FULL)
+            if plan is None:  # unknown (or not yet implemented) message identity
                 self._do_unknown()
                 return
-            for anam in pdict:  # process each attribute in dict
-                offset, index = self._set_attribute(anam, pdict, offset, index)
+            # payload (or header portion of payload) as int
+            _setattr(self, "_payloadi", int.from_bytes(self._payload[:nbytes], "big"))
+            _setattr(self, "_payblen", nbytes * 8)  # length in bits
+            _setattr(self, "_values", [])
+            _setattr(self, "_refs", {})  # values of referenced attributes
+            _setattr(self, "_shape", [])  # group sizes and condition outcomes
+            _setattr(self, "_strpos", {})  # value indices of concatenated strings
+            for op in plan:  # process each top level operation in plan
+                anam = op[1]
+                offset = self._exec_plan((op,), offset, [])
+            _setattr(
+                self,
+                "_layout",
+                get_layout(
+                    self.identity, plan, tuple(self._shape), header, self._fields
+                ),
+            )
 
+        except RTCMTypeError:
+            raise
         except Exception as err:  # pragma: no cover
             raise RTCMTypeError(
                 (
@@ -90,189 +264,163 @@ class RTCMMessage:
                     f"in message type {self.identity} {err}"
                 )
             ) from err
+        finally:  # discard working storage
+            for att in WORKING_SLOTS:
+                _setattr(self, att, None)
 
-    def _set_attribute(self, anam: str, pdict: dict, offset: int, index: list) -> tuple:
-        """
-        Recursive routine to set individual, conditional or grouped payload attributes.
-
-        :param str anam: attribute name
-        :param dict pdict: dict representing payload definition
-        :param int offset: payload offset in bits
-        :param list index: repeating group index array
-        :return: (offset, index[])
-        :rtype: tuple
-
+    def _exec_plan(self, plan: tuple, offset: int, index: list) -> int:
         """
+        Recursive routine to execute compiled decode plan against payload,
+        appending individual, conditional or grouped payload attribute
+        values to the value list.
 
-        adef = pdict[anam]  # get attribute definition
-        if isinstance(adef, tuple):  # attribute group
-            gtyp, _ = adef
-            if isinstance(gtyp, tuple):  # conditional group of attributes
-                offset, index = self._set_attribute_optional(adef, offset, index)
-            else:  # repeating group of attributes
-                offset, index = self._set_attribute_group(adef, offset, index)
-        else:  # single attribute
-            offset = self._set_attribute_single(anam, offset, index)
-
-        return offset, index
+        No attribute names are generated during decoding - these are
+        provided by the cached attribute layout. Referenced attributes
+        within repeating groups are keyed on (name, group indices) tuples
+        e.g. ("DF379", 1) rather than on their indexed names e.g. "DF379_01".
 
-    def _set_attribute_optional(self, adef: tuple, offset: int, index: list) -> tuple:
-        """
-        Process conditional group of attributes - group is present if attribute value
-        = specific value, otherwise absent.
-
-        :param tuple adef: attribute definition - tuple of ((attribute name, condition), group dict)
+        :param tuple plan: compiled decode plan
         :param int offset: payload offset in bits
         :param list index: repeating group index array
-        :return: (offset, index[])
-        :rtype: tuple
+        :return: offset
+        :rtype: int
         """
 
-        (anam, con), gdict = adef  # (attribute name, condition), group dictionary
-        # "+n" suffix signifies that one or more nested group indices
-        # must be appended to name e.g. "DF379_01", "IDF023_03"
-        # if "+" in anam:
-        #     anam, nestlevel = anam.split("+")
-        #     for i in range(int(nestlevel)):
-        #        anam += f"_{index[i]:02d}"
+        # pylint: disable=invalid-name, too-many-branches, too-many-locals
+
+        payloadi = self._payloadi
+        payblen = self._payblen
+        values = self._values
+        refs = self._refs
+        for op in plan:
+            if op[0] == OP_FIELD:  # single attribute
+                _, anam, typ, asiz, scale, msb, special, ref = op
+                if special == S_CELLMASK:  # this MSM attribute has variable length
+                    asiz = refs[NSAT] * refs[NSIG]
+                if typ == T_PRN:
+                    val = self._satmap[index[0]]
+                elif typ == T_CELPRN:
+                    val = self._cellmap[index[0]][0]
+                elif typ == T_CELSIG:
+                    val = self._cellmap[index[0]][1]
+                else:
+                    # get value of required number of bits at current payload offset
+                    bits = payloadi >> (payblen - offset - asiz) & ((1 << asiz) - 1)
+                    if typ == T_UINT:
+                        val = bits
+                    elif typ == T_INT:  # 2's complement int
+                        val = bits - ((bits & msb) << 1)
+                    elif typ == T_INTS:  # int, MSB indicates sign
+                        val = bits & msb - 1
+                        if bits & msb:
+                            val = -val
+                    elif typ == T_CHA:
+                        val = chr(bits)
+                    else:  # T_STR
+                        val = "" if bits == 0 else chr(bits)
+                    if scale:  # apply any scaling factor
+                        val *= scale
+                offset += asiz
+
+                if typ == T_STR:  # concatenated string
+                    pos = self._strpos.get(anam, None)
+                    if pos is None:
+                        self._strpos[anam] = len(values)
+                        values.append(val)
+                    else:
+                        values[pos] += val
+                else:
+                    values.append(val)
+                if ref:  # value is referenced later in plan
+                    refs[(anam, *index) if index else anam] = val
+
+                if special:
+                    self._set_special(anam, special, bits, index)
+
+            elif op[0] == OP_SKIP:  # unwanted attribute(s)
+                offset += op[2]
+
+            elif op[0] == OP_COND:  # conditional group of attributes
+                _, _, anam, con, gplan = op
+                met = refs[anam] == con
+                self._shape.append(met)
+                if met:  # if condition is met...
+                    offset = self._exec_plan(gplan, offset, index)
+
+            else:  # OP_GROUP or OP_RUN repeating group of attributes
+                _, _, gsiz, nest, incr, gplan = op
+                # derive or retrieve number of items in group
+                # number of repeats may be defined in named attribute
+                if isinstance(gsiz, str):
+                    # nest signifies that one or more nested group indices
+                    # form part of the reference key e.g. ("DF379", 1)
+                    if nest:
+                        gsiz = (gsiz, *index[:nest])
+                    # derived size may be negative e.g. SSR coefficients if M > N
+                    gsiz = max(refs[gsiz] + incr, 0)
+                self._shape.append(gsiz)
+                if op[0] == OP_RUN:  # extract whole run of values in one pass
+                    if gplan[0] == OP_SKIP:  # unwanted attribute(s)
+                        offset += gsiz * gplan[2]
+                    elif gsiz:
+                        _, _, typ, asiz, scale, msb, _, _ = gplan
+                        rlen = gsiz * asiz
+                        run = payloadi >> (payblen - offset - rlen) & ((1 << rlen) - 1)
+                        mask = (1 << asiz) - 1
+                        vals = [run >> i & mask for i in range(rlen - asiz, -1, -asiz)]
+                        if typ == T_INT:  # 2's complement int
+                            vals = [v - ((v & msb) << 1) for v in vals]
+                        elif typ == T_INTS:  # int, MSB indicates sign
+                            vals = [-(v & msb - 1) if v & msb else v for v in vals]
+                        if scale:  # apply any scaling factor
+                            vals = [v * scale for v in vals]
+                        values.extend(vals)
+                        offset += rlen
+                else:
+                    index.append(0)  # add a (nested) group index level
+                    for i in range(1, gsiz + 1):
+                        index[-1] = i
+                        offset = self._exec_plan(gplan, offset, index)
+                    index.pop()  # remove this (nested) group index
 
-        if getattr(self, anam) == con:  # if condition is met...
-            # recursively process each group attribute,
-            # incrementing the payload offset as we go
-            for anamg in gdict:
-                offset, index = self._set_attribute(anamg, gdict, offset, index)
-
-        return offset, index
+        return offset
 
-    def _set_attribute_group(self, adef: tuple, offset: int, index: list) -> tuple:
+    def _set_special(self, anam: str, special: int, bits: int, index: list):
         """
-        Process (nested) group of attributes.
+        Set special attributes which keep track of MSM message group sizes
+        and SSR harmonic coefficient group sizes.
 
-        :param tuple adef: attribute definition - tuple of (attr name, attribute dict)
-        :param int offset: payload offset in bits
-        :param list index: repeating group index array
-        :return: (offset, index[])
-        :rtype: tuple
-
-        """
-
-        anam, gdict = adef  # attribute signifying group size, group dictionary
-        # derive or retrieve number of items in group
-        if isinstance(anam, int):  # fixed number of repeats
-            gsiz = anam
-        else:  # number of repeats is defined in named attribute
-            # "+n" suffix signifies that one or more nested group indices
-            # must be appended to name e.g. "DF379_01", "IDF023_03"
-            if "+" in anam:
-                anam, nestlevel = anam.split("+")
-                for i in range(int(nestlevel)):
-                    anam += f"_{index[i]:02d}"
-            gsiz = getattr(self, anam)
-            if anam == "IDF035":  # 4076_201 range is N-1
-                gsiz += 1
-
-        index.append(0)  # add a (nested) group index level
-        # recursively process each group attribute,
-        # incrementing the payload offset and index as we go
-        for i in range(gsiz):
-            index[-1] = i + 1
-            for anamg in gdict:
-                offset, index = self._set_attribute(anamg, gdict, offset, index)
-
-        index.pop()  # remove this (nested) group index
-
-        return offset, index
-
-    def _set_attribute_single(
-        self,
-        anam: str,
-        offset: int,
-        index: list,
-    ) -> int:
-        """
-        Set individual attribute value, applying scaling where appropriate.
+        NB: MSM processing is predicated on MSM payload dictionaries
+        always having attributes DF394, DF395 and DF396 in that order.
 
         :param str anam: attribute name
-        :param int offset: payload offset in bits
+        :param int special: special processing code
+        :param int bits: raw attribute value
         :param list index: repeating group index array
-        :return: offset
-        :rtype: int
-
         """
 
-        # pylint: disable=invalid-name, line-too-long
-
-        # if attribute is part of a (nested) repeating group, suffix name with index
-        anami = anam
-        for i in index:  # one index for each nested level
-            if i > 0:
-                anami += f"_{i:02d}"
-
-        # get value of required number of bits at current payload offset
-        atyp, asiz, ares, _ = RTCM_DATA_FIELDS[anam]
-        if anam == "DF396":  # this MSM attribute has variable length
-            asiz = getattr(self, NSAT) * getattr(self, NSIG)
-        if atyp == PRN:
-            val = self._satmap[index[0]]
-        elif atyp == CELPRN:
-            val = self._cellmap[index[0]][0]
-        elif atyp == CELSIG:
-            val = self._cellmap[index[0]][1]
-        else:
-            # done inline for performance reasons...
-            bits = self._payloadi >> (self._payblen - offset - asiz) & ((1 << asiz) - 1)
-            msb = 1 << asiz - 1 if atyp in (INTS, INT) else 0
-            if atyp == INTS:  # int, MSB indicates sign
-                val = bits & msb - 1
-                if bits & msb:
-                    val *= -1
-            elif atyp == CHA:
-                val = chr(bits)
-            else:  # all other types
-                val = bits
-            if atyp == INT and bits & msb:  # 2's compliment -ve int
-                val -= 1 << asiz
-            if atyp == STR:
-                val = "" if val == 0 else chr(bits)
-            else:
-                if ares not in (0, 1):  # apply any scaling factor
-                    val *= ares
-
-        if atyp == STR:  # concatenated string
-            setattr(self, anam, getattr(self, anam, "") + val)
-        else:
-            setattr(self, anami, val)
-        offset += asiz
-
-        # add special attributes to keep track of
-        # MSM message group sizes
-        # NB: This is predicated on MSM payload dictionaries
-        # always having attributes DF394, DF395 and DF396
-        # in that order
-        if anam in ("DF394", "DF395", "DF396"):
-            nbits = bin(bits).count("1")  # number of bits set
-            if anam == "DF394":  # num of satellites in MSM message
-                setattr(self, NSAT, nbits)
-            elif anam == "DF395":  # num of signals in MSM message
-                setattr(self, NSIG, nbits)
-            elif anam == "DF396":  # num of cells in MSM message
-                setattr(self, NCELL, nbits)
-                # populate NSAT and NCELL mapping dictionaries
-                self._getsatcellmaps()
-
-        # set lengths of harmonic coefficient attributes for SSR messages
-        if anam in SSR_COEFF:
+        # pylint: disable=invalid-name
+
+        refs = self._refs
+        if special == S_SATMASK:  # num of satellites in MSM message
+            vals = {NSAT: bits.bit_count()}
+        elif special == S_SIGMASK:  # num of signals in MSM message
+            vals = {NSIG: bits.bit_count()}
+        elif special == S_CELLMASK:  # num of cells in MSM message
+            vals = {NCELL: bits.bit_count()}
+            # populate NSAT and NCELL mapping dictionaries
+            self._getsatcellmaps()
+        else:  # set lengths of harmonic coefficient attributes for SSR messages
             base1, base2 = SSR_COEFF[anam]
             i = index[0]
-            N = getattr(self, f"{base1}_{i:02d}") + 1
-            M = getattr(self, f"{base2}_{i:02d}") + 1
+            N = refs[(base1, i)] + 1
+            M = refs[(base2, i)] + 1
             nc = int(((N + 1) * (N + 2) / 2) - ((N - M) * (N - M + 1) / 2))
             ns = int(nc - (N + 1))
             # ncs = (N + 1) * (N + 1) - (N - M) * (N - M + 1)
-            setattr(self, NHARMCOEFFC, nc)
-            setattr(self, NHARMCOEFFS, ns)
-
-        return offset
+            vals = {NHARMCOEFFC: nc, NHARMCOEFFS: ns}
+        refs.update(vals)
+        self._values.extend(vals.values())
 
     def _getsatcellmaps(self):
         """
@@ -280,34 +428,12 @@ class RTCMMessage:
         bitmasks DF394, DF395 and DF396.
         """
 
-        prnmap, sigmap = PRNSIGMAP[str(self.identity)[0:3]]
-        sigcode = 0 if self._labelmsm == 2 else 1
-
-        self._satmap = {}
-        nsat = 0
-        for idx in range(65):
-            if getattr(self, "DF394") >> (64 - idx) & 1:
-                nsat += 1
-                self._satmap[nsat] = prnmap.get(idx, NA)
-
-        sigs = []
-        nsig = 0
-        for idx in range(33):
-            if getattr(self, "DF395") >> (32 - idx) & 1:
-                sgc = sigmap.get(idx, NA)
-                fqc = sgc[1] if sigcode else sgc[0]
-                sigs.append(fqc)
-                nsig += 1
-
-        ncells = nsat * nsig
-        self._cellmap = {}
-        ncell = idx = 0
-        for sat in range(nsat):
-            for sig in range(nsig):
-                idx += 1
-                if getattr(self, "DF396") >> (ncells - idx) & 1:
-                    ncell += 1
-                    self._cellmap[ncell] = (self._satmap[sat + 1], sigs[sig])
+        refs = self._refs
+        satmap, cellmap = get_satcellmaps(
+            self.identity, refs["DF394"], refs["DF395"], refs["DF396"], self._labelmsm
+        )
+        _setattr(self, "_satmap", satmap)
+        _setattr(self, "_cellmap", cellmap)
 
     def _get_dict(self) -> dict:
         """
@@ -318,19 +444,16 @@ class RTCMMessage:
         :rtype: dict or None
         """
 
-        if "1070" <= self.identity <= "1229":  # MSM types
-            return RTCM_PAYLOADS_GET_MSM.get(self.identity, None)
-        if self.identity[:4] == "4076":  # IGS types
-            return RTCM_PAYLOADS_GET_IGS.get(self.identity, None)
-        return RTCM_PAYLOADS_GET.get(self.identity, None)
+        return get_payload_dict(self.identity)
 
     def _do_unknown(self):
         """
         Handle unknown message type.
         """
 
-        setattr(self, "DF002", self.identity)
-        self._unknown = True
+        _setattr(self, "_values", [self.identity])
+        _setattr(self, "_layout", LAYOUT_UNKNOWN)
+        _setattr(self, "_unknown", True)
 
     def __str__(self) -> str:
         """
@@ -340,21 +463,20 @@ class RTCMMessage:
         :rtype: str
         """
 
-        stg = f"<RTCM({self.identity}, "
-        for i, att in enumerate(self.__dict__):
+        if self._decoded != DECODED_FULL:  # lazy payload not yet decoded
+            self._decode()
+        atts = []
+        values = self._values
+        for att, i in self._layout.items():
             if att[0] != "_":  # only show public attributes
-                val = self.__dict__[att]
+                val = values[i]
                 # escape all byte chars
                 if isinstance(val, bytes):  # pragma: no cover
                     val = escapeall(val)
-                stg += att + "=" + str(val)
-                if i < len(self.__dict__) - 1:
-                    stg += ", "
+                atts.append(f"{att}={val}")
         if self._unknown:
-            stg += ", Not_Yet_Implemented"
-        stg += ")>"
-
-        return stg
+            atts.append("Not_Yet_Implemented")
+        return f"<RTCM({self.identity}, {', '.join(atts)})>"
 
     def __repr__(self) -> str:
         """
@@ -366,23 +488,20 @@ class RTCMMessage:
         :rtype: str
         """
 
-        return f"RTCMMessage(payload={self._payload})"
+        return f"RTCMMessage(payload={self.payload})"
 
     def __setattr__(self, name, value):
         """
-        Override setattr to make object immutable after instantiation.
+        Override setattr to make object immutable.
 
         :param str name: attribute name
         :param object value: attribute value
         :raises: rtcmMessageError
         """
 
-        if self._immutable:
-            raise RTCMMessageError(
-                f"Object is immutable. Updates to {name} not permitted after initialisation."
-            )
-
-        super().__setattr__(name, value)
+        raise RTCMMessageError(
+            f"Object is immutable. Updates to {name} not permitted after initialisation."
+        )
 
     def serialize(self) -> bytes:
         """
@@ -408,13 +527,7 @@ class RTCMMessage:
         """
 
         try:
-            mid = self._payload[0] << 4 | self._payload[1] >> 4
-
-            if mid == 4076:  # proprietary IGS SSR message type
-                subtype = (self._payload[1] & 0x1) << 7 | self._payload[2] >> 1
-                mid = f"{mid}_{subtype:03d}"
-
-            return str(mid)
+            return get_identity(self._payload)
         except IndexError as err:
             raise RTCMStreamError(
                 f"Invalid payload size {len(self._payload)} bytes"
@@ -425,12 +538,15 @@ class RTCMMessage:
         """
         Payload getter - returns the raw payload bytes.
 
+        If the message was created from a memoryview (e.g. by
+        RTCMMappedReader), a copy of the payload is returned as bytes.
+
         :return: raw payload as bytes
         :rtype: bytes
 
         """
 
-        return self._payload
+        return bytes(self._payload)
 
     @property
     def ismsm(self) -> bool:
@@ -0,0 +1,358 @@
+"""
+RTCMMultiReader class.
+
+Reads and parses RTCM3 messages from many sources (sockets, serial
+ports, pipes or files) concurrently in a single thread, using the
+`selectors` module to wait until any source has data available.
+
+Each source has its own `RTCMReader`, with its own read-ahead
+(resynchronisation) buffer and message and error counters. Each
+message is returned tagged with the ID of the source it came from.
+
+A source is only read from once each time the selector reports it
+as readable, so the reader never blocks on an individual source.
+Sources which cannot be registered with the selector (e.g. regular
+files or in-memory streams) are treated as always readable.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: semuadmin © 2026
+:license: BSD 3-Clause
+"""
+
+import os
+import selectors
+from collections import deque
+from logging import getLogger
+from socket import socket
+
+from pyrtcm.rtcmreader import RTCMReader
+from pyrtcm.rtcmtypes_core import (
+    DEFAULT_READAHEAD,
+    ERR_LOG,
+    ERR_RAISE,
+    VALCKSUM,
+)
+
+
+class RTCMSource:
+    """
+    RTCMMultiReader source state. Provides the `read1(n)` stream
+    interface for the source's RTCMReader.
+    """
+
+    def __init__(self, sourceid: object, stream: object):
+        """Constructor.
+
+        :param object sourceid: source ID
+        :param object stream: input data stream
+        """
+
+        self.sourceid = sourceid
+        self.stream = stream
+        self.reader = None
+        self.selectable = False
+        self.readable = True  # data may be read without blocking
+        self.queued = False  # in queue of readable sources
+        self.eof = False
+        self.messages = 0
+        self.errors = 0
+        if isinstance(stream, socket):
+            self._read = stream.recv
+        elif hasattr(stream, "read1"):
+            self._read = stream.read1
+        elif hasattr(stream, "in_waiting"):  # e.g. serial port
+            self._read = self._read_waiting
+        else:
+            try:  # unbuffered stream with file descriptor e.g. pipe
+                self._fd = stream.fileno()
+                self._read = self._read_fd
+            except (AttributeError, OSError, ValueError):
+                self._read = stream.read
+
+    def read1(self, size: int) -> bytes:
+        """
+        Read up to size bytes from stream, if the source is readable.
+
+        :param int size: maximum number of bytes to read
+        :return: bytes
+        :rtype: bytes
+        :raises: BlockingIOError if no data can be read without blocking
+        """
+
+        if not self.readable:
+            raise BlockingIOError()
+        if self.selectable:  # one read per selector event
+            self.readable = False
+        data = self._read(size)
+        if data is None:  # non-blocking stream with no data available
+            raise BlockingIOError()
+        return data
+
+    read = read1
+
+    def _read_waiting(self, size: int) -> bytes:
+        """
+        Read no more than the number of bytes waiting in the stream's
+        input buffer, so that the read does not block.
+
+        :param int size: maximum number of bytes to read
+        :return: bytes
+        :rtype: bytes
+        """
+
+        waiting = self.stream.in_waiting
+        if callable(waiting):
+            waiting = waiting()
+        return self.stream.read(min(size, max(waiting, 1)))
+
+    def _read_fd(self, size: int) -> bytes:
+        """
+        Read up to size bytes from the stream's file descriptor with a
+        single system call, returning whatever is currently available.
+
+        :param int size: maximum number of bytes to read
+        :return: bytes
+        :rtype: bytes
+        """
+
+        return os.read(self._fd, size)
+
+
+class RTCMMultiReader:
+    """
+    RTCMMultiReader class.
+    """
+
+    def __init__(
+        self,
+        validate: int = VALCKSUM,
+        quitonerror: int = ERR_LOG,
+        labelmsm: int = 1,
+        parsed: bool = True,
+        errorhandler: object = None,
+        readahead: int = DEFAULT_READAHEAD,
+        lazy: bool = False,
+        msgfilter: set = None,
+        timeout: float = None,
+        fields: set = None,
+        cache: object = None,
+        statistics: object = None,
+    ):  # pylint: disable=too-many-arguments
+        """Constructor.
+
+        :param int validate: 0 = ignore invalid checksum, 1 = validate checksum (1)
+        :param int quitonerror: ERR_IGNORE (0) = ignore errors,  ERR_LOG (1) = log continue,
+            ERR_RAISE (2) = (re)raise (1)
+        :param int labelmsm: MSM NSAT and NCELL attribute label (1 = RINEX, 2 = freq)
+        :param bool parsed: 1 = return raw and parsed data, 0 = return only raw data \
+            (parsed = None) (1)
+        :param object errorhandler: error handling function, called with \
+            (source ID, error) (None)
+        :param int readahead: maximum number of bytes to read from each \
+            source in each read (65536)
+        :param bool lazy: defer decoding of each message payload until one of its \
+            attributes is first accessed (False)
+        :param set msgfilter: set of message identities to be returned e.g. {"1005", "1077"}; \
+            frames of any other type are skipped without being parsed (None = all)
+        :param float timeout: maximum time in seconds to wait for data from \
+            any source (None = wait indefinitely)
+        :param set fields: names of attributes to be decoded e.g. {"DF004", "DF405"}; \
+            all other attributes are skipped (None = all)
+        :param object cache: RTCMMessageCache (or other object with a compatible \
+            `parse()` method) used to parse messages (None)
+        :param object statistics: RTCMStatistics object in which to record stream \
+            statistics, aggregated across all sources (None)
+        """
+
+        self._validate = validate
+        self._quitonerror = quitonerror
+        self._labelmsm = labelmsm
+        self._parsed = parsed
+        self._errorhandler = errorhandler
+        self._readahead = readahead
+        self._lazy = lazy
+        self._msgfilter = msgfilter
+        self._timeout = timeout
+        self._fields = None if fields is None else frozenset(fields)
+        self._cache = cache
+        self._statistics = statistics
+        self._sources = {}
+        self._queue = deque()  # readable sources, in round-robin order
+        self._selector = selectors.DefaultSelector()
+        self._logger = getLogger(__name__)
+
+    def __iter__(self):
+        """Iterator."""
+
+        return self
+
+    def __next__(self) -> tuple:
+        """
+        Return next item in iteration.
+
+        :return: tuple of (source ID, raw_data as bytes, parsed_data as RTCMMessage)
+        :rtype: tuple
+        :raises: StopIteration
+        """
+
+        sourceid, raw_data, parsed_data = self.read()
+        if raw_data is None:
+            raise StopIteration
+        return sourceid, raw_data, parsed_data
+
+    def add_source(self, stream: object, sourceid: object = None) -> object:
+        """
+        Add source to reader.
+
+        :param object stream: input data stream (socket or stream with read(n) method)
+        :param object sourceid: source ID (None = use stream)
+        :return: source ID
+        :rtype: object
+        :raises: ValueError if source ID is already in use
+        """
+
+        sourceid = stream if sourceid is None else sourceid
+        if sourceid in self._sources:
+            raise ValueError(f"Source {sourceid} already added")
+        src = RTCMSource(sourceid, stream)
+        src.reader = RTCMReader(
+            src,
+            validate=self._validate,
+            quitonerror=ERR_LOG,
+            labelmsm=self._labelmsm,
+            parsed=self._parsed,
+            errorhandler=lambda err: self._do_error(src, err),
+            readahead=self._readahead,
+            lazy=self._lazy,
+            msgfilter=self._msgfilter,
+            fields=self._fields,
+            cache=self._cache,
+            statistics=self._statistics,
+        )
+        try:
+            self._selector.register(stream, selectors.EVENT_READ, src)
+            src.selectable = True
+            src.readable = False
+        except (AttributeError, ValueError, OSError):  # e.g. regular file
+            self._enqueue(src)
+        self._sources[sourceid] = src
+        return sourceid
+
+    def remove_source(self, sourceid: object):
+        """
+        Remove source from reader. The source stream is not closed.
+
+        :param object sourceid: source ID
+        :raises: KeyError if source ID is not known
+        """
+
+        src = self._sources.pop(sourceid)
+        self._close(src)
+
+    def read(self) -> tuple:
+        """
+        Read next RTCM message from any source.
+
+        :return: tuple of (source ID, raw_data as bytes, parsed_data as RTCMMessage); \
+            (None, None, None) if all sources have ended or the timeout has elapsed
+        :rtype: tuple
+        :raises: RTCMStreamError, RTCMParseError, RTCMTypeError \
+            if quitonerror = ERR_RAISE
+        """
+
+        while True:
+            while self._queue:
+                src = self._queue[0]
+                try:
+                    raw_data, parsed_data = src.reader.read()
+                except BlockingIOError:  # wait for more data
+                    self._queue.popleft()
+                    src.queued = False
+                    continue
+                if raw_data is None:  # EOF
+                    self._close(src)
+                    continue
+                src.messages += 1
+                self._queue.rotate(-1)  # give next source a turn
+                return src.sourceid, raw_data, parsed_data
+            if not self._selector.get_map():  # no selectable sources remain
+                return None, None, None
+            events = self._selector.select(self._timeout)
+            if not events:  # timeout
+                return None, None, None
+            for key, _ in events:
+                key.data.readable = True
+                self._enqueue(key.data)
+
+    def _enqueue(self, src: RTCMSource):
+        """
+        Add source to queue of readable sources.
+
+        :param RTCMSource src: source
+        """
+
+        if not src.queued:
+            self._queue.append(src)
+            src.queued = True
+
+    def _close(self, src: RTCMSource):
+        """
+        Stop reading from source.
+
+        :param RTCMSource src: source
+        """
+
+        src.eof = True
+        if src.queued:
+            self._queue.remove(src)
+            src.queued = False
+        if src.selectable:
+            self._selector.unregister(src.stream)
+            src.selectable = False
+
+    def _do_error(self, src: RTCMSource, err: Exception):
+        """
+        Handle error from source, updating the source's error count.
+
+        :param RTCMSource src: source
+        :param Exception err: error message
+        :raises: Exception if quitonerror = 2
+        """
+
+        src.errors += 1
+        if self._quitonerror == ERR_RAISE:
+            raise err from err
+        if self._quitonerror == ERR_LOG:
+            # pass to error handler if there is one
+            if self._errorhandler is None:
+                self._logger.error("%s: %s", src.sourceid, err)
+            else:
+                self._errorhandler(src.sourceid, err)
+
+    @property
+    def sources(self) -> dict:
+        """
+        Getter for sources.
+
+        :return: dict of RTCMSource objects keyed on source ID
+        :rtype: dict
+        """
+
+        return self._sources
+
+    @property
+    def stats(self) -> dict:
+        """
+        Getter for per-source statistics.
+
+        :return: dict of {"messages": count, "errors": count, "eof": bool} \
+            keyed on source ID
+        :rtype: dict
+        """
+
+        return {
+            sid: {"messages": src.messages, "errors": src.errors, "eof": src.eof}
+            for sid, src in self._sources.items()
+        }
@@ -0,0 +1,476 @@
+"""
+RTCM payload decode plan compiler.
+
+Compiles the nested payload definition dictionaries in the
+`rtcmtypes_get*` modules into flat, precomputed decode plans
+which can be executed against a message payload without
+re-interpreting the definitions for every message.
+
+A decode plan is a tuple of operations, each of which is a tuple
+whose first element is the operation code:
+
+- ``(OP_FIELD, name, type, size, scale, msb, special, ref)`` - single attribute
+- ``(OP_GROUP, key, size, nest, increment, plan)`` - repeating group
+- ``(OP_COND, key, name, value, plan)`` - conditional group
+- ``(OP_RUN, key, size, nest, increment, field)`` - repeating group comprising a
+  single fixed-width integer attribute, which is extracted as a single run of values
+- ``(OP_SKIP, name, size)`` - one or more unwanted attributes occupying a fixed
+  number of bits, which are skipped without being decoded (field plans only)
+
+``ref`` signifies that the attribute value is referenced elsewhere in the
+plan (e.g. as a group size or condition) and must be retained during decoding.
+
+Plans are compiled once on first use and cached per message identity.
+A field plan, which decodes only a specified set of attributes, is derived
+from the full plan by replacing all other attributes with skip operations.
+
+Decoded attribute values are held in a flat list. The corresponding
+attribute names are held in a separate layout dictionary mapping each name
+to its index in the value list, which is shared by all messages of the same
+identity and payload 'shape' (i.e. repeating group sizes and conditional
+group outcomes). Attribute names are generated only when a layout is
+first created, and are interned so that names are shared between layouts.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: semuadmin © 2026
+:license: BSD 3-Clause
+"""
+
+from sys import intern
+
+from pyrtcm.exceptions import RTCMTypeError
+from pyrtcm.rtcmtypes_core import (
+    BIT,
+    BITX,
+    CELPRN,
+    CELSIG,
+    CHA,
+    EPOCH_FIELDS,
+    INT,
+    INTS,
+    NCELL,
+    NHARMCOEFFC,
+    NHARMCOEFFS,
+    NSAT,
+    NSIG,
+    PRN,
+    RTCM_DATA_FIELDS,
+    SSR_COEFF,
+    STR,
+    UINT,
+)
+from pyrtcm.rtcmtypes_get import RTCM_PAYLOADS_GET
+from pyrtcm.rtcmtypes_get_igs import RTCM_PAYLOADS_GET_IGS
+from pyrtcm.rtcmtypes_get_msm import RTCM_PAYLOADS_GET_MSM
+
+# operation codes
+OP_FIELD = 0
+"""Single attribute"""
+OP_GROUP = 1
+"""Repeating group of attributes"""
+OP_COND = 2
+"""Conditional group of attributes"""
+OP_RUN = 3
+"""Repeating group of single fixed-width integer attribute"""
+OP_SKIP = 4
+"""Unwanted attribute(s) to be skipped"""
+
+# attribute type codes
+T_UINT = 0
+"""Unsigned integer or bitfield"""
+T_INT = 1
+"""2's complement integer"""
+T_INTS = 2
+"""Sign-magnitude integer"""
+T_CHA = 3
+"""Character"""
+T_STR = 4
+"""Concatenated string"""
+T_PRN = 5
+"""Derived satellite PRN"""
+T_CELPRN = 6
+"""Derived cell PRN"""
+T_CELSIG = 7
+"""Derived cell signal ID"""
+
+TYPECODES = {
+    UINT: T_UINT,
+    BIT: T_UINT,
+    BITX: T_UINT,
+    INT: T_INT,
+    INTS: T_INTS,
+    CHA: T_CHA,
+    STR: T_STR,
+    PRN: T_PRN,
+    CELPRN: T_CELPRN,
+    CELSIG: T_CELSIG,
+}
+"""Map of RTCM data type to plan type code"""
+
+# special attribute codes
+S_NONE = 0
+"""No special processing"""
+S_SATMASK = 1
+"""MSM satellite mask DF394"""
+S_SIGMASK = 2
+"""MSM signal mask DF395"""
+S_CELLMASK = 3
+"""MSM cell mask DF396"""
+S_SSRCOEFF = 4
+"""SSR spherical harmonic degree/order attribute"""
+
+SPECIALS = {
+    "DF394": S_SATMASK,
+    "DF395": S_SIGMASK,
+    "DF396": S_CELLMASK,
+}
+"""Map of attribute name to special processing code"""
+
+RTCM_PLANS = {}
+"""Cache of compiled decode plans keyed on message identity"""
+RTCM_HDRPLANS = {}
+"""Cache of compiled header decode plans keyed on message identity"""
+RTCM_HDROFFSETS = {}
+"""Cache of station ID and epoch attribute bit offsets keyed on message identity"""
+RTCM_FIELDPLANS = {}
+"""Cache of compiled field plans keyed on message identity and field names"""
+RTCM_LAYOUTS = {}
+"""Cache of attribute layouts keyed on message identity, fields and payload shape"""
+LAYOUT_CACHE_SIZE = 4096
+"""Maximum number of cached attribute layouts"""
+
+SPECIAL_NAMES = {
+    S_SATMASK: (NSAT,),
+    S_SIGMASK: (NSIG,),
+    S_CELLMASK: (NCELL,),
+    S_SSRCOEFF: (NHARMCOEFFC, NHARMCOEFFS),
+}
+"""Map of special processing code to names of derived attributes"""
+
+
+def get_payload_dict(identity: str) -> dict:
+    """
+    Get payload definition dictionary corresponding to message identity.
+
+    :param str identity: message identity e.g. "1077"
+    :return: dictionary representing payload definition, or None if unknown
+    :rtype: dict or None
+    """
+
+    if "1070" <= identity <= "1229":  # MSM types
+        return RTCM_PAYLOADS_GET_MSM.get(identity, None)
+    if identity[:4] == "4076":  # IGS types
+        return RTCM_PAYLOADS_GET_IGS.get(identity, None)
+    return RTCM_PAYLOADS_GET.get(identity, None)
+
+
+def get_plan(identity: str, fields: frozenset = None) -> tuple:
+    """
+    Get compiled decode plan for message identity, compiling
+    and caching it on first use.
+
+    If fields is specified, the plan decodes only the named attributes
+    (plus any attributes which determine the payload structure, such as
+    repeating group sizes, conditions and MSM masks) - see `filter_plan()`.
+
+    :param str identity: message identity e.g. "1077"
+    :param frozenset fields: names of attributes to decode e.g. \
+        frozenset(("DF405", "DF406")) (None = all)
+    :return: decode plan, or None if message identity is unknown
+    :rtype: tuple or None
+    :raises: RTCMTypeError if payload definition is invalid
+    """
+
+    if fields is not None:
+        try:
+            return RTCM_FIELDPLANS[(identity, fields)]
+        except KeyError:
+            plan = get_plan(identity)
+            if plan is not None:
+                plan = filter_plan(plan, fields)
+            RTCM_FIELDPLANS[(identity, fields)] = plan
+            return plan
+    try:
+        return RTCM_PLANS[identity]
+    except KeyError:
+        pdict = get_payload_dict(identity)
+        plan = None if pdict is None else compile_plan(pdict, identity)
+        RTCM_PLANS[identity] = plan
+        return plan
+
+
+def get_header_plan(identity: str) -> tuple:
+    """
+    Get compiled decode plan for the message header i.e. the leading
+    run of fixed-length, non-derived attributes (e.g. DF002, DF003 and
+    the epoch time), compiling and caching it on first use. If the
+    header would comprise the entire payload, the header plan is empty.
+
+    :param str identity: message identity e.g. "1077"
+    :return: tuple of (header plan, set of header attribute names, length in bits),
+        or None if message identity is unknown
+    :rtype: tuple or None
+    :raises: RTCMTypeError if payload definition is invalid
+    """
+
+    try:
+        return RTCM_HDRPLANS[identity]
+    except KeyError:
+        plan = get_plan(identity)
+        hdr = None
+        if plan is not None:
+            nops = nbits = 0
+            for op in plan:
+                if op[0] != OP_FIELD or op[2] > T_CHA or op[6] != S_NONE:
+                    break
+                nops += 1
+                nbits += op[3]
+            if nops == len(plan):  # no separate header
+                nops = nbits = 0
+            hdr = (plan[:nops], frozenset(op[1] for op in plan[:nops]), nbits)
+        RTCM_HDRPLANS[identity] = hdr
+        return hdr
+
+
+def get_header_offsets(identity: str) -> tuple:
+    """
+    Get fixed payload bit offsets and sizes of the reference station ID
+    (DF003) and GNSS epoch time attributes for message identity, if these
+    are present in the leading fixed-length portion of the payload.
+
+    :param str identity: message identity e.g. "1077"
+    :return: tuple of (station, epoch), each a tuple of (offset, size) or None
+    :rtype: tuple
+    """
+
+    try:
+        return RTCM_HDROFFSETS[identity]
+    except KeyError:
+        stn = epoch = None
+        offset = 0
+        for key, adef in (get_payload_dict(identity) or {}).items():
+            if isinstance(adef, tuple) or key in SPECIALS:  # variable offsets
+                break
+            asiz = RTCM_DATA_FIELDS[key][1]
+            if key == "DF003" and stn is None:
+                stn = (offset, asiz)
+            elif key in EPOCH_FIELDS and epoch is None:
+                epoch = (offset, asiz)
+            offset += asiz
+        RTCM_HDROFFSETS[identity] = (stn, epoch)
+        return stn, epoch
+
+
+def compile_plan(pdict: dict, identity: str = "", refs: set = None) -> tuple:
+    """
+    Compile payload definition dictionary into decode plan.
+
+    :param dict pdict: payload definition dictionary
+    :param str identity: message identity (for error reporting only)
+    :param set refs: names of referenced attributes (None = derive from pdict)
+    :return: decode plan
+    :rtype: tuple
+    :raises: RTCMTypeError if payload definition is invalid
+    """
+
+    if refs is None:
+        refs = set(SPECIALS)
+        for bases in SSR_COEFF.values():
+            refs.update(bases)
+        _find_refs(pdict, refs)
+    plan = []
+    for key, adef in pdict.items():
+        try:
+            plan.append(_compile_op(key, adef, identity, refs))
+        except RTCMTypeError:
+            raise
+        except Exception as err:
+            raise RTCMTypeError(
+                (
+                    f"Error processing attribute '{key}' "
+                    f"in message type {identity} {err}"
+                )
+            ) from err
+    return tuple(plan)
+
+
+def filter_plan(plan: tuple, fields: frozenset) -> tuple:
+    """
+    Derive field plan from decode plan, replacing each attribute not named
+    in fields by an `OP_SKIP` operation, unless it is referenced elsewhere in
+    the plan or requires special processing (these are always decoded).
+    Adjacent skips are merged, and repeating groups which contain only
+    skipped attributes are converted to runs of skips (adjacent runs of
+    skips of the same size are also merged).
+
+    :param tuple plan: decode plan
+    :param frozenset fields: names of attributes to decode e.g. frozenset(("DF405",))
+    :return: field plan
+    :rtype: tuple
+    """
+
+    fplan = []
+    for op in plan:
+        if op[0] == OP_FIELD:
+            if op[1] not in fields and not op[6] and not op[7]:
+                op = (OP_SKIP, op[1], op[3])
+        elif op[0] == OP_COND:
+            op = op[:4] + (filter_plan(op[4], fields),)
+        elif op[0] == OP_RUN:
+            if op[5][1] not in fields:
+                op = op[:5] + ((OP_SKIP, op[5][1], op[5][3]),)
+        else:  # OP_GROUP
+            gplan = filter_plan(op[5], fields)
+            if len(gplan) == 1 and gplan[0][0] == OP_SKIP:
+                op = (OP_RUN,) + op[1:5] + gplan
+            else:
+                op = op[:5] + (gplan,)
+        prev = fplan[-1] if fplan else (None,)
+        if op[0] == OP_SKIP and prev[0] == OP_SKIP:
+            fplan[-1] = (OP_SKIP, prev[1], prev[2] + op[2])
+        elif (  # skipped runs of same size
+            op[0] == OP_RUN
+            and prev[0] == OP_RUN
+            and op[5][0] == prev[5][0] == OP_SKIP
+            and op[2:5] == prev[2:5]
+        ):
+            fplan[-1] = prev[:5] + ((OP_SKIP, prev[5][1], prev[5][2] + op[5][2]),)
+        else:
+            fplan.append(op)
+    return tuple(fplan)
+
+
+def _find_refs(pdict: dict, refs: set):
+    """
+    Recursively find names of attributes used as group sizes or conditions.
+
+    :param dict pdict: payload definition dictionary
+    :param set refs: set of referenced attribute names (updated in place)
+    """
+
+    for adef in pdict.values():
+        if isinstance(adef, tuple):
+            gtyp, gdict = adef
+            if isinstance(gtyp, tuple):
+                refs.add(gtyp[0])
+            elif isinstance(gtyp, str):
+                refs.add(gtyp.split("+")[0])
+            if isinstance(gdict, dict):  # invalid definitions reported by compiler
+                _find_refs(gdict, refs)
+
+
+def _compile_op(key: str, adef: object, identity: str, refs: set) -> tuple:
+    """
+    Compile individual payload definition entry into plan operation.
+
+    :param str key: attribute or group name
+    :param object adef: attribute definition
+    :param str identity: message identity (for error reporting only)
+    :param set refs: names of referenced attributes
+    :return: plan operation
+    :rtype: tuple
+    """
+
+    if isinstance(adef, tuple):  # attribute group
+        gtyp, gdict = adef
+        if isinstance(gtyp, tuple):  # conditional group of attributes
+            anam, con = gtyp
+            return (OP_COND, key, anam, con, compile_plan(gdict, identity, refs))
+        # repeating group of attributes
+        nest = 0
+        if isinstance(gtyp, str) and "+" in gtyp:
+            gtyp, nest = gtyp.split("+")
+            nest = int(nest)
+        incr = 1 if gtyp == "IDF035" else 0  # 4076_201 range is N-1
+        gplan = compile_plan(gdict, identity, refs)
+        if len(gplan) == 1:
+            fop = gplan[0]
+            if fop[0] == OP_FIELD and fop[2] <= T_INTS and not fop[6] and not fop[7]:
+                return (OP_RUN, key, gtyp, nest, incr, fop)
+        return (OP_GROUP, key, gtyp, nest, incr, gplan)
+
+    # single attribute
+    atyp, asiz, ares, _ = RTCM_DATA_FIELDS[key]
+    typ = TYPECODES[atyp]
+    scale = ares if ares not in (0, 1) and typ not in (T_STR, T_CHA) else 0
+    msb = 1 << asiz - 1 if typ in (T_INT, T_INTS) else 0
+    special = S_SSRCOEFF if key in SSR_COEFF else SPECIALS.get(key, S_NONE)
+    return (OP_FIELD, key, typ, asiz, scale, msb, special, key in refs)
+
+
+def get_layout(
+    identity: str,
+    plan: tuple,
+    shape: tuple,
+    header: bool = False,
+    fields: frozenset = None,
+) -> dict:
+    """
+    Get attribute layout for decoded payload, generating and caching
+    it on first use.
+
+    The layout is a dictionary mapping each attribute name (in order of
+    first appearance) to the index of its value in the decoded value list.
+    If an attribute is set more than once, the last value applies.
+
+    :param str identity: message identity e.g. "1077"
+    :param tuple plan: decode plan used to decode payload
+    :param tuple shape: sequence of repeating group sizes and conditional \
+        group outcomes, in the order encountered during decoding
+    :param bool header: plan is header plan (False)
+    :param frozenset fields: plan is field plan for these attributes (None)
+    :return: attribute layout
+    :rtype: dict
+    """
+
+    key = (identity, header, fields, shape)
+    try:
+        return RTCM_LAYOUTS[key]
+    except KeyError:
+        names = []
+        _walk_names(plan, iter(shape), "", names, set())
+        layout = {}
+        for i, name in enumerate(names):
+            layout[name] = i
+        if len(RTCM_LAYOUTS) >= LAYOUT_CACHE_SIZE:
+            RTCM_LAYOUTS.clear()
+        RTCM_LAYOUTS[key] = layout
+        return layout
+
+
+def _walk_names(plan: tuple, shape: object, suffix: str, names: list, strs: set):
+    """
+    Recursive routine to generate attribute names in the order in which
+    the corresponding values are decoded.
+
+    :param tuple plan: decode plan
+    :param iterator shape: iterator over payload shape
+    :param str suffix: attribute name suffix for current group indices e.g. "_01_02"
+    :param list names: list of attribute names (updated in place)
+    :param set strs: names of concatenated string attributes already listed
+    """
+
+    for op in plan:
+        if op[0] == OP_FIELD:
+            anam = op[1]
+            if op[2] == T_STR:  # concatenated string has single value
+                if anam not in strs:
+                    strs.add(anam)
+                    names.append(anam)
+            else:
+                names.append(intern(anam + suffix))
+            if op[6]:
+                names.extend(SPECIAL_NAMES[op[6]])
+        elif op[0] == OP_GROUP:
+            for i in range(1, next(shape) + 1):
+                _walk_names(op[5], shape, f"{suffix}_{i:02d}", names, strs)
+        elif op[0] == OP_RUN:
+            nrun = next(shape)
+            if op[5][0] != OP_SKIP:  # skipped runs have no names
+                anam = op[5][1] + suffix
+                names.extend(intern(f"{anam}_{i:02d}") for i in range(1, nrun + 1))
+        elif op[0] == OP_COND:
+            if next(shape):
+                _walk_names(op[4], shape, suffix, names, strs)
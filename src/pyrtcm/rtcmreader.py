@@ -17,6 +17,13 @@ RTCM3 transport layer bit format:
 Returns both the raw binary data (as bytes) and the parsed data
 (as RTCMMessage object).
 
+Data is read from the stream in blocks into an internal read-ahead
+buffer, from which complete frames are extracted by slicing.
+
+If the datastream is None, the reader performs no I/O of its own;
+data is passed to it via `feed()` and the read methods raise
+BlockingIOError whenever more data is needed.
+
 Created on 14 Feb 2022
 
 :author: semuadmin (Steve Smith)
@@ -35,9 +42,12 @@ from pyrtcm.exceptions import (
     RTCMStreamError,
     RTCMTypeError,
 )
-from pyrtcm.rtcmhelpers import calc_crc24q
+from pyrtcm.rtcmhelpers import calc_crc24q, get_identity
 from pyrtcm.rtcmmessage import RTCMMessage
+from pyrtcm.rtcmplan import get_header_offsets
+from pyrtcm.rtcmscanner import RTCMScanner
 from pyrtcm.rtcmtypes_core import (
+    DEFAULT_READAHEAD,
     ENCODE_NONE,
     ERR_LOG,
     ERR_RAISE,
@@ -60,10 +70,16 @@ class RTCMReader:
         parsed: bool = True,
         errorhandler: object = None,
         encoding: int = ENCODE_NONE,
+        readahead: int = DEFAULT_READAHEAD,
+        lazy: bool = False,
+        msgfilter: set = None,
+        fields: set = None,
+        cache: object = None,
+        statistics: object = None,
     ):  # pylint: disable=too-many-arguments
         """Constructor.
 
-        :param datastream stream: input data stream
+        :param datastream stream: input data stream (None = data is passed via `feed()`)
         :param int validate: 0 = ignore invalid checksum, 1 = validate checksum (1)
         :param int quitonerror: ERR_IGNORE (0) = ignore errors,  ERR_LOG (1) = log continue,
             ERR_RAISE (2) = (re)raise (1)
@@ -74,6 +90,18 @@ class RTCMReader:
         :param object errorhandler: error handling object or function (None)
         :param int encoding: encoding for socket stream \
             (0 = none, 1 = chunk, 2 = gzip, 4 = compress, 8 = deflate (can be OR'd)) (0)
+        :param int readahead: maximum number of bytes to read ahead from the stream \
+            into the internal frame buffer; 0 = read only the bytes required (65536)
+        :param bool lazy: defer decoding of each message payload until one of its \
+            attributes is first accessed (False)
+        :param set msgfilter: set of message identities to be returned e.g. {"1005", "1077"}; \
+            frames of any other type are skipped without being parsed (None = all)
+        :param set fields: names of attributes to be decoded e.g. {"DF004", "DF405"}; \
+            all other attributes are skipped (None = all)
+        :param object cache: RTCMMessageCache (or other object with a compatible \
+            `parse()` method) used to parse messages (None)
+        :param object statistics: RTCMStatistics object in which to record stream \
+            statistics (None)
         :raises: RTCMStreamError (if mode is invalid)
         """
 
@@ -86,6 +114,16 @@ class RTCMReader:
         self._validate = validate
         self._labelmsm = labelmsm
         self._parsed = parsed
+        self._lazy = lazy
+        self._msgfilter = msgfilter
+        self._fields = None if fields is None else frozenset(fields)
+        self._parse = self.parse if cache is None else cache.parse
+        self._statistics = statistics
+        self._readahead = readahead
+        # use read1() if stream supports it, as this will not block
+        # waiting for more data than is currently available
+        self._read1 = getattr(self._stream, "read1", None)
+        self._scanner = RTCMScanner(statistics=statistics)  # read-ahead buffer
         self._logger = getLogger(__name__)
 
     def __iter__(self):
@@ -119,86 +157,189 @@ class RTCMReader:
         :raises: RTCMStreamError (if unrecognised protocol in data stream)
         """
 
-        parsing = True
+        return self._read(False)
+
+    def read_header(self) -> tuple:
+        """
+        Read a single RTCM message from the stream buffer
+        and return the raw data and message header only, without
+        parsing the payload.
+
+        'quitonerror' determines whether to raise, log or ignore parsing errors.
+
+        :return: tuple of (raw_data as bytes, header as tuple of \
+            (identity, station ID, epoch time) - see `parse_header()`)
+        :rtype: tuple
+        :raises: RTCMStreamError (if unrecognised protocol in data stream)
+        """
+
+        return self._read(True)
+
+    def _read(self, header: bool) -> tuple:
+        """
+        Read next RTCM message of required type from the stream buffer.
+
+        :param bool header: return message header rather than parsed message
+        :return: tuple of (raw_data as bytes, parsed data or header)
+        :rtype: tuple
+        """
 
-        while parsing:  # loop until end of valid message or EOF
+        statistics = self._statistics
+        while True:  # loop until end of valid message or EOF
             try:
-                raw_data = None
-                parsed_data = None
-                byte1 = self._read_bytes(1)  # read the first byte
-                if byte1 != b"\xd3":
-                    # not RTCM3, discard and continue
+                raw_data = self._read_frame()
+                if statistics is not None:
+                    statistics.frame(raw_data)
+                if (
+                    self._msgfilter is not None
+                    and get_identity(raw_data[3:-3]) not in self._msgfilter
+                ):
                     continue
-                byte2 = self._read_bytes(1)
-                # if it's a RTCM3 message
-                # (byte1 = 0xd3; byte2 = 0b000000**)
-                if byte1 == b"\xd3" and (byte2[0] & ~0x03) == 0:
-                    raw_data, parsed_data = self._parse_rtcm3(byte1 + byte2)
-                    parsing = False
+                if header:
+                    parsed_data = self.parse_header(raw_data, validate=self._validate)
+                elif self._parsed:
+                    parsed_data = self._parse(
+                        raw_data,
+                        validate=self._validate,
+                        labelmsm=self._labelmsm,
+                        lazy=self._lazy,
+                        fields=self._fields,
+                    )
                 else:
-                    # not RTCM3, discard and continue
-                    continue
+                    return raw_data, None
+                if statistics is not None:
+                    statistics.decoded()
+                return raw_data, parsed_data
 
             except EOFError:
                 return None, None
+            except IndexError:  # payload too short to contain identity
+                if statistics is not None:
+                    statistics.error()
+                if self._quitonerror:
+                    self._do_error(
+                        RTCMStreamError(
+                            f"Invalid payload size {len(raw_data) - 6} bytes"
+                        )
+                    )
             except (
                 RTCMMessageError,
                 RTCMParseError,
                 RTCMStreamError,
                 RTCMTypeError,
             ) as err:
+                if statistics is not None:
+                    statistics.error(
+                        isinstance(err, RTCMParseError)
+                        and self._validate & VALCKSUM
+                        and calc_crc24q(raw_data) != 0
+                    )
                 if self._quitonerror:
                     self._do_error(err)
-                continue
 
-        return raw_data, parsed_data
+    def frames(self):
+        """
+        Generator which returns only the raw data of each RTCM3 frame
+        in the stream, without constructing RTCMMessage objects. Intended
+        for relays which forward frames unaltered.
+
+        If 'validate' includes VALCKSUM, frames with an invalid CRC are
+        treated as errors; 'quitonerror' determines whether to raise, log
+        or ignore these. Any 'msgfilter' is applied before the CRC check,
+        so the CRCs of unwanted frames are not calculated.
+
+        :return: generator of raw RTCM3 frames (as bytes, or memoryview \
+            if read by RTCMMappedReader)
+        :rtype: generator
+        :raises: RTCMStreamError, RTCMParseError if quitonerror = ERR_RAISE
+        """
+
+        validate = self._validate & VALCKSUM
+        msgfilter = self._msgfilter
+        statistics = self._statistics
+        while True:
+            try:
+                raw_data = self._read_frame()
+                if statistics is not None:
+                    statistics.frame(raw_data)
+                if (
+                    msgfilter is not None
+                    and get_identity(raw_data[3:-3]) not in msgfilter
+                ):
+                    continue
+                if validate and calc_crc24q(raw_data):
+                    raise RTCMParseError(
+                        f"RTCM3 message invalid - failed CRC: {bytes(raw_data[-3:])}"
+                    )
+                yield raw_data
+
+            except EOFError:
+                return
+            except IndexError:  # payload too short to contain identity
+                if statistics is not None:
+                    statistics.error()
+                if self._quitonerror:
+                    self._do_error(
+                        RTCMStreamError(
+                            f"Invalid payload size {len(raw_data) - 6} bytes"
+                        )
+                    )
+            except (RTCMParseError, RTCMStreamError) as err:
+                if statistics is not None:  # RTCMParseError = CRC failure
+                    statistics.error(isinstance(err, RTCMParseError))
+                if self._quitonerror:
+                    self._do_error(err)
 
-    def _parse_rtcm3(self, hdr: bytes) -> tuple:
+    def _read_frame(self) -> bytes:
         """
-        Parse any RTCM3 data in the stream.
+        Read data from stream into read-ahead buffer until it contains
+        a complete RTCM3 frame, and return frame.
 
-        :param bytes hdr: first 2 bytes of RTCM3 header
-        :return: tuple of (raw_data as bytes, parsed_stub as RTCMMessage)
-        :rtype: tuple
-        :raises: RTCMStreamError
-        """
-
-        hdr3 = self._read_bytes(1)
-        size = (hdr[1] << 8) | hdr3[0]
-        if size == 0:
-            raise RTCMStreamError(f"Invalid payload size {size} bytes")
-        payload = self._read_bytes(size)
-        crc = self._read_bytes(3)
-        raw_data = hdr + hdr3 + payload + crc
-        if self._parsed:
-            parsed_data = self.parse(
-                raw_data,
-                validate=self._validate,
-                labelmsm=self._labelmsm,
-            )
-        else:
-            parsed_data = None
-        return raw_data, parsed_data
+        :return: raw RTCM3 frame including header and CRC
+        :rtype: bytes
+        :raises: EOFError if stream ends
+        :raises: RTCMStreamError if frame is invalid or truncated
+        :raises: BlockingIOError if datastream is None and more data is needed
+        """
+
+        scanner = self._scanner
+        raw_data = scanner.scan()
+        while raw_data is None:
+            scanner.feed(self._read_ahead(scanner.needed))
+            raw_data = scanner.scan()
+        return raw_data
+
+    def feed(self, data: bytes):
+        """
+        Add data to read-ahead buffer, for a reader with no datastream.
+        Empty data signifies end of stream.
+
+        :param bytes data: data
+        """
 
-    def _read_bytes(self, size: int) -> bytes:
+        self._scanner.feed(data)
+
+    def _read_ahead(self, size: int) -> bytes:
         """
-        Read a specified number of bytes from stream.
+        Read block of data from stream. Reads up to 'readahead' bytes if
+        this can be done without blocking, otherwise the number of bytes required.
 
-        :param int size: number of bytes to read
+        :param int size: number of bytes required
         :return: bytes
         :rtype: bytes
-        :raises: EOFError if stream ends prematurely
+        :raises: BlockingIOError if datastream is None
         """
 
-        data = self._stream.read(size)
-        if len(data) == 0:  # EOF
-            raise EOFError()
-        if 0 < len(data) < size:  # truncated stream
-            raise RTCMStreamError(
-                "Serial stream terminated unexpectedly. "
-                f"{size} bytes requested, {len(data)} bytes returned."
-            )
-        return data
+        if self._stream is None:  # wait for data to be fed
+            raise BlockingIOError()
+        if self._readahead:
+            if self._read1 is not None:
+                return self._read1(max(size, self._readahead))
+            waiting = getattr(self._stream, "in_waiting", 0)
+            if callable(waiting):
+                waiting = waiting()
+            size = max(size, min(waiting, self._readahead))
+        return self._stream.read(size)
 
     def _do_error(self, err: Exception):
         """
@@ -222,17 +363,34 @@ class RTCMReader:
         """
         Getter for stream.
 
+        NB: the reader reads ahead from the stream, so any data which has
+        been read into the internal buffer will not be available on the stream.
+
         :return: data stream
         :rtype: object
         """
 
         return self._stream
 
+    @property
+    def needed(self) -> int:
+        """
+        Getter for minimum number of further bytes needed to complete
+        the current frame, for a reader with no datastream.
+
+        :return: number of bytes
+        :rtype: int
+        """
+
+        return self._scanner.needed
+
     @staticmethod
     def parse(
         message: bytes,
         validate: int = VALCKSUM,
         labelmsm: int = 1,
+        lazy: bool = False,
+        fields: set = None,
     ) -> RTCMMessage:
         """
         Parse RTCM message to RTCMMessage object.
@@ -240,6 +398,8 @@ class RTCMReader:
         :param bytes message: RTCM raw message bytes
         :param int validate: 0 = don't validate CRC, 1 = validate CRC (1)
         :param int labelmsm: MSM NSAT and NCELL attribute label (1 = RINEX, 2 = freq)
+        :param bool lazy: defer decoding of payload until first attribute access (False)
+        :param set fields: names of attributes to be decoded (None = all)
         :return: RTCMMessage object
         :rtype: RTCMMessage
         :raises: RTCMParseError (if data stream contains invalid data or unknown message type)
@@ -248,7 +408,48 @@ class RTCMReader:
         if validate & VALCKSUM:
             if calc_crc24q(message):
                 raise RTCMParseError(
-                    f"RTCM3 message invalid - failed CRC: {message[-3:]}"
+                    f"RTCM3 message invalid - failed CRC: {bytes(message[-3:])}"
+                )
+        payload = message[3:-3]
+        return RTCMMessage(payload=payload, labelmsm=labelmsm, lazy=lazy, fields=fields)
+
+    @staticmethod
+    def parse_header(message: bytes, validate: int = VALCKSUM) -> tuple:
+        """
+        Parse message identity, reference station ID (DF003) and GNSS
+        epoch time from RTCM message by reading fixed payload bit offsets,
+        without constructing an RTCMMessage object.
+
+        Station ID and epoch are None if the message type does not
+        contain them (or is unknown).
+
+        :param bytes message: RTCM raw message bytes
+        :param int validate: 0 = don't validate CRC, 1 = validate CRC (1)
+        :return: tuple of (identity, station ID, epoch time)
+        :rtype: tuple
+        :raises: RTCMParseError (if CRC is invalid)
+        :raises: RTCMStreamError (if payload is too short)
+        """
+
+        if validate & VALCKSUM:
+            if calc_crc24q(message):
+                raise RTCMParseError(
+                    f"RTCM3 message invalid - failed CRC: {bytes(message[-3:])}"
                 )
         payload = message[3:-3]
-        return RTCMMessage(payload=payload, labelmsm=labelmsm)
+        try:
+            identity = get_identity(payload)
+        except IndexError as err:
+            raise RTCMStreamError(f"Invalid payload size {len(payload)} bytes") from err
+        vals = [identity]
+        for hdr in get_header_offsets(identity):
+            val = None
+            if hdr is not None:
+                offset, size = hdr
+                start, end = offset // 8, (offset + size + 7) // 8
+                if end > len(payload):
+                    raise RTCMStreamError(f"Invalid payload size {len(payload)} bytes")
+                val = int.from_bytes(payload[start:end], "big")
+                val = val >> (end * 8 - offset - size) & ((1 << size) - 1)
+            vals.append(val)
+        return tuple(vals)
@@ -0,0 +1,416 @@
+"""
+RINEXObsWriter class.
+
+Writes RINEX 3 or 4 observation files incrementally from a stream of
+decoded RTCM3 MSM4-7 messages, for all constellations in `PRNSIGMAP`.
+
+Messages for the same epoch (from any constellation) are assembled into
+a single RINEX epoch record by `RTCMEpochAssembler`, and written as soon
+as the last message of the epoch (DF393 multiple message bit = 0) is
+received, or when the epoch expires incomplete. Only pending epochs are
+buffered, so memory use is bounded regardless of the length of the stream.
+
+Full pseudorange (C, metres), carrier phase (L, cycles) and Doppler
+(D, Hz) observations are reconstructed from the satellite rough range
+(DF397, DF398), rough phase range rate (DF399) and the cell fine
+pseudorange, phase range and phase range rate fields, ignoring any
+invalid values. Signal strength (S, dBHz) is taken from the cell CNR.
+
+GLONASS carrier phase and Doppler require the satellite's frequency
+channel number, which is taken from MSM5/7 messages (DF419) or
+GLONASS ephemeris messages (1020) if these are present in the stream.
+The approximate station position is taken from any 1005/1006 message
+received before the first epoch is written.
+
+All epochs are written in GPS time.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: semuadmin © 2026
+:license: BSD 3-Clause
+"""
+
+from datetime import datetime, timedelta, timezone
+
+from pyrtcm._version import __version__ as VERSION
+from pyrtcm.rtcmepoch import GPSEPOCH, LEAPSECONDS, MS_WEEK, RTCMEpochAssembler
+from pyrtcm.rtcmhelpers import get_satcellmaps
+from pyrtcm.rtcmtables import (
+    CLIGHT,
+    FREQMAP,
+    MSM_INVALID_FINEPH,
+    MSM_INVALID_FINEPR,
+    MSM_INVALID_FINERATE,
+    MSM_INVALID_RATE,
+    MSM_INVALID_ROUGH,
+)
+
+RINEXSYS = {
+    "107": ("G", 0),
+    "108": ("R", 0),
+    "109": ("E", 0),
+    "110": ("S", 100),
+    "111": ("J", 192),
+    "112": ("C", 0),
+    "113": ("I", 0),
+}
+"""Map of MSM identity prefix to RINEX system identifier and PRN offset"""
+SYSORDER = "GREJCIS"
+"""Order in which systems are written"""
+OBSORDER = "CLDS"
+"""Order in which observation types are written for each signal"""
+
+# MSM cell attribute names for MSM4/5 and MSM6/7
+MSM_CELL_FIELDS = {
+    4: ("DF400", "DF401", "DF402", "DF403"),
+    6: ("DF405", "DF406", "DF407", "DF408"),
+}
+
+
+class RINEXObsWriter:
+    """
+    RINEXObsWriter class.
+    """
+
+    def __init__(
+        self,
+        stream: object,
+        version: str = "3.04",
+        date: datetime = None,
+        marker: str = "UNKNOWN",
+        observer: str = "",
+        agency: str = "",
+        obstypes: dict = None,
+        window: int = 1000,
+    ):  # pylint: disable=too-many-arguments
+        """Constructor.
+
+        The RINEX header is written when the first epoch is written. Unless
+        specified, the observation types for each system are those present
+        in the first epoch; any observation of another type in a later
+        epoch is not written (see `dropped`).
+
+        :param object stream: output text stream with write(str) method
+        :param str version: RINEX version "3.0n" or "4.0n" ("3.04")
+        :param datetime date: any (UTC) date and time within 3.5 days of the \
+            first epoch, used to resolve the week of MSM epoch times (None = now)
+        :param str marker: marker name ("UNKNOWN")
+        :param str observer: observer name ("")
+        :param str agency: agency name ("")
+        :param dict obstypes: observation types for each system \
+            e.g. {"G": ["C1C", "L1C", "D1C", "S1C"]} (None = from first epoch)
+        :param int window: time in ms after which an incomplete epoch \
+            is written (1000)
+        """
+
+        self._stream = stream
+        self._version = float(version)
+        if date is None:
+            date = datetime.now(timezone.utc)
+        if date.tzinfo is not None:
+            date = date.astimezone(timezone.utc).replace(tzinfo=None)
+        # reference time for week resolution, as ms since start of GPS time
+        self._ref = (date - GPSEPOCH) // timedelta(milliseconds=1)
+        self._ref += LEAPSECONDS * 1000
+        self._marker = marker
+        self._observer = observer
+        self._agency = agency
+        self._obstypes = obstypes
+        self._position = (0.0, 0.0, 0.0)
+        self._height = 0.0
+        self._glofcn = {}  # GLONASS frequency channel numbers keyed on slot
+        self._locks = {}  # lock time indicators keyed on (sat, signal)
+        self._assembler = RTCMEpochAssembler(window)
+        self._header = False
+        self._epochs = 0
+        self._dropped = 0
+
+    def __enter__(self):
+        """
+        Context manager enter routine.
+        """
+
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        """
+        Context manager exit routine. Writes any incomplete epochs.
+        """
+
+        self.flush()
+
+    def write(self, msg: object):
+        """
+        Process RTCM message. MSM4-7 messages are added to their epoch,
+        which is written when complete. 1005/1006 and 1020 messages
+        update the station position and GLONASS frequency channel numbers.
+        All other messages are ignored.
+
+        :param RTCMMessage msg: parsed RTCM message
+        """
+
+        identity = msg.identity
+        if identity in ("1005", "1006"):
+            self._position = (msg.DF025, msg.DF026, msg.DF027)
+            self._height = getattr(msg, "DF028", 0.0)
+            return
+        if identity == "1020":
+            self._glofcn[msg.DF038] = msg.DF040 - 7
+            return
+        if not msg.ismsm or identity[3] not in "4567":
+            return
+        for epoch in self._assembler.add(msg):
+            self._write(epoch)
+
+    def flush(self):
+        """
+        Write any pending incomplete epochs.
+        """
+
+        for epoch in self._assembler.flush():
+            self._write(epoch)
+
+    def _write(self, epoch: object):
+        """
+        Reconstruct observations from epoch's messages and write them,
+        preceded by the header if not already written.
+
+        :param MSMEpoch epoch: assembled epoch
+        """
+
+        tim = self._resolve(epoch.tow, MS_WEEK)
+        obs = {}
+        for msg in epoch.messages:
+            self._add_observations(msg, obs)
+        if not self._header:
+            self._write_header(tim, obs)
+        self._write_epoch(tim, obs)
+
+    def _resolve(self, tim: int, period: int) -> int:
+        """
+        Resolve time within period (e.g. time of week) to the absolute time
+        nearest the reference time, which is then updated.
+
+        :param int tim: time within period in ms
+        :param int period: period in ms
+        :return: absolute time in ms since start of GPS time
+        :rtype: int
+        """
+
+        ref = self._ref
+        tim = ref - ref % period + tim % period
+        if tim - ref > period // 2:
+            tim -= period
+        elif ref - tim > period // 2:
+            tim += period
+        self._ref = tim
+        return tim
+
+    def _add_observations(self, msg: object, epochobs: dict):
+        """
+        Reconstruct observations from MSM message and add them to epoch.
+
+        :param RTCMMessage msg: MSM4-7 message
+        :param dict epochobs: observations of epoch keyed on sat
+        """
+
+        # pylint: disable=too-many-locals
+
+        gnss = msg.identity[0:3]
+        msmtype = int(msg.identity[3])
+        sysid, offset = RINEXSYS[gnss]
+        freqs = FREQMAP[gnss]
+        prf, phf, lkf, cnf = MSM_CELL_FIELDS[6 if msmtype > 5 else 4]
+        hasrate = msmtype in (5, 7)
+        satmap, cellmap = get_satcellmaps(msg.identity, msg.DF394, msg.DF395, msg.DF396)
+
+        sats = {}  # (rough range, rough rate) keyed on PRN
+        for i, prn in satmap.items():
+            rough = getattr(msg, f"DF397_{i:02d}")
+            if rough == MSM_INVALID_ROUGH:
+                rough = None
+            else:
+                rough += getattr(msg, f"DF398_{i:02d}")
+            rate = getattr(msg, f"DF399_{i:02d}") if hasrate else MSM_INVALID_RATE
+            sats[prn] = (rough, None if rate == MSM_INVALID_RATE else rate)
+            if hasrate and sysid == "R":
+                fcn = getattr(msg, f"DF419_{i:02d}")
+                if fcn <= 13:
+                    self._glofcn[int(prn)] = fcn - 7
+
+        for i, (prn, sig) in cellmap.items():
+            if not prn.isdigit():  # e.g. GIOVE-A
+                continue
+            sat = f"{sysid}{int(prn) - offset:02d}"
+            rough, rate = sats[prn]
+            freq = freqs.get(sig[0], None)
+            if sysid == "R" and freq is not None:
+                fcn = self._glofcn.get(int(prn), None)
+                freq = None if fcn is None else freq[0] + fcn * freq[1]
+            obs = epochobs.setdefault(sat, {})
+            sfx = f"{i:02d}"
+            lock = getattr(msg, f"{lkf}_{sfx}")
+            lli = 2 if getattr(msg, f"DF420_{sfx}") else 0  # half-cycle ambiguity
+            if lock < self._locks.get((sat, sig), 0):  # loss of lock
+                lli |= 1
+            self._locks[(sat, sig)] = lock
+            cnr = getattr(msg, f"{cnf}_{sfx}")
+            ssi = min(max(int(cnr / 6), 1), 9) if cnr else 0
+            if rough is not None:
+                fine = getattr(msg, f"{prf}_{sfx}")
+                if fine != MSM_INVALID_FINEPR[prf]:
+                    obs[f"C{sig}"] = ((rough + fine) * CLIGHT / 1000, 0, 0)
+                fine = getattr(msg, f"{phf}_{sfx}")
+                if fine != MSM_INVALID_FINEPH[phf] and freq is not None:
+                    obs[f"L{sig}"] = ((rough + fine) * freq / 1000, lli, ssi)
+            if rate is not None and freq is not None:
+                fine = getattr(msg, f"DF404_{sfx}")
+                if fine != MSM_INVALID_FINERATE:
+                    obs[f"D{sig}"] = (-(rate + fine) * freq / CLIGHT, 0, 0)
+            if cnr:
+                obs[f"S{sig}"] = (cnr, 0, 0)
+
+    def _write_header(self, tim: int, epochobs: dict):
+        """
+        Write RINEX header, deriving observation types from the
+        first epoch if not specified.
+
+        :param int tim: time of first epoch in ms since start of GPS time
+        :param dict epochobs: observations of first epoch keyed on sat
+        """
+
+        if self._obstypes is None:
+            sigs = {}
+            for sat, obs in epochobs.items():
+                sigs.setdefault(sat[0], set()).update(code[1:] for code in obs)
+            self._obstypes = {
+                sysid: [
+                    f"{typ}{sig}"
+                    for sig in sorted(sigs[sysid])
+                    for typ in OBSORDER
+                    if any(f"{typ}{sig}" in obs for obs in epochobs.values())
+                ]
+                for sysid in SYSORDER
+                if sysid in sigs
+            }
+        systems = list(self._obstypes)
+        first = GPSEPOCH + timedelta(milliseconds=tim)
+        now = datetime.now(timezone.utc)
+
+        lines = [
+            _hdr(
+                f"{self._version:9.2f}{'':11}{'OBSERVATION DATA':20}"
+                f"{systems[0] if len(systems) == 1 else 'M':20}",
+                "RINEX VERSION / TYPE",
+            ),
+            _hdr(
+                f"{'pyrtcm ' + VERSION:20}{'':20}{now:%Y%m%d %H%M%S} UTC",
+                "PGM / RUN BY / DATE",
+            ),
+            _hdr(self._marker, "MARKER NAME"),
+            _hdr(f"{self._observer:20}{self._agency:40}", "OBSERVER / AGENCY"),
+            _hdr("", "REC # / TYPE / VERS"),
+            _hdr("", "ANT # / TYPE"),
+            _hdr("".join(f"{v:14.4f}" for v in self._position), "APPROX POSITION XYZ"),
+            _hdr(f"{self._height:14.4f}{0:14.4f}{0:14.4f}", "ANTENNA: DELTA H/E/N"),
+        ]
+        for sysid, types in self._obstypes.items():
+            for i in range(0, max(len(types), 1), 13):
+                pre = f"{sysid}  {len(types):3d}" if i == 0 else " " * 6
+                content = pre + "".join(f" {typ:3}" for typ in types[i : i + 13])
+                lines.append(_hdr(content, "SYS / # / OBS TYPES"))
+        lines.append(_hdr("DBHZ", "SIGNAL STRENGTH UNIT"))
+        lines.append(
+            _hdr(
+                f"{first.year:6d}{first.month:6d}{first.day:6d}{first.hour:6d}"
+                f"{first.minute:6d}{first.second + first.microsecond / 1e6:13.7f}"
+                f"{'':5}GPS",
+                "TIME OF FIRST OBS",
+            )
+        )
+        for sysid in systems:
+            lines.append(_hdr(sysid, "SYS / PHASE SHIFT"))
+        if "R" in systems:
+            slots = sorted(self._glofcn.items())
+            for i in range(0, max(len(slots), 1), 8):
+                pre = f"{len(slots):3d} " if i == 0 else " " * 4
+                content = pre + "".join(
+                    f"R{slot:02d} {fcn:2d} " for slot, fcn in slots[i : i + 8]
+                )
+                lines.append(_hdr(content, "GLONASS SLOT / FRQ #"))
+            lines.append(_hdr("", "GLONASS COD/PHS/BIS"))
+        lines.append(_hdr("", "END OF HEADER"))
+        self._stream.write("\n".join(lines) + "\n")
+        self._header = True
+
+    def _write_epoch(self, tim: int, epochobs: dict):
+        """
+        Write epoch record.
+
+        :param int tim: epoch time in ms since start of GPS time
+        :param dict epochobs: observations of epoch keyed on sat
+        """
+
+        tim = GPSEPOCH + timedelta(milliseconds=tim)
+        sats = []
+        for sat, obs in epochobs.items():
+            types = self._obstypes.get(sat[0], ())
+            self._dropped += sum(1 for code in obs if code not in types)
+            if types:
+                sats.append(sat)
+        if not sats:  # no observations of any header type
+            return
+        sats.sort(key=lambda sat: (SYSORDER.index(sat[0]), sat))
+        lines = [
+            f"> {tim:%Y %m %d %H %M}{tim.second + tim.microsecond / 1e6:11.7f}"
+            f"  0{len(sats):3d}"
+        ]
+        for sat in sats:
+            obs = epochobs[sat]
+            fields = [sat]
+            for typ in self._obstypes[sat[0]]:
+                if typ in obs:
+                    val, lli, ssi = obs[typ]
+                    fields.append(f"{val:14.3f}{lli or ' '}{ssi or ' '}")
+                else:
+                    fields.append(" " * 16)
+            lines.append("".join(fields).rstrip())
+        self._stream.write("\n".join(lines) + "\n")
+        self._epochs += 1
+
+    @property
+    def epochs(self) -> int:
+        """
+        Getter for number of epochs written.
+
+        :return: number of epochs
+        :rtype: int
+        """
+
+        return self._epochs
+
+    @property
+    def dropped(self) -> int:
+        """
+        Getter for number of observations not written because their
+        type is not in the header observation types.
+
+        :return: number of observations
+        :rtype: int
+        """
+
+        return self._dropped
+
+
+def _hdr(content: str, label: str) -> str:
+    """
+    Format RINEX header line.
+
+    :param str content: header content (up to 60 characters)
+    :param str label: header label
+    :return: header line
+    :rtype: str
+    """
+
+    return f"{content:60.60}{label}"
@@ -0,0 +1,196 @@
+"""
+RTCMScanner class.
+
+Sans-IO RTCM3 frame scanner, shared by all the readers in this package.
+The scanner performs no I/O of its own; the reader feeds it whatever
+bytes it has read from its stream and the scanner returns each complete
+frame (byte1 = 0xd3; byte2 = 0b000000**), discarding any non-RTCM3 data
+between frames. When the buffered data does not contain a complete
+frame, the scanner reports how many more bytes it needs.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: semuadmin © 2026
+:license: BSD 3-Clause
+"""
+
+from pyrtcm.exceptions import RTCMStreamError
+
+
+class RTCMScanner:
+    """
+    RTCMScanner class.
+    """
+
+    def __init__(
+        self, buffer: bytes = b"", view: object = None, statistics: object = None
+    ):
+        """Constructor.
+
+        :param bytes buffer: initial buffer contents e.g. a memory-mapped file (b"")
+        :param object view: object from which frames are sliced, if not the buffer \
+            itself e.g. a memoryview of the buffer (None)
+        :param object statistics: RTCMStatistics object in which to record \
+            discarded data (None)
+        """
+
+        self._buffer = buffer  # read-ahead buffer
+        self._view = buffer if view is None else view
+        self._pos = 0  # current position in read-ahead buffer
+        self._needed = 2  # minimum number of bytes needed to progress
+        self._eof = False
+        self._statistics = statistics
+
+    def feed(self, data: bytes):
+        """
+        Add data read from stream to buffer. Empty (or None) data
+        signifies end of stream.
+
+        :param bytes data: data read from stream
+        """
+
+        if data:
+            self._buffer = self._buffer[self._pos :] + data
+            self._view = self._buffer
+            self._pos = 0
+        else:
+            self._eof = True
+
+    def scan(self) -> bytes:
+        """
+        Scan buffer for next RTCM3 frame, discarding any non-RTCM3
+        data, and return complete frame.
+
+        :return: raw RTCM3 frame including header and CRC, or None \
+            if more data is needed
+        :rtype: bytes
+        :raises: EOFError if stream has ended
+        :raises: RTCMStreamError if frame is invalid or truncated
+        """
+
+        # fast path - complete frame at current position
+        buf = self._buffer
+        pos = self._pos
+        if len(buf) - pos > 2 and buf[pos] == 0xD3 and not buf[pos + 1] & 0xFC:
+            end = pos + ((buf[pos + 1] << 8) | buf[pos + 2]) + 6
+            if pos + 6 < end <= len(buf):
+                self._pos = end
+                return self._view[pos:end]
+        return self._scan()
+
+    def _scan(self) -> bytes:
+        """
+        Scan buffer for next RTCM3 frame, handling non-RTCM3 data,
+        incomplete frames and end of stream.
+
+        :return: raw RTCM3 frame including header and CRC, or None \
+            if more data is needed
+        :rtype: bytes
+        :raises: EOFError if stream has ended
+        :raises: RTCMStreamError if frame is invalid or truncated
+        """
+
+        eof = self._eof
+        buf = self._buffer
+        while True:
+            pos = self._pos
+            if len(buf) - pos < 2:
+                if eof:
+                    self._end()
+                self._needed = 2 - (len(buf) - pos)
+                return None
+            start = buf.find(b"\xd3", pos)
+            if start == -1:  # not RTCM3, discard and continue
+                self._discard(len(buf) - pos)
+                self._buffer = self._view = buf = b""
+                self._pos = 0
+                continue
+            if start != pos:  # discard any non-RTCM3 data
+                self._discard(start - pos)
+                self._pos = pos = start
+            avail = len(buf) - pos
+            if avail < 3 and not eof:
+                self._needed = 3 - avail
+                return None
+            hdr = buf[pos + 1 : pos + 3]
+            if len(hdr) < 1:
+                self._end()
+            if hdr[0] & ~0x03:  # not RTCM3, discard and continue
+                self._discard(2)
+                self._pos = pos + 2
+                continue
+            if len(hdr) < 2:
+                self._end()
+            size = (hdr[0] << 8) | hdr[1]
+            if size == 0:
+                self._discard(3)
+                self._pos = pos + 3
+                raise RTCMStreamError(f"Invalid payload size {size} bytes")
+            end = pos + size + 6
+            if len(buf) < end:
+                if not eof:
+                    self._needed = end - len(buf)
+                    return None
+                self._truncated(size, avail - 3)
+            self._pos = end
+            return self._view[pos:end]
+
+    def _end(self):
+        """
+        Handle end of stream, discarding any remaining data. The end of
+        stream flag is cleared, so that any data subsequently fed is read.
+
+        :raises: EOFError
+        """
+
+        self._discard(len(self._buffer) - self._pos)
+        self._buffer = self._view = b""
+        self._pos = 0
+        self._eof = False
+        raise EOFError()
+
+    def _truncated(self, size: int, avail: int):
+        """
+        Handle frame truncated by end of stream.
+
+        :param int size: payload size in bytes
+        :param int avail: number of bytes available after header
+        :raises: EOFError if stream ends on payload or CRC boundary
+        :raises: RTCMStreamError if stream ends within payload or CRC
+        """
+
+        self._discard(avail + 3)
+        self._buffer = self._view = b""
+        self._pos = 0
+        self._eof = False
+        if avail in (0, size):
+            raise EOFError()
+        if avail > size:
+            size, avail = 3, avail - size
+        raise RTCMStreamError(
+            "Serial stream terminated unexpectedly. "
+            f"{size} bytes requested, {avail} bytes returned."
+        )
+
+    def _discard(self, size: int):
+        """
+        Record number of bytes discarded from buffer.
+
+        :param int size: number of bytes discarded
+        """
+
+        if self._statistics is not None:
+            self._statistics.discard(size)
+
+    @property
+    def needed(self) -> int:
+        """
+        Getter for minimum number of further bytes needed before
+        the next call to `scan()` can make progress.
+
+        :return: number of bytes
+        :rtype: int
+        """
+
+        return self._needed
@@ -0,0 +1,162 @@
+"""
+RTCMStatistics class.
+
+Stream statistics collector for RTCMReader. When passed to a reader via
+its `statistics` argument, the reader records each frame as it is read,
+along with any CRC failures and other errors and any non-RTCM3 data
+discarded while resynchronising to the next frame. For each message
+identity, the collector holds the number of frames and bytes, the time
+taken to parse each message and the interval between successive frames.
+
+The overhead is one clock read and a few counter updates per frame, plus
+one clock read per parsed message, so statistics can be left enabled on
+production streams. Statistics are read as a snapshot dict via the
+`stats` property.
+
+Created on 18 Oct 2026
+
+:author: semuadmin (Steve Smith)
+:copyright: semuadmin © 2026
+:license: BSD 3-Clause
+"""
+
+from time import perf_counter
+
+from pyrtcm.rtcmhelpers import get_identity
+from pyrtcm.rtcmplan import get_payload_dict
+
+# indices of per-identity counters
+FRAMES = 0
+BYTES = 1
+DECODED = 2
+DECODETIME = 3
+ARRIVAL = 4
+GAPS = 5
+GAPTIME = 6
+GAPMAX = 7
+UNKNOWN = 8
+
+
+class RTCMStatistics:
+    """
+    RTCMStatistics class.
+    """
+
+    def __init__(self, clock: object = perf_counter):
+        """Constructor.
+
+        A single collector may be shared between several readers, in
+        which case the statistics are aggregated.
+
+        :param object clock: function returning current time in seconds (perf_counter)
+        """
+
+        self._clock = clock
+        self.reset()
+
+    def reset(self):
+        """
+        Reset all statistics.
+        """
+
+        self._types = {}  # counters keyed on identity
+        self._current = None  # counters for most recent frame
+        self._arrival = 0  # arrival time of most recent frame
+        self._crcfail = 0
+        self._errors = 0
+        self._discarded = 0
+
+    def frame(self, raw: bytes):
+        """
+        Record arrival of RTCM3 frame.
+
+        :param bytes raw: raw RTCM3 frame including header and CRC
+        :raises: IndexError (if payload too short to contain identity)
+        """
+
+        now = self._clock()
+        identity = get_identity(raw[3:-3])
+        counts = self._types.get(identity, None)
+        if counts is None:
+            counts = self._types[identity] = [0, 0, 0, 0.0, now, 0, 0.0, 0.0, False]
+            counts[UNKNOWN] = get_payload_dict(identity) is None
+        else:
+            gap = now - counts[ARRIVAL]
+            counts[ARRIVAL] = now
+            counts[GAPS] += 1
+            counts[GAPTIME] += gap
+            if gap > counts[GAPMAX]:
+                counts[GAPMAX] = gap
+        counts[FRAMES] += 1
+        counts[BYTES] += len(raw)
+        self._current = counts
+        self._arrival = now
+
+    def decoded(self):
+        """
+        Record completion of parsing of most recent frame.
+        """
+
+        counts = self._current
+        counts[DECODED] += 1
+        counts[DECODETIME] += self._clock() - self._arrival
+
+    def error(self, crc: bool = False):
+        """
+        Record stream or parsing error.
+
+        :param bool crc: error is a CRC failure (False)
+        """
+
+        if crc:
+            self._crcfail += 1
+        else:
+            self._errors += 1
+
+    def discard(self, size: int):
+        """
+        Record non-RTCM3 data discarded while resynchronising.
+
+        :param int size: number of bytes discarded
+        """
+
+        self._discarded += size
+
+    @property
+    def stats(self) -> dict:
+        """
+        Getter for snapshot of statistics. Times are in seconds. Decode
+        times run from the end of frame read to the end of parsing, so
+        for a lazy reader they exclude any deferred payload decoding.
+
+        :return: dict of total frames and bytes, CRC failures, other errors, \
+            bytes discarded, frames of unknown type and, keyed on identity, \
+            frames, bytes, unknown flag, number of messages parsed, mean and \
+            total decode time, number of inter-arrival gaps and mean and \
+            maximum gap
+        :rtype: dict
+        """
+
+        types = {}
+        for identity, counts in sorted(self._types.items()):
+            frames, nbytes, decoded, dtime, _, gaps, gtime, gmax, unknown = counts
+            types[identity] = {
+                "frames": frames,
+                "bytes": nbytes,
+                "unknown": unknown,
+                "decoded": decoded,
+                "decode_time": dtime,
+                "decode_mean": dtime / decoded if decoded else 0.0,
+                "gaps": gaps,
+                "gap_mean": gtime / gaps if gaps else 0.0,
+                "gap_max": gmax,
+            }
+        return {
+            "frames": sum(t["frames"] for t in types.values()),
+            "bytes": sum(t["bytes"] for t in types.values()),
+            "crc_failures": self._crcfail,
+            "errors": self._errors,
+            "discarded": self._discarded,
+            "unknown": sum(t["frames"] for t in types.values() if t["unknown"]),
+            "types": types,
+        }
@@ -148,3 +148,55 @@ PRNSIGMAP = {
     "112": (BEIDOU_PRN_MAP, BEIDOU_SIG_MAP),
     "113": (IRNSS_PRN_MAP, IRNSS_SIG_MAP),
 }
+
+#################################################
+# CARRIER FREQUENCIES
+#################################################
+
+CLIGHT = 299792458.0
+"""Speed of light in m/s"""
+
+# {RINEX frequency band: carrier frequency in Hz}
+GPS_FREQ_MAP = {"1": 1575.42e6, "2": 1227.60e6, "5": 1176.45e6}
+# {RINEX frequency band: (frequency of channel 0, channel spacing) in Hz}
+GLONASS_FREQ_MAP = {"1": (1602e6, 0.5625e6), "2": (1246e6, 0.4375e6)}
+GALILEO_FREQ_MAP = {
+    "1": 1575.42e6,
+    "5": 1176.45e6,
+    "6": 1278.75e6,
+    "7": 1207.14e6,
+    "8": 1191.795e6,
+}
+SBAS_FREQ_MAP = {"1": 1575.42e6, "5": 1176.45e6}
+QZSS_FREQ_MAP = {"1": 1575.42e6, "2": 1227.60e6, "5": 1176.45e6, "6": 1278.75e6}
+BEIDOU_FREQ_MAP = {
+    "1": 1575.42e6,
+    "2": 1561.098e6,
+    "5": 1176.45e6,
+    "6": 1268.52e6,
+    "7": 1207.14e6,
+    "8": 1191.795e6,
+}
+IRNSS_FREQ_MAP = {"5": 1176.45e6, "9": 2492.028e6}
+
+# {identity[0:3]: freqmap}
+FREQMAP = {
+    "107": GPS_FREQ_MAP,
+    "108": GLONASS_FREQ_MAP,
+    "109": GALILEO_FREQ_MAP,
+    "110": SBAS_FREQ_MAP,
+    "111": QZSS_FREQ_MAP,
+    "112": BEIDOU_FREQ_MAP,
+    "113": IRNSS_FREQ_MAP,
+}
+
+#################################################
+# MSM INVALID VALUES
+#################################################
+
+# MSM satellite and cell invalid value indicators, as decoded (i.e. scaled)
+MSM_INVALID_ROUGH = 255  # DF397
+MSM_INVALID_RATE = -8192  # DF399
+MSM_INVALID_FINEPR = {"DF400": -16384 * 2**-24, "DF405": -524288 * 2**-29}
+MSM_INVALID_FINEPH = {"DF401": -2097152 * 2**-29, "DF406": -8388608 * 2**-31}
+MSM_INVALID_FINERATE = -16384 * 0.0001  # DF404
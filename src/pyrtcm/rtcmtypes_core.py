@@ -18,6 +18,8 @@ UBX_HDR = b"\xb5\x62"
 """UBX message header"""
 RTCM_HDR = b"\xd3"
 """RTCM3 message header"""
+CRC24Q_POLY = 0x1864CFB
+"""CRC24Q generator polynomial"""
 GET = 0
 """GET (receive, response) message types"""
 SET = 1
@@ -44,6 +46,12 @@ ERR_IGNORE = 0
 """Ignore errors"""
 DEFAULT_BUFSIZE = 4096
 """Default socket buffer size"""
+DEFAULT_READAHEAD = 65536
+"""Default RTCMReader read-ahead buffer size"""
+DEFAULT_CHUNKSIZE = 1048576
+"""Default RTCMFileParser chunk size in bytes"""
+SATCELLMAP_CACHE_SIZE = 1024
+"""Maximum number of cached MSM satellite and cell maps"""
 ENCODE_NONE = 0
 """No socket encoding"""
 ENCODE_CHUNKED = 1
@@ -1009,6 +1017,24 @@ GNSSMAP = {
 }
 """Map of MSM message identity prefix to GNSS name & epoch attribute name"""
 
+# attributes representing GNSS epoch time, in order of precedence
+EPOCH_FIELDS = (
+    "DF004",
+    "DF034",
+    "DF248",
+    "DF385",
+    "DF386",
+    "DF427",
+    "DF428",
+    "DF458",
+    "DF460",
+    "DF462",
+    "DF465",
+    "DF546",
+    "IDF003",
+)
+"""Attributes representing GNSS epoch time"""
+
 # map of 4076_201 and 1264 spherical coefficients
 SSR_SPHER_COEFFS = {
     "4076_201": {
@@ -13,11 +13,30 @@ Created on 3 Oct 2020
 import os
 import unittest
 
-from pyrtcm import RTCM_DATA_FIELDS, RTCMMessage, RTCMReader
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+from pyrtcm import (
+    RTCM_DATA_FIELDS,
+    RTCMMessage,
+    RTCMMessageError,
+    RTCMReader,
+    RTCMTypeError,
+    parse_msm_array,
+    parse_msm_batch,
+    msm_observables,
+    encode_payload,
+)
 import pyrtcm.rtcmtypes_core as rtt
 from pyrtcm.rtcmhelpers import (
     hextable,
     calc_crc24q,
+    calc_crc24q_ref,
+    calc_crc24q_table,
+    CRC24Q_NATIVE,
+    CRC24Q_TABLE,
     get_bit,
     crc2bytes,
     len2bytes,
@@ -28,13 +47,35 @@ from pyrtcm.rtcmhelpers import (
     escapeall,
     parse_msm,
     parse_4076_201,
+    get_identity,
+    get_satcellmaps,
 )
+from pyrtcm.rtcmplan import (
+    OP_COND,
+    OP_FIELD,
+    OP_GROUP,
+    OP_RUN,
+    OP_SKIP,
+    RTCM_HDRPLANS,
+    RTCM_PLANS,
+    S_NONE,
+    S_SATMASK,
+    T_CHA,
+    T_INT,
+    T_INTS,
+    T_UINT,
+    compile_plan,
+    get_header_plan,
+    get_payload_dict,
+    get_plan,
+)
+from pyrtcm.rtcmarrays import OBSERVABLES, _column
 
 
 class StaticTest(unittest.TestCase):
     def setUp(self):
         self.maxDiff = None
-        dirname = os.path.dirname(__file__)
+        self._dirname = os.path.dirname(__file__)
 
     def tearDown(self):
         pass
@@ -600,6 +641,454 @@ class StaticTest(unittest.TestCase):
         )
         self.assertEqual(parse_4076_201(msg1005), None)
 
+    def testcompileplan(self):  # test payload definitions compile to decode plans
+        EXPECTED_RESULT = (
+            (OP_FIELD, "DF002", T_UINT, 12, 0, 0, S_NONE, False),
+            (
+                OP_GROUP,
+                "group",
+                "DF029",
+                0,
+                0,
+                ((OP_FIELD, "DF030", T_CHA, 8, 0, 0, S_NONE, False),),
+            ),
+            (
+                OP_COND,
+                "optL1CA",
+                "DF422_1",
+                1,
+                ((OP_FIELD, "DF423", T_INT, 16, 0.02, 0x8000, S_NONE, False),),
+            ),
+        )
+        pdict = {
+            "DF002": "Message Number",
+            "group": ("DF029", {"DF030": "Antenna Descriptor"}),
+            "optL1CA": (("DF422_1", 1), {"DF423": "GLONASS L1 C/A Code-Phase Bias"}),
+        }
+        self.assertEqual(compile_plan(pdict), EXPECTED_RESULT)
+        plan = compile_plan({"group": ("IDF023+1", {"IDF035": ""})})
+        self.assertEqual(plan[0][2:5], ("IDF023", 1, 0))
+        plan = compile_plan({"group": ("IDF035", {"DF394": ""})})
+        self.assertEqual(plan[0][2:5], ("IDF035", 0, 1))
+        self.assertEqual(plan[0][5][0][6], S_SATMASK)
+        self.assertTrue(plan[0][5][0][7])  # DF394 is referenced
+        plan = compile_plan({"DF029": "", "group": ("DF029", {"DF030": ""})})
+        self.assertEqual((plan[0][7], plan[1][5][0][7]), (True, False))
+
+    def testcompileplanerror(self):  # test invalid payload definitions
+        EXPECTED_ERROR = (
+            "Error processing attribute 'DF999' in message type 9999 'DF999'"
+        )
+        with self.assertRaisesRegex(RTCMTypeError, EXPECTED_ERROR):
+            compile_plan({"DF002": "", "group": (2, {"DF999": ""})}, "9999")
+
+    def testgetplan(self):  # test decode plans are cached per identity
+        self.assertIs(get_plan("1005"), get_plan("1005"))
+        self.assertIn("1005", RTCM_PLANS)
+        self.assertIsNone(get_plan("4072"))
+        self.assertIsNone(get_payload_dict("4076_999"))
+        self.assertIsNotNone(get_payload_dict("1077"))
+        msg = RTCMMessage(
+            payload=b">\xd0\x00\x03\x8aX\xd9I<\x87/4\x10\x9d\x07\xd6\xafH "
+        )
+        self.assertIs(msg._get_dict(), get_payload_dict("1005"))
+        with self.assertRaises(RTCMTypeError):  # invalid MSM2 payload definition
+            RTCMMessage(payload=b"\x43\x00\x00\x00\x00\x00")
+
+    def testcrc24qimpl(self):  # test CRC24Q implementations agree
+        data = bytes(range(256)) * 5 + b"\xd3\x00\x04L\xe0\x00\x80\xed\xed\xd6"
+        for i in (0, 1, 7, 100, len(data)):
+            crc = calc_crc24q_ref(data[:i])
+            self.assertEqual(calc_crc24q_table(data[:i]), crc)
+            self.assertEqual(calc_crc24q(data[:i]), crc)
+            self.assertEqual(calc_crc24q(memoryview(data)[:i]), crc)
+            if CRC24Q_NATIVE is not None:
+                self.assertEqual(CRC24Q_NATIVE(data[:i]), crc)
+        self.assertEqual(len(CRC24Q_TABLE), 256)
+        self.assertEqual(calc_crc24q_table(data[-10:]), 0)
+
+    def testgetheaderplan(self):  # test header plans are leading fixed fields only
+        plan, names, nbits = get_header_plan("1077")
+        self.assertIs(get_header_plan("1077"), RTCM_HDRPLANS["1077"])
+        self.assertEqual(
+            [op[1] for op in plan],
+            [
+                "DF002",
+                "DF003",
+                "DF004",
+                "DF393",
+                "DF409",
+                "DF001_7",
+                "DF411",
+                "DF412",
+                "DF417",
+                "DF418",
+            ],
+        )
+        self.assertEqual(names, frozenset(op[1] for op in plan))
+        self.assertEqual(nbits, 73)
+        self.assertEqual(get_header_plan("1005"), ((), frozenset(), 0))
+        self.assertIsNone(get_header_plan("4072"))
+
+    @unittest.skipIf(np is None, "NumPy not installed")
+    def testparsemsmarray(self):  # test columnar decode agrees with parse_msm
+        msgs = []
+        for fname in ("pygpsdata-RTCM3.log", "pygpsdata-RTCMMSM3.log"):
+            with open(os.path.join(self._dirname, fname), "rb") as stream:
+                msgs += [p for _, p in RTCMReader(stream, quitonerror=0) if p]
+        nmsm = 0
+        for msg in msgs:
+            res = parse_msm_array(msg.payload)
+            if not msg.ismsm:
+                self.assertIsNone(res)
+                continue
+            nmsm += 1
+            meta, sats, cells = parse_msm(msg)
+            self.assertEqual(res[0], meta)
+            for arr, rows in ((res[1], sats), (res[2], cells)):
+                self.assertEqual(len(arr), len(rows))
+                for arow, row in zip(arr, rows):
+                    for key, val in row.items():
+                        self.assertEqual(arow[key], val)
+        self.assertEqual(nmsm, 8)
+        _, _, cells = parse_msm_array(msgs[2], labelmsm=2)  # RTCMMessage 1077
+        self.assertEqual(list(cells["CELLSIG"][:2]), ["L1", "L2"])
+        self.assertEqual(cells["DF407"].dtype, np.int64)
+        self.assertEqual(cells["DF408"].dtype, np.float64)
+
+    @unittest.skipIf(np is None, "NumPy not installed")
+    def testparsemsmarraylabels(self):  # test long PRN and signal labels
+        payload = encode_payload(
+            "1097",
+            DF394=(1 << 13) | (1 << 12),  # GIOVE-A, GIOVE-B
+            DF395=(1 << 14) | (1 << 10),  # 8I (E5AB), 5I (E5A)
+            DF396=0b1111,
+            DF397_01=70,
+            DF397_02=80,
+        )
+        for labelmsm, sigs in ((1, ["8I", "5I"]), (2, ["E5AB", "E5A"])):
+            _, sats, cells = parse_msm(RTCMMessage(payload=payload, labelmsm=labelmsm))
+            _, asats, acells = parse_msm_array(payload, labelmsm=labelmsm)
+            self.assertEqual(list(asats["PRN"]), ["GIOVE-A", "GIOVE-B"])
+            self.assertEqual(list(asats["PRN"]), [row["PRN"] for row in sats])
+            for key in ("CELLPRN", "CELLSIG"):
+                self.assertEqual(list(acells[key]), [row[key] for row in cells])
+            self.assertEqual(list(acells["CELLSIG"]), sigs * 2)
+            obs = msm_observables(payload if labelmsm == 1 else (_, asats, acells))
+            self.assertEqual(list(obs["CELLPRN"]), ["GIOVE-A"] * 2 + ["GIOVE-B"] * 2)
+            # cells are matched to their own satellite's rough range
+            self.assertAlmostEqual(
+                obs["pseudorange"][0] / obs["pseudorange"][2], 70 / 80
+            )
+
+    @unittest.skipIf(np is None, "NumPy not installed")
+    def testparsemsmbatch(self):  # test batch decode stacks epochs
+        msgs = []
+        for fname in ("pygpsdata-RTCM3.log", "pygpsdata-RTCMMSM3.log"):
+            with open(os.path.join(self._dirname, fname), "rb") as stream:
+                msgs += [p for _, p in RTCMReader(stream, quitonerror=0) if p]
+        sats, cells = parse_msm_batch(m.payload for m in msgs)
+        msms = [m for m in msgs if m.ismsm]
+        self.assertEqual(len(sats), sum(m.NSat for m in msms))
+        self.assertEqual(len(cells), sum(m.NCell for m in msms))
+        self.assertEqual(
+            cells.dtype.names[:5],
+            ("identity", "station", "epoch", "CELLPRN", "CELLSIG"),
+        )
+        self.assertEqual(
+            list(np.unique(cells["identity"])),
+            ["1073", "1077", "1083", "1087", "1093", "1097", "1117", "1127"],
+        )
+        msm3 = cells[cells["identity"] == "1073"]
+        self.assertTrue(np.isnan(msm3["DF405"]).all())
+        self.assertTrue((msm3["DF407"] == -1).all())
+        self.assertTrue((msm3["DF402"] >= 0).all())
+        glo = [m for m in msms if hasattr(m, "DF419_01")]
+        self.assertEqual(
+            list(sats["DF419"][sats["DF419"] != -1]),
+            [getattr(m, f"DF419_{i:02d}") for m in glo for i in range(1, m.NSat + 1)],
+        )
+        # sign-magnitude integers (not currently used in MSM)
+        bits = np.unpackbits(np.frombuffer(b"\x05\x85", dtype=np.uint8))
+        vals = _column(bits, 0, 2, T_INTS, 8, 0, 0x80)
+        self.assertEqual(list(vals), [5, -5])
+        sats, cells = parse_msm_batch([])
+        self.assertEqual((len(sats), len(cells)), (0, 0))
+
+    @unittest.skipIf(np is None, "NumPy not installed")
+    def testparsemsmarrayerrors(self):
+        msg = RTCMReader.parse(
+            b"\xd3\x00\x13>\xd0\x00\x03\x8aX\xd9I<\x87/4\x10\x9d\x07\xd6\xafH Z\xd7\xf7"
+        )
+        self.assertIsNone(parse_msm_array(msg.payload))
+        with open(os.path.join(self._dirname, "pygpsdata-RTCM3.log"), "rb") as stream:
+            payload = [p for _, p in RTCMReader(stream)][2].payload
+        with self.assertRaisesRegex(
+            RTCMTypeError, "Error processing attribute 'DF394'"
+        ):
+            parse_msm_array(payload[:12])
+        with self.assertRaisesRegex(
+            RTCMTypeError, "Error processing attribute 'DF396'"
+        ):
+            parse_msm_array(payload[:-50])
+
+    @unittest.skipIf(np is None, "NumPy not installed")
+    def testmsmobservables(self):  # test vectorised observable reconstruction
+        msgs = []
+        for fname in ("pygpsdata-RTCM3.log", "pygpsdata-NTRIP-USCL00CHL0.log"):
+            with open(os.path.join(self._dirname, fname), "rb") as stream:
+                msgs += [p for _, p in RTCMReader(stream) if p.ismsm]
+        obs = msm_observables(msgs[0])  # 1077
+        self.assertEqual(obs.dtype.names[:2], ("CELLPRN", "CELLSIG"))
+        self.assertEqual(obs.dtype.names[2:], OBSERVABLES)
+        self.assertEqual(len(obs), msgs[0].NCell)
+        row = obs[0]
+        self.assertEqual((row["CELLPRN"], row["CELLSIG"]), ("005", "1C"))
+        self.assertAlmostEqual(row["pseudorange"], 22486233.8438, 4)
+        self.assertAlmostEqual(row["phaserange"], 22486233.4972, 4)
+        self.assertAlmostEqual(row["phaserangerate"], -178.9231, 4)
+        self.assertAlmostEqual(row["carrierphase"], 118165954.582, 3)
+        self.assertAlmostEqual(row["doppler"], 940.247, 3)
+        self.assertEqual(row["frequency"], 1575.42e6)
+        row = msm_observables(parse_msm_array(msgs[1]))[0]  # 1087 R03, DF419 = 12
+        self.assertEqual(row["frequency"], 1602e6 + 5 * 0.5625e6)
+        self.assertAlmostEqual(row["carrierphase"], 111749575.306, 3)
+        # MSM6 without phase range rate; GLONASS channels from 1087 or glofcn
+        msm6 = [m for m in msgs if m.identity == "1086"][0]
+        obs = msm_observables(msm6)
+        self.assertTrue(np.isnan(obs["phaserangerate"]).all())
+        self.assertTrue(np.isnan(obs["frequency"]).all())
+        self.assertFalse(np.isnan(obs["phaserange"]).any())
+        obs = msm_observables(msm6, glofcn={1: 1})
+        self.assertEqual(obs["frequency"][0], 1602e6 + 0.5625e6)
+        self.assertTrue(np.isnan(obs["frequency"][-1]))
+        # batch agrees with individual messages
+        batch = msm_observables(parse_msm_batch(msgs[4:]))
+        self.assertEqual(batch.dtype.names[2:5], ("identity", "station", "epoch"))
+        self.assertEqual(len(batch), sum(m.NCell for m in msgs[4:]))
+        start = 0
+        for msg in msgs[4:]:
+            obs = msm_observables(msg)
+            end = start + len(obs)
+            for name in ("pseudorange", "phaserange", "phaserangerate"):
+                np.testing.assert_array_equal(obs[name], batch[name][start:end])
+            start = end
+        glo = batch[batch["identity"] == "1086"]
+        self.assertFalse(np.isnan(glo["frequency"]).any())  # from 1087 DF419
+        # invalid values, unknown signal labels
+        payload = encode_payload(
+            "1097",
+            DF394=(1 << 63) | (1 << 62) | (1 << 13),
+            DF395=1 << 30,
+            DF396=0b111,
+            DF397_01=255,
+            DF397_02=70,
+            DF397_03=80,
+            DF399_02=-8192,
+            DF405_02=-524288 * 2**-29,
+            DF406_03=-8388608 * 2**-31,
+            DF404_03=-16384 * 0.0001,
+        )
+        obs = msm_observables(payload)
+        self.assertEqual(list(obs["CELLPRN"]), ["001", "002", "GIOVE-A"])
+        self.assertTrue(np.isnan(obs["pseudorange"][0:2]).all())
+        self.assertAlmostEqual(obs["pseudorange"][2], 23983396.64, 2)
+        self.assertTrue(np.isnan(obs["phaserange"][[0, 2]]).all())
+        self.assertAlmostEqual(obs["phaserange"][1], 20985472.06, 2)
+        self.assertTrue(np.isnan(obs["phaserangerate"][1:]).all())
+        self.assertEqual(obs["phaserangerate"][0], 0)
+        obs = msm_observables(parse_msm_array(payload, labelmsm=2))
+        self.assertTrue(np.isnan(obs["frequency"]).all())
+        self.assertIsNone(msm_observables(RTCMMessage(payload=encode_payload("1005"))))
+        self.assertEqual(len(msm_observables(parse_msm_batch([]))), 0)
+
+    def testrunequivalence(self):  # test run extraction matches per-attribute groups
+        def norun(plan):
+            ops = []
+            for op in plan:
+                if op[0] == OP_RUN:
+                    op = (OP_GROUP, *op[1:5], (op[5],))
+                elif op[0] == OP_GROUP:
+                    op = (*op[:5], norun(op[5]))
+                elif op[0] == OP_COND:
+                    op = (*op[:4], norun(op[4]))
+                ops.append(op)
+            return tuple(ops)
+
+        raws = []
+        for fname in (
+            "pygpsdata-RTCM3.log",
+            "pygpsdata-RTCMMSM3.log",
+            "pygpsdata-NTRIP-4076.log",
+            "pygpsdata-1240-1264.log",
+        ):
+            with open(os.path.join(self._dirname, fname), "rb") as stream:
+                raws += [r for r, _ in RTCMReader(stream, parsed=False)]
+        EXPECTED_RESULTS = [str(RTCMReader.parse(raw)) for raw in raws]
+        plans = dict(RTCM_PLANS)
+        try:
+            for identity, plan in plans.items():
+                if plan is not None:
+                    RTCM_PLANS[identity] = norun(plan)
+            res = [str(RTCMReader.parse(raw)) for raw in raws]
+        finally:
+            RTCM_PLANS.update(plans)
+        self.assertEqual(res, EXPECTED_RESULTS)
+        self.assertIn(OP_RUN, [op[0] for op in get_plan("1077")])
+        # sign-magnitude run (not currently used in any message type)
+        try:
+            RTCM_PLANS["4090"] = compile_plan(
+                {"DF002": "", "group": (2, {"DF113": ""})}
+            )
+            msg = RTCMMessage(payload=b"\xff\xa2\xcc")
+            self.assertEqual(RTCM_PLANS["4090"][1][0], OP_RUN)
+            self.assertEqual(msg.DF113_01, 5 * 2**-30)
+            self.assertEqual(msg.DF113_02, -(3 * 2**-30))
+        finally:
+            del RTCM_PLANS["4090"]
+
+    def testrunnegativesize(self):  # test run with negative derived size e.g. M > N
+        payload = encode_payload("1264", DF472=1, DF474_01=0, DF475_01=4)
+        EXPECTED_RESULT = "<RTCM(1264, DF002=1264, DF385=0, DF391=0, DF388=0, DF413=0, DF414=0, DF415=0, DF478=0.0, DF472=1, DF473_01=0, DF474_01=0, DF475_01=4)>"
+        self.assertEqual(str(RTCMMessage(payload=payload)), EXPECTED_RESULT)
+        self.assertEqual(str(RTCMMessage(payload=payload, lazy=True)), EXPECTED_RESULT)
+        msg = RTCMMessage(payload=payload, fields={"DF475"})  # skipped runs
+        self.assertEqual(str(msg), "<RTCM(1264, DF472=1, DF474_01=0, DF475_01=4)>")
+
+    def testencodepayload(self):  # test payload encoder
+        payload = encode_payload(
+            "1005",
+            DF003=7,
+            DF022=1,
+            DF025=4444030.8028,
+            DF026=-3085671.2349,
+            DF027=3366658.256,
+        )
+        msg = RTCMMessage(payload=payload)
+        self.assertEqual(
+            str(msg),
+            "<RTCM(1005, DF002=1005, DF003=7, DF021=0, DF022=1, DF023=0, DF024=0, DF141=0, DF025=4444030.802800001, DF142=0, DF001_1=0, DF026=-3085671.2349, DF364=0, DF027=3366658.256)>",
+        )
+        self.assertEqual(encode_payload("1005", template=msg), payload)
+        self.assertEqual(
+            encode_payload("1005", template=msg, DF003=8),
+            encode_payload(
+                "1005", template=RTCMMessage(payload=payload, lazy=True), DF003=8
+            ),
+        )
+        msg = RTCMMessage(
+            payload=encode_payload(
+                "1007", DF003=1, DF029=4, DF030_01="A", DF030_02="B", DF031=2
+            )
+        )
+        self.assertEqual(
+            str(msg),
+            "<RTCM(1007, DF002=1007, DF003=1, DF029=4, DF030_01=A, DF030_02=B, DF030_03=\x00, DF030_04=\x00, DF031=2)>",
+        )
+        msg = RTCMMessage(
+            payload=encode_payload("1029", DF138=5, DF139=5, DF140="hello")
+        )
+        self.assertEqual(msg.DF140, "hello")
+        # MSM group sizes derived from masks
+        msg = RTCMMessage(
+            payload=encode_payload(
+                "1077",
+                DF394=0b11 << 62,
+                DF395=0b101 << 29,
+                DF396=0b1101,
+                DF397_02=70,
+                DF405_03=-0.0001,
+                DF406_01=0.0002,
+            )
+        )
+        self.assertEqual((msg.NSat, msg.NSig, msg.NCell), (2, 2, 3))
+        self.assertEqual((msg.PRN_01, msg.PRN_02), ("001", "002"))
+        self.assertEqual(msg.DF397_02, 70)
+        self.assertAlmostEqual(msg.DF405_03, -0.0001, 6)
+        self.assertAlmostEqual(msg.DF406_01, 0.0002, 6)
+        self.assertEqual(get_identity(encode_payload("4076_201")), "4076_201")
+
+    def testencodepayloaderrors(self):  # test payload encoder errors
+        with self.assertRaisesRegex(RTCMMessageError, "Unknown message type 9999"):
+            encode_payload("9999")
+        for kwargs, err in (
+            ({"DF003": 4096}, "'DF003' in message type 1005 - invalid value 4096"),
+            ({"DF003": -1}, "'DF003' in message type 1005 - invalid value -1"),
+            ({"DF003": "x"}, "'DF003' in message type 1005 - invalid value 'x'"),
+            ({"DF025": 2**37 * 0.0001}, "'DF025' in message type 1005"),
+            ({"DF025": -(2**37) * 0.0001 - 1}, "'DF025' in message type 1005"),
+        ):
+            with self.assertRaisesRegex(RTCMTypeError, err):
+                encode_payload("1005", **kwargs)
+        with self.assertRaisesRegex(RTCMTypeError, "'DF030_01' in message type 1007"):
+            encode_payload("1007", DF029=1, DF030_01="Ā")
+        with self.assertRaisesRegex(RTCMTypeError, "'DF404_01' in message type 1077"):
+            encode_payload("1077", DF394=1, DF395=1, DF396=1, DF404_01=1.6384)
+        with self.assertRaisesRegex(RTCMTypeError, "'DF121' in message type 1020"):
+            encode_payload("1020", DF121=1024)
+        # sign-magnitude limits
+        msg = RTCMMessage(payload=encode_payload("1020", DF121=-1023, DF111=-0.5))
+        self.assertEqual((msg.DF121, msg.DF111), (-1023, -0.5))
+        # template lacks attribute
+        msg = RTCMMessage(payload=encode_payload("1005", DF003=7))
+        msg = RTCMMessage(payload=encode_payload("1006", template=msg, DF028=1.5))
+        self.assertEqual((msg.DF002, msg.DF003, msg.DF028), (1006, 7, 1.5))
+
+    def testsatcellmapcache(self):  # test MSM satellite and cell map cache
+        get_satcellmaps.cache_clear()
+        maps1 = get_satcellmaps("1077", 0b11 << 62, 0b11 << 29, 0b1101)
+        maps2 = get_satcellmaps("1074", 0b11 << 62, 0b11 << 29, 0b1101)
+        self.assertIs(maps1, maps2)  # same constellation and masks
+        self.assertEqual(dict(maps1[0]), {1: "001", 2: "002"})
+        self.assertEqual(
+            dict(maps1[1]), {1: ("001", "1C"), 2: ("001", "1P"), 3: ("002", "1P")}
+        )
+        with self.assertRaises(TypeError):  # shared maps are read-only
+            maps1[0][1] = "003"
+        maps3 = get_satcellmaps("1077", 0b11 << 62, 0b11 << 29, 0b1101, labelmsm=2)
+        self.assertEqual(maps3[1][3], ("002", "L1"))
+        maps4 = get_satcellmaps("1087", 0b11 << 62, 0b11 << 29, 0b1101)
+        self.assertIs(get_satcellmaps("1087", 0b11 << 62, 0b11 << 29, 0b1101), maps4)
+        info = get_satcellmaps.cache_info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (2, 3, 3))
+        self.assertEqual(info.maxsize, rtt.SATCELLMAP_CACHE_SIZE)
+
+    def testinternednames(self):  # test attribute names are shared between layouts
+        msg1 = RTCMMessage(payload=encode_payload("1004", DF006=2, DF009_02=5))
+        msg2 = RTCMMessage(payload=encode_payload("1004", DF006=3, DF009_02=7))
+        self.assertEqual((msg1.DF009_02, msg2.DF009_02), (5, 7))
+        self.assertIsNot(msg1._layout, msg2._layout)  # different shapes
+        names1 = {name: name for name in msg1._layout}
+        for name in msg2._layout:
+            if name in names1:
+                self.assertIs(name, names1[name])
+        msg3 = RTCMMessage(
+            payload=encode_payload("1077", DF394=0b11 << 62, DF395=1 << 31, DF396=0b11)
+        )
+        msg4 = RTCMMessage(
+            payload=encode_payload(
+                "1077", DF394=0b111 << 61, DF395=1 << 31, DF396=0b111
+            )
+        )
+        names3 = [name for name in msg3._layout if name.startswith("DF405_")]
+        names4 = [name for name in msg4._layout if name.startswith("DF405_")]
+        self.assertEqual(len(names4), 3)
+        self.assertIs(names3[1], names4[1])
+
+    def testfieldplan(self):  # test field plan skips unwanted attributes
+        fields = frozenset(("DF011",))
+        plan = get_plan("1004", fields)
+        self.assertIs(plan, get_plan("1004", fields))  # cached
+        self.assertEqual(plan[0], (OP_SKIP, "DF002", 55))  # merged skips
+        self.assertEqual(plan[1][:2], (OP_FIELD, "DF006"))  # group size retained
+        self.assertEqual(plan[3][5][0], (OP_SKIP, "DF009", 7))
+        self.assertEqual(plan[3][5][1][:2], (OP_FIELD, "DF011"))
+        plan = get_plan("1077", frozenset(("DF405",)))
+        self.assertEqual(plan[4][0], OP_RUN)  # merged runs of skips
+        self.assertEqual(plan[4][5], (OP_SKIP, "PRN", 36))
+        self.assertEqual(plan[6][5][:2], (OP_FIELD, "DF405"))
+        self.assertIsNone(get_plan("9999", fields))
+
 
 if __name__ == "__main__":
     # import sys;sys.argv = ['', 'Test.testName']
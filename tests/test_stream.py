@@ -10,28 +10,63 @@ Created on 3 Oct 2020
 
 # pylint: disable=line-too-long, invalid-name, missing-docstring, no-member
 
+import asyncio
 import os
+import pickle
+import select
+import socket
+import tempfile
 from io import BufferedReader, BytesIO
 import sys
 import unittest
+from datetime import datetime, timedelta, timezone
 from logging import ERROR
 
 from io import StringIO
 from pyrtcm import (
+    SocketWrapper,
+    AsyncRTCMReader,
+    RTCMFileParser,
+    RTCMMappedReader,
+    RTCMMultiReader,
+    encode_payload,
     RTCMReader,
     RTCMMessage,
     RTCMParseError,
     RTCMMessageError,
     RTCMStreamError,
+    RINEXObsWriter,
+    RTCMEpochAssembler,
+    RTCMEphemerisStore,
+    RTCMMessageCache,
+    RTCMStatistics,
+    DEFAULT_CACHE_IDENTITIES,
     ERR_IGNORE,
     ERR_LOG,
     ERR_RAISE,
 )
 import pyrtcm.rtcmtypes_core as rtt
+import pyrtcm.rtcmplan as rtcmplan
+from pyrtcm.rtcmfileparser import parse_chunk
+from pyrtcm.rtcmhelpers import crc2bytes, get_identity
+from pyrtcm.rtcmmultireader import RTCMSource
+from pyrtcm.rtcmmessage import DECODED_FULL, DECODED_HEADER, DECODED_NONE
 
 DIRNAME = os.path.dirname(__file__)
 
 
+class AsyncStream:
+    """
+    Minimal asynchronous stream returning data in small blocks.
+    """
+
+    def __init__(self, data: bytes):
+        self._stream = BytesIO(data)
+
+    async def read(self, n: int) -> bytes:
+        return self._stream.read(min(n, 7))
+
+
 class StreamTest(unittest.TestCase):
     def setUp(self):
         self.maxDiff = None
@@ -372,6 +407,13 @@ class StreamTest(unittest.TestCase):
         with self.assertRaisesRegex(RTCMMessageError, EXPECTED_ERROR):
             msg = RTCMReader.parse(self._raw1005)
             msg.DF002 = 9999
+        msg = RTCMReader.parse(self._raw1005, lazy=True)
+        for att in ("DF003", "_values", "_decoded"):  # including internal state
+            with self.assertRaisesRegex(RTCMMessageError, "Object is immutable"):
+                setattr(msg, att, 1)
+        self.assertEqual(msg.DF003, 0)  # lazy decoding unaffected
+        with self.assertRaisesRegex(RTCMMessageError, "Object is immutable"):
+            msg.DF003 = 1
 
     def testrepr(self):  # test repr, check eval recreates original object
         EXPECTED_RESULT = "RTCMMessage(payload=b'>\\xd0\\x00\\x03\\x8aX\\xd9I<\\x87/4\\x10\\x9d\\x07\\xd6\\xafH ')"
@@ -619,6 +661,1165 @@ class StreamTest(unittest.TestCase):
                 i += 1
             self.assertEqual(i, len(EXPECTED_RESULT))
 
+    def testreadahead(self):  # test read-ahead buffer with different stream types
+        class SerialStream:  # stream with in_waiting property and no read1()
+            def __init__(self, data):
+                self._stream = BytesIO(data)
+                self._len = len(data)
+
+            @property
+            def in_waiting(self):
+                return self._len - self._stream.tell()
+
+            def read(self, n):
+                return self._stream.read(n)
+
+        class SocketStream(SerialStream):  # stream with in_waiting() method
+            def in_waiting(self):
+                return self._len - self._stream.tell()
+
+        with open(os.path.join(DIRNAME, "pygpsdata-RTCM3.log"), "rb") as stream:
+            data = stream.read()
+        EXPECTED_RESULTS = [
+            str(parsed) for _, parsed in RTCMReader(BytesIO(data), readahead=8)
+        ]
+        self.assertEqual(len(EXPECTED_RESULTS), 11)
+        for stream in (
+            BytesIO(data),
+            SerialStream(data),
+            SocketStream(data),
+        ):
+            for readahead in (0, 1, 1024, rtt.DEFAULT_READAHEAD):
+                stream.__init__(data)
+                rtr = RTCMReader(stream, readahead=readahead)
+                res = [str(parsed) for _, parsed in rtr]
+                self.assertEqual(res, EXPECTED_RESULTS)
+
+    def testtruncated(self):  # test frame truncated at various points by end of stream
+        raw = self._raw1005
+        for data, err in (
+            (b"\xd3", None),
+            (b"\x00\xd3", None),
+            (b"\xd3\x00", None),
+            (b"\xd3\x00\x13", None),
+            (raw[:10], "19 bytes requested, 7 bytes returned."),
+            (raw[:-3], None),
+            (raw[:-1], "3 bytes requested, 2 bytes returned."),
+            (raw + b"\xd3\xff", None),
+        ):
+            for readahead in (0, rtt.DEFAULT_READAHEAD):
+                rtr = RTCMReader(
+                    BytesIO(data), quitonerror=ERR_RAISE, readahead=readahead
+                )
+                if err is None:
+                    res = [raw for raw, _ in rtr]
+                    self.assertEqual(res, [raw] if data[:-2] == raw else [])
+                else:
+                    with self.assertRaisesRegex(RTCMStreamError, err):
+                        rtr.read()
+
+    def testsocketstream(self):  # test socket stream is wrapped in SocketWrapper
+        sock1, sock2 = socket.socketpair()
+        with sock1, sock2:
+            sock1.sendall(self._raw1005 * 3)
+            sock1.close()
+            rtr = RTCMReader(sock2)
+            self.assertIsInstance(rtr.datastream, SocketWrapper)
+            res = [raw for raw, _ in rtr]
+            self.assertEqual(res, [self._raw1005] * 3)
+
+    def testlazy(self):  # test lazy decoding gives same results as eager decoding
+        with open(os.path.join(DIRNAME, "pygpsdata-RTCM3.log"), "rb") as stream:
+            data = stream.read()
+        EXPECTED_RESULTS = [str(parsed) for _, parsed in RTCMReader(BytesIO(data))]
+        res = [str(parsed) for _, parsed in RTCMReader(BytesIO(data), lazy=True)]
+        self.assertEqual(res, EXPECTED_RESULTS)
+        msgs = [parsed for _, parsed in RTCMReader(BytesIO(data), lazy=True)]
+        msg = msgs[2]  # 1077
+        self.assertEqual(msg._decoded, DECODED_NONE)
+        self.assertEqual(msg.identity, "1077")
+        self.assertTrue(msg.ismsm)
+        self.assertEqual(msg._decoded, DECODED_NONE)
+        self.assertEqual(msg.DF003, 0)  # header only
+        self.assertEqual(msg._decoded, DECODED_HEADER)
+        self.assertEqual(msg.DF004, 204137001)
+        self.assertEqual(msg._decoded, DECODED_HEADER)
+        self.assertTrue(hasattr(msg, "NSat"))  # full decode
+        self.assertEqual(msg._decoded, DECODED_FULL)
+        self.assertEqual(str(msg), EXPECTED_RESULTS[2])
+        msg = msgs[0]  # 1005
+        self.assertAlmostEqual(msg.DF025, 4444030.8028, 4)  # full decode
+        self.assertEqual(msg._decoded, DECODED_FULL)
+        with self.assertRaisesRegex(AttributeError, "has no attribute 'DF999'"):
+            msg.DF999
+        with self.assertRaisesRegex(AttributeError, "has no attribute '_foo'"):
+            msgs[1]._foo
+        self.assertEqual(msgs[1]._decoded, DECODED_NONE)
+        with self.assertRaises(RTCMMessageError):
+            msgs[1].DF002 = 4072  # still immutable
+        msg = RTCMMessage(payload=b"\xfe\xe0\x00", lazy=True)  # unknown type
+        self.assertEqual(str(msg), "<RTCM(4078, DF002=4078, Not_Yet_Implemented)>")
+
+    def testparseheader(self):  # test header-only parsing agrees with full parse
+        with open(os.path.join(DIRNAME, "pygpsdata-RTCM3.log"), "rb") as stream:
+            data = stream.read()
+        i = 0
+        for raw, parsed in RTCMReader(BytesIO(data)):
+            identity, stn, epoch = RTCMReader.parse_header(raw)
+            self.assertEqual(identity, parsed.identity)
+            self.assertEqual(stn, getattr(parsed, "DF003", None))
+            epochs = [getattr(parsed, f, None) for f in rtt.EPOCH_FIELDS]
+            epochs = [e for e in epochs if e is not None]
+            self.assertEqual(epoch, epochs[0] if epochs else None)
+            i += 1
+        self.assertEqual(i, 11)
+        rtr = RTCMReader(BytesIO(data))
+        self.assertEqual(rtr.read_header()[1], ("1005", 0, None))
+        self.assertEqual(rtr.read_header()[1], ("4072", None, None))
+        self.assertEqual(rtr.read_header()[1], ("1077", 0, 204137001))
+
+    def testparseheadererrors(self):
+        with self.assertRaisesRegex(RTCMParseError, "failed CRC"):
+            RTCMReader.parse_header(self._raw1005[:-1] + b"\x00")
+        with self.assertRaisesRegex(RTCMStreamError, "Invalid payload size 1 bytes"):
+            RTCMReader.parse_header(b"\xd3\x00\x01\x3e\x00\x00\x00", validate=0)
+        with self.assertRaisesRegex(RTCMStreamError, "Invalid payload size 3 bytes"):
+            RTCMReader.parse_header(b"\xd3\x00\x03\x43\x50\x00\x00\x00\x00", validate=0)
+
+    def testmsgfilter(self):  # test unwanted message types are skipped
+        with open(os.path.join(DIRNAME, "pygpsdata-RTCM3.log"), "rb") as stream:
+            data = stream.read()
+        EXPECTED_RESULTS = [
+            str(parsed)
+            for _, parsed in RTCMReader(BytesIO(data))
+            if parsed.identity in ("1005", "1077", "1230")
+        ]
+        rtr = RTCMReader(BytesIO(data), msgfilter={"1005", "1077", "1230"})
+        self.assertEqual([str(parsed) for _, parsed in rtr], EXPECTED_RESULTS)
+        rtr = RTCMReader(BytesIO(data), msgfilter={"1077"})
+        self.assertEqual(rtr.read_header()[1][0], "1077")
+        self.assertEqual(rtr.read_header(), (None, None))
+        rtr = RTCMReader(BytesIO(data), msgfilter=set())
+        self.assertEqual(rtr.read(), (None, None))
+        short = b"\xd3\x00\x01\x3e\x00\x00\x00"  # 1 byte payload
+        rtr = RTCMReader(
+            BytesIO(short + self._raw1005), msgfilter={"1005"}, quitonerror=ERR_RAISE
+        )
+        with self.assertRaisesRegex(RTCMStreamError, "Invalid payload size 1 bytes"):
+            rtr.read()
+        rtr = RTCMReader(BytesIO(short + self._raw1005), msgfilter={"1005"})
+        self.assertEqual(rtr.read()[0], self._raw1005)
+
+    def testcompactstorage(self):  # test values are held in list with shared layout
+        with open(os.path.join(DIRNAME, "pygpsdata-RTCM3.log"), "rb") as stream:
+            data = stream.read()
+        msgs1 = [parsed for _, parsed in RTCMReader(BytesIO(data))]
+        msgs2 = [parsed for _, parsed in RTCMReader(BytesIO(data))]
+        for msg1, msg2 in zip(msgs1, msgs2):
+            self.assertFalse(hasattr(msg1, "__dict__"))
+            self.assertIs(msg1._layout, msg2._layout)
+            self.assertIsNone(msg1._payloadi)
+            self.assertEqual(len(msg1._values), len(msg1._layout))
+        msg = msgs1[2]  # 1077
+        self.assertEqual(msg.DF405_17, msg._values[msg._layout["DF405_17"]])
+        self.assertEqual(getattr(msg, "CELLSIG_17"), "2L")
+        self.assertFalse(hasattr(msg, "DF405_18"))
+        self.assertFalse(hasattr(msg, "__foo__"))
+
+    def testpickle(self):  # test message can be pickled and unpickled
+        with open(os.path.join(DIRNAME, "pygpsdata-RTCM3.log"), "rb") as stream:
+            data = stream.read()
+        for lazy in (False, True):
+            for _, msg in RTCMReader(BytesIO(data), lazy=lazy):
+                msg2 = pickle.loads(pickle.dumps(msg))
+                self.assertEqual(str(msg2), str(msg))
+                with self.assertRaises(RTCMMessageError):
+                    msg2.DF002 = 9999
+
+    def testlayoutcache(self):  # test layout cache size is bounded
+        with open(os.path.join(DIRNAME, "pygpsdata-RTCM3.log"), "rb") as stream:
+            data = stream.read()
+        EXPECTED_RESULTS = [str(parsed) for _, parsed in RTCMReader(BytesIO(data))]
+        cachesize = rtcmplan.LAYOUT_CACHE_SIZE
+        try:
+            rtcmplan.LAYOUT_CACHE_SIZE = 2
+            rtcmplan.RTCM_LAYOUTS.clear()
+            res = [str(parsed) for _, parsed in RTCMReader(BytesIO(data))]
+            self.assertLessEqual(len(rtcmplan.RTCM_LAYOUTS), 2)
+        finally:
+            rtcmplan.LAYOUT_CACHE_SIZE = cachesize
+        self.assertEqual(res, EXPECTED_RESULTS)
+
+    def testfileparser(self):  # test parallel file parser gives same results as RTCMReader
+        path = os.path.join(DIRNAME, "pygpsdata-RTCM3.log")
+        with open(path, "rb") as stream:
+            EXPECTED_RESULTS = [(raw, str(parsed)) for raw, parsed in RTCMReader(stream)]
+        for workers in (0, 1, 2):
+            for chunksize in (1, 500, rtt.DEFAULT_CHUNKSIZE):
+                rfp = RTCMFileParser(path, workers=workers, chunksize=chunksize)
+                res = [(raw, str(parsed)) for raw, parsed in rfp]
+                self.assertEqual(res, EXPECTED_RESULTS)
+        rfp = RTCMFileParser(path, workers=2, chunksize=1)
+        for i, (_, parsed) in enumerate(rfp):  # stop early
+            if i == 2:
+                break
+        self.assertEqual(parsed.identity, "1077")
+        rfp = RTCMFileParser(path, workers=0, msgfilter={"1077", "1087"})
+        self.assertEqual([p.identity for _, p in rfp], ["1077", "1087"])
+        self.assertEqual(
+            [len(chunk) for chunk in RTCMFileParser(path, chunksize=1000).chunks()],
+            [7, 4],
+        )
+
+    def testfileparsererrors(self):  # test parallel file parser error handling
+        path = os.path.join(DIRNAME, "pygpsdata-MIXED-RTCM3BADCRC.log")
+        for workers in (0, 2):
+            errs = []
+            rfp = RTCMFileParser(path, workers=workers, errorhandler=errs.append)
+            self.assertEqual(len(list(rfp)), 6)
+            self.assertEqual(len(errs), 1)
+            self.assertIsInstance(errs[0], RTCMParseError)
+            rfp = RTCMFileParser(path, workers=workers, quitonerror=ERR_IGNORE)
+            self.assertEqual(len(list(rfp)), 6)
+            rfp = RTCMFileParser(path, workers=workers, quitonerror=ERR_RAISE)
+            with self.assertRaisesRegex(RTCMParseError, "failed CRC"):
+                list(rfp)
+        rfp = RTCMFileParser(path, workers=0)
+        with self.assertLogs(level=ERROR) as log:
+            self.assertEqual(len(list(rfp)), 6)
+        self.assertIn("failed CRC", log.output[0])
+        res = parse_chunk([self._raw1005, self._raw1005[:-1] + b"\x00"])
+        self.assertEqual(res[0].identity, "1005")
+        self.assertIsInstance(res[1], RTCMParseError)
+
+    def testmappedreader(self):  # test memory-mapped reader gives same results as RTCMReader
+        for fname in (
+            "pygpsdata-RTCM3.log",
+            "pygpsdata-MIXED-RTCM3.log",
+            "pygpsdata-BADHDR.log",
+            "pygpsdata-NTRIP-4076.log",
+        ):
+            path = os.path.join(DIRNAME, fname)
+            with open(path, "rb") as stream:
+                EXPECTED_RESULTS = [
+                    (raw, str(parsed))
+                    for raw, parsed in RTCMReader(stream, quitonerror=ERR_IGNORE)
+                ]
+            with RTCMMappedReader(path, quitonerror=ERR_IGNORE) as rmr:
+                res = list(rmr)
+            self.assertEqual(
+                [(bytes(raw), str(parsed)) for raw, parsed in res], EXPECTED_RESULTS
+            )
+        # frames and payloads are zero-copy views of the mapped file
+        raw, parsed = res[0]
+        self.assertIsInstance(raw, memoryview)
+        self.assertIsInstance(parsed._payload, memoryview)
+        self.assertIsInstance(parsed.payload, bytes)
+        self.assertEqual(parsed.serialize(), bytes(raw))
+        self.assertEqual(str(eval(repr(parsed))), str(parsed))
+        self.assertEqual(str(pickle.loads(pickle.dumps(parsed))), str(parsed))
+        self.assertEqual(rmr.read(), (None, None))  # closed
+        path = os.path.join(DIRNAME, "pygpsdata-RTCM3.log")
+        rmr = RTCMMappedReader(path, parsed=False, msgfilter={"1077", "1087"})
+        self.assertEqual(
+            [get_identity(raw[3:-3]) for raw, _ in rmr], ["1077", "1087"]
+        )
+        rmr.close()
+        rmr = RTCMMappedReader(path, lazy=True)
+        _, parsed = rmr.read()
+        self.assertEqual(parsed._decoded, DECODED_NONE)
+        self.assertEqual(parsed.DF003, 0)
+        rmr.close()
+        rmr.close()
+
+    def testmappedreadererrors(self):  # test memory-mapped reader error handling
+        path = os.path.join(DIRNAME, "pygpsdata-MIXED-RTCM3BADCRC.log")
+        errs = []
+        with RTCMMappedReader(path, errorhandler=errs.append) as rmr:
+            self.assertEqual(len(list(rmr)), 6)
+        self.assertEqual(len(errs), 1)
+        self.assertIn("failed CRC: b'", str(errs[0]))
+        with RTCMMappedReader(path, quitonerror=ERR_RAISE) as rmr:
+            with self.assertRaisesRegex(RTCMParseError, "failed CRC"):
+                list(rmr)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = os.path.join(tmpdir, "test.log")
+            with open(path, "wb") as stream:  # empty file
+                pass
+            with RTCMMappedReader(path) as rmr:
+                self.assertEqual(list(rmr), [])
+            with open(path, "wb") as stream:  # truncated file
+                stream.write(self._raw1005 + self._raw1005[:-5])
+            with RTCMMappedReader(path, quitonerror=ERR_RAISE) as rmr:
+                self.assertEqual(rmr.read()[1].identity, "1005")
+                with self.assertRaisesRegex(
+                    RTCMStreamError, "Serial stream terminated unexpectedly"
+                ):
+                    rmr.read()
+                self.assertEqual(rmr.read(), (None, None))
+
+    def testasyncreader(self):  # test async reader gives same results as RTCMReader
+        async def readall(data, **kwargs):
+            stream = asyncio.StreamReader()
+            stream.feed_data(data)
+            stream.feed_eof()
+            return [(raw, str(parsed)) async for raw, parsed in AsyncRTCMReader(stream, **kwargs)]
+
+        for fname in (
+            "pygpsdata-RTCM3.log",
+            "pygpsdata-MIXED-RTCM3.log",
+            "pygpsdata-BADHDR.log",
+            "pygpsdata-NTRIP-4076.log",
+        ):
+            with open(os.path.join(DIRNAME, fname), "rb") as stream:
+                data = stream.read()
+            EXPECTED_RESULTS = [
+                (raw, str(parsed))
+                for raw, parsed in RTCMReader(BytesIO(data), quitonerror=ERR_IGNORE)
+            ]
+            for readahead in (0, 16, rtt.DEFAULT_READAHEAD):
+                res = asyncio.run(
+                    readall(data, quitonerror=ERR_IGNORE, readahead=readahead)
+                )
+                self.assertEqual(res, EXPECTED_RESULTS)
+        res = asyncio.run(readall(data, parsed=False, msgfilter={"4076_025"}))
+        self.assertEqual(
+            res, [(raw, "None") for raw, p in EXPECTED_RESULTS if "4076_025" in p]
+        )
+
+        async def readheaders(stream):
+            arr = AsyncRTCMReader(stream, lazy=True)
+            self.assertIs(arr.datastream, stream)
+            return await arr.read_header(), (await arr.read())[1]._decoded
+
+        with open(os.path.join(DIRNAME, "pygpsdata-RTCM3.log"), "rb") as stream:
+            (raw, hdr), decoded = asyncio.run(readheaders(AsyncStream(stream.read())))
+        self.assertEqual(hdr, ("1005", 0, None))
+        self.assertEqual(decoded, DECODED_NONE)
+
+    def testasyncreadererrors(self):  # test async reader error handling
+        async def readall(data, **kwargs):
+            arr = AsyncRTCMReader(AsyncStream(data), **kwargs)
+            return [parsed.identity async for _, parsed in arr]
+
+        with open(os.path.join(DIRNAME, "pygpsdata-MIXED-RTCM3BADCRC.log"), "rb") as stream:
+            data = stream.read()
+        errs = []
+        self.assertEqual(len(asyncio.run(readall(data, errorhandler=errs.append))), 6)
+        self.assertIsInstance(errs[0], RTCMParseError)
+        with self.assertLogs(level=ERROR) as log:
+            self.assertEqual(len(asyncio.run(readall(data))), 6)
+        self.assertIn("failed CRC", log.output[0])
+        with self.assertRaisesRegex(RTCMParseError, "failed CRC"):
+            asyncio.run(readall(data, quitonerror=ERR_RAISE))
+        for data, err in (
+            (self._raw1005 + self._raw1005[:-5], "19 bytes requested, 17 bytes returned"),
+            (self._raw1005 + self._raw1005[:-1], "3 bytes requested, 2 bytes returned"),
+            (b"\xd3\x00\x00\xd3\x00\x01\x3e\x00\x00\x00", "Invalid payload size 0 bytes"),
+            (b"\xd3\x00\x01\x3e\x00\x00\x00", "Invalid payload size 1 bytes"),
+        ):
+            with self.assertRaisesRegex(RTCMStreamError, err):
+                asyncio.run(readall(data, quitonerror=ERR_RAISE, validate=0))
+        with self.assertRaisesRegex(RTCMStreamError, "Invalid payload size 1 bytes"):
+            asyncio.run(
+                readall(
+                    b"\xd3\x00\x01\x3e\x00\x00\x00",
+                    quitonerror=ERR_RAISE,
+                    msgfilter={"1005"},
+                )
+            )
+        for data in (b"\x00\xd3\xd3", b"\x00\xd3", b"\xd3\x00"):
+            self.assertEqual(asyncio.run(readall(data, readahead=0)), [])
+        self.assertEqual(asyncio.run(readall(self._raw1005[:-3], readahead=0)), [])
+        self.assertEqual(
+            asyncio.run(readall(self._raw1005 + b"\xd3", quitonerror=ERR_RAISE)),
+            ["1005"],
+        )
+
+    def testfeed(self):  # test reader with no datastream is fed data
+        with open(os.path.join(DIRNAME, "pygpsdata-MIXED-RTCM3.log"), "rb") as stream:
+            data = stream.read()
+        EXPECTED_RESULTS = [
+            (raw, str(parsed))
+            for raw, parsed in RTCMReader(BytesIO(data), quitonerror=ERR_IGNORE)
+        ]
+        for chunk in (1, 7, 1024):
+            rdr = RTCMReader(None, quitonerror=ERR_IGNORE)
+            self.assertIsNone(rdr.datastream)
+            res = []
+            pos = 0
+            while True:
+                try:
+                    raw, parsed = rdr.read()
+                except BlockingIOError:
+                    self.assertGreater(rdr.needed, 0)
+                    rdr.feed(data[pos : pos + chunk])
+                    pos += chunk
+                    continue
+                if raw is None:
+                    break
+                res.append((raw, str(parsed)))
+            self.assertEqual(res, EXPECTED_RESULTS)
+        rdr = RTCMReader(None)
+        rdr.feed(self._raw1005[:4])
+        with self.assertRaises(BlockingIOError):
+            rdr.read()
+        self.assertEqual(rdr.needed, len(self._raw1005) - 4)
+        rdr.feed(self._raw1005[4:])
+        self.assertEqual(rdr.read()[0], self._raw1005)
+        statistics = RTCMStatistics()
+        rdr = RTCMReader(None, statistics=statistics)
+        rdr.feed(b"\x00\xd3")
+        rdr.feed(b"")  # end of stream
+        self.assertEqual(rdr.read(), (None, None))
+        self.assertEqual(statistics.stats["discarded"], 2)
+        # end of stream after non-RTCM3 data between buffered frames
+        rdr = RTCMReader(None)
+        rdr.feed(self._raw1005 + b"xx" + self._raw1005 + b"yy")
+        rdr.feed(b"")
+        self.assertEqual(rdr.read()[0], self._raw1005)
+        self.assertEqual(rdr.read()[0], self._raw1005)
+        self.assertEqual(rdr.read(), (None, None))
+        with self.assertRaises(BlockingIOError):  # waits for more data
+            rdr.read()
+
+    def testmultireader(self):  # test multi-source reader
+        with open(os.path.join(DIRNAME, "pygpsdata-RTCM3.log"), "rb") as stream:
+            data1 = stream.read()
+        with open(os.path.join(DIRNAME, "pygpsdata-MIXED-RTCM3BADCRC.log"), "rb") as stream:
+            data2 = stream.read()
+        EXPECTED1 = [str(p) for _, p in RTCMReader(BytesIO(data1))]
+        EXPECTED2 = [str(p) for _, p in RTCMReader(BytesIO(data2), quitonerror=ERR_IGNORE)]
+        sock1, peer1 = socket.socketpair()
+        sock2, peer2 = socket.socketpair()
+        errs = []
+        rmr = RTCMMultiReader(
+            timeout=0.1, errorhandler=lambda sid, err: errs.append((sid, err))
+        )
+        self.assertEqual(rmr.add_source(sock1, "s1"), "s1")
+        rmr.add_source(sock2, "s2")
+        stream = BytesIO(data1)
+        self.assertIs(rmr.add_source(stream), stream)
+        with self.assertRaisesRegex(ValueError, "Source s1 already added"):
+            rmr.add_source(sock1, "s1")
+        res = {"s1": [], "s2": [], stream: []}
+        self.assertEqual(list(rmr.sources), ["s1", "s2", stream])
+        peer1.sendall(data1[:1000])  # partial data, then timeout
+        peer2.sendall(data2[:500])
+        for sid, _, parsed in rmr:
+            res[sid].append(str(parsed))
+        self.assertEqual(res[stream], EXPECTED1)
+        self.assertEqual(len(res["s1"]), 5)
+        self.assertEqual(len(res["s2"]), 2)
+        peer1.sendall(data1[1000:])
+        peer2.sendall(data2[500:])
+        peer1.close()
+        peer2.close()
+        for sid, _, parsed in rmr:
+            res[sid].append(str(parsed))
+        self.assertEqual(res["s1"], EXPECTED1)
+        self.assertEqual(res["s2"], EXPECTED2)
+        self.assertEqual(
+            rmr.stats,
+            {
+                "s1": {"messages": 11, "errors": 0, "eof": True},
+                "s2": {"messages": 6, "errors": 1, "eof": True},
+                stream: {"messages": 11, "errors": 0, "eof": True},
+            },
+        )
+        self.assertEqual(errs[0][0], "s2")
+        self.assertIsInstance(errs[0][1], RTCMParseError)
+        self.assertEqual(rmr.read(), (None, None, None))
+        sock1.close()
+        sock2.close()
+
+    def testmultireadererrors(self):  # test multi-source reader error handling
+        with open(os.path.join(DIRNAME, "pygpsdata-MIXED-RTCM3BADCRC.log"), "rb") as stream:
+            data = stream.read()
+        rmr = RTCMMultiReader(quitonerror=ERR_RAISE)
+        rmr.add_source(BytesIO(data), "f1")
+        with self.assertRaisesRegex(RTCMParseError, "failed CRC"):
+            list(rmr)
+        self.assertEqual(len(list(rmr)), 6)  # continues after error
+        self.assertEqual(rmr.stats["f1"], {"messages": 6, "errors": 1, "eof": True})
+        rmr = RTCMMultiReader(quitonerror=ERR_IGNORE)
+        rmr.add_source(BytesIO(data), "f1")
+        self.assertEqual(len(list(rmr)), 6)
+        self.assertEqual(rmr.stats["f1"]["errors"], 1)
+        rmr = RTCMMultiReader()
+        rmr.add_source(BytesIO(data), "f1")
+        with self.assertLogs(level=ERROR) as log:
+            self.assertEqual(len(list(rmr)), 6)
+        self.assertIn("f1: RTCM3 message invalid - failed CRC", log.output[0])
+        sock, peer = socket.socketpair()
+        rmr = RTCMMultiReader(timeout=0)
+        rmr.add_source(sock, "s1")
+        rmr.add_source(BytesIO(data), "f1")
+        rmr.remove_source("f1")
+        rmr.remove_source("s1")
+        self.assertEqual(rmr.read(), (None, None, None))
+        self.assertEqual(rmr.stats, {})
+        with self.assertRaises(KeyError):
+            rmr.remove_source("s1")
+        sock.close()
+        peer.close()
+
+        class NoDataStream:  # non-blocking stream with no data available
+            def read(self, n):
+                return None
+
+        src = RTCMSource("x", NoDataStream())
+        with self.assertRaises(BlockingIOError):
+            src.read(10)
+        src.readable = False
+        with self.assertRaises(BlockingIOError):
+            src.read1(10)
+
+    def testmultireaderpipe(self):  # test multi-source reader doesn't block on pipes
+        class PipeStream:  # blocking stream which waits for n bytes, like pyserial
+            def __init__(self, fd):
+                self._fd = fd
+
+            def fileno(self):
+                return self._fd
+
+            def read(self, n):
+                data = b""
+                while len(data) < n:
+                    chunk = os.read(self._fd, n - len(data))
+                    if not chunk:
+                        break
+                    data += chunk
+                return data
+
+        class SerialStream(PipeStream):  # stream with in_waiting property
+            @property
+            def in_waiting(self):
+                return 1 if select.select([self._fd], [], [], 0)[0] else 0
+
+        class SocketStream(PipeStream):  # stream with in_waiting() method
+            def in_waiting(self):
+                return 1 if select.select([self._fd], [], [], 0)[0] else 0
+
+        with open(os.path.join(DIRNAME, "pygpsdata-RTCM3.log"), "rb") as stream:
+            data = stream.read()
+        EXPECTED = [str(p) for _, p in RTCMReader(BytesIO(data))]
+        for cls in (PipeStream, SerialStream, SocketStream):
+            rfd, wfd = os.pipe()
+            rmr = RTCMMultiReader(timeout=0.1)
+            rmr.add_source(cls(rfd), "p1")
+            os.write(wfd, data[:1000])  # partial data, pipe held open
+            res = [str(parsed) for _, _, parsed in rmr]
+            self.assertEqual(len(res), 5)
+            os.write(wfd, data[1000:])
+            os.close(wfd)
+            res += [str(parsed) for _, _, parsed in rmr]
+            self.assertEqual(res, EXPECTED)
+            self.assertEqual(
+                rmr.stats["p1"], {"messages": 11, "errors": 0, "eof": True}
+            )
+            os.close(rfd)
+
+    def testencoderoundtrip(self):  # test re-encoding of all known messages in logs
+        count = 0
+        for fname in os.listdir(DIRNAME):
+            if fname[-4:] != ".log":
+                continue
+            with open(os.path.join(DIRNAME, fname), "rb") as stream:
+                for _, parsed in RTCMReader(stream, quitonerror=ERR_IGNORE):
+                    if parsed._unknown:
+                        continue
+                    payload = encode_payload(parsed.identity, template=parsed)
+                    # any trailing data not covered by the definition is ignored
+                    self.assertEqual(payload, parsed.payload[: len(payload)])
+                    self.assertEqual(str(RTCMMessage(payload=payload)), str(parsed))
+                    count += 1
+        self.assertEqual(count, 150)
+
+    def testframes(self):  # test raw frame generator
+        path = os.path.join(DIRNAME, "pygpsdata-MIXED-RTCM3.log")
+        with open(path, "rb") as stream:
+            EXPECTED_RESULTS = [raw for raw, _ in RTCMReader(stream)]
+        with open(path, "rb") as stream:
+            self.assertEqual(list(RTCMReader(stream).frames()), EXPECTED_RESULTS)
+        with open(path, "rb") as stream:
+            rtr = RTCMReader(stream, msgfilter={"1077", "1087"})
+            self.assertEqual(list(rtr.frames()), EXPECTED_RESULTS[2:4])
+        with RTCMMappedReader(path) as rmr:
+            frames = list(rmr.frames())
+            self.assertIsInstance(frames[0], memoryview)
+            self.assertEqual([bytes(f) for f in frames], EXPECTED_RESULTS)
+            del frames
+        path = os.path.join(DIRNAME, "pygpsdata-MIXED-RTCM3BADCRC.log")
+        with open(path, "rb") as stream:
+            errs = []
+            rtr = RTCMReader(stream, errorhandler=errs.append)
+            self.assertEqual(len(list(rtr.frames())), 6)
+            self.assertIn("failed CRC", str(errs[0]))
+        with open(path, "rb") as stream:
+            self.assertEqual(len(list(RTCMReader(stream, validate=0).frames())), 7)
+        with open(path, "rb") as stream:
+            rtr = RTCMReader(stream, quitonerror=ERR_RAISE)
+            with self.assertRaisesRegex(RTCMParseError, "failed CRC"):
+                list(rtr.frames())
+        with open(path, "rb") as stream:  # filtered out before CRC check
+            rtr = RTCMReader(stream, quitonerror=ERR_RAISE, msgfilter={"1077"})
+            self.assertEqual(len(list(rtr.frames())), 1)
+        stream = BytesIO(b"\xd3\x00\x01\x3e\x00\x00\x00" + self._raw1005)
+        rtr = RTCMReader(stream, validate=0, msgfilter={"1005"})
+        with self.assertLogs(level=ERROR) as log:
+            self.assertEqual(list(rtr.frames()), [self._raw1005])
+        self.assertIn("Invalid payload size 1 bytes", log.output[0])
+        stream = BytesIO(b"\xd3\x00\x00" + self._raw1005)
+        rtr = RTCMReader(stream, quitonerror=ERR_IGNORE)
+        self.assertEqual(list(rtr.frames()), [self._raw1005])
+
+    def testfields(self):  # test only selected fields are decoded
+        with open(os.path.join(DIRNAME, "pygpsdata-RTCM3.log"), "rb") as stream:
+            data = stream.read()
+        data += RTCMMessage(
+            payload=encode_payload("1004", DF006=2, DF011_02=1.5, DF012_02=-3)
+        ).serialize()
+        FIELDS = {"DF004", "DF011", "DF025", "DF405", "DF406", "DF424"}
+        STRUCTURAL = ("DF002", "DF006", "DF029", "DF379", "DF387", "DF422")
+        STRUCTURAL += ("DF394", "DF395", "DF396", "NSat", "NSig", "NCell")
+        full = [parsed for _, parsed in RTCMReader(BytesIO(data))]
+        for lazy in (False, True):
+            msgs = [
+                parsed
+                for _, parsed in RTCMReader(BytesIO(data), fields=FIELDS, lazy=lazy)
+            ]
+            self.assertEqual(len(msgs), len(full))
+            for msg, fmsg in zip(msgs, full):
+                self.assertEqual(msg.payload, fmsg.payload)
+                wanted = [
+                    att for att in fmsg._layout if att.split("_")[0] in FIELDS
+                ]
+                for att in wanted:
+                    self.assertEqual(getattr(msg, att), getattr(fmsg, att))
+                str(msg)  # complete any deferred decoding
+                for att in msg._layout:  # wanted or structural attributes only
+                    self.assertTrue(att in wanted or att[:5] in STRUCTURAL)
+        msg = msgs[2]  # 1077
+        self.assertEqual(msg.DF004, 204137001)
+        self.assertEqual(msg.NCell, 17)
+        with self.assertRaisesRegex(AttributeError, "has no attribute 'DF003'"):
+            msg.DF003
+        with self.assertRaisesRegex(AttributeError, "has no attribute 'DF407_01'"):
+            msg.DF407_01
+        self.assertEqual(msgs[-1].DF011_02, 1.5)
+        self.assertFalse(hasattr(msgs[-1], "DF012_02"))
+        msg = RTCMReader.parse(self._raw1005, fields=["DF025"])
+        self.assertEqual(str(msg), "<RTCM(1005, DF025=4444030.802800001)>")
+        msg = pickle.loads(pickle.dumps(msg))
+        self.assertAlmostEqual(msg.DF025, 4444030.8028, 4)
+
+    def testrinexwriter(self):  # test RINEX observation writer
+        out = StringIO()
+        with open(os.path.join(DIRNAME, "pygpsdata-RTCM3.log"), "rb") as stream:
+            with RINEXObsWriter(out, date=datetime(2024, 1, 1)) as rnx:
+                for _, msg in RTCMReader(stream):
+                    rnx.write(msg)
+        self.assertEqual(rnx.epochs, 1)
+        self.assertEqual(rnx.dropped, 39)  # QZSS not in header
+        lines = out.getvalue().splitlines()
+        self.assertEqual(
+            lines[0],
+            "     3.04           OBSERVATION DATA    M                   RINEX VERSION / TYPE",
+        )
+        self.assertEqual(
+            lines[6][:42], "  4444030.8028  3085671.2349  3366658.2560"
+        )
+        self.assertEqual(
+            lines[8],
+            "G    8 C1C L1C D1C S1C C2L L2L D2L S2L                      SYS / # / OBS TYPES",
+        )
+        self.assertEqual(
+            lines[13],
+            "  2024     1     2     8    42   17.0010000     GPS         TIME OF FIRST OBS",
+        )
+        self.assertEqual(
+            lines[18],
+            "  7 R03  5 R04  6 R05  1 R13 -2 R14 -7 R15  0 R23  3        GLONASS SLOT / FRQ #",
+        )
+        self.assertEqual(lines[20][60:], "END OF HEADER")
+        self.assertEqual(lines[21], "> 2024 01 02 08 42 17.0010000  0 32")
+        self.assertEqual(
+            lines[22][:67],
+            "G05  22486233.844   118165954.582 7       940.247          45.000  ",
+        )
+        self.assertEqual(len(lines), 54)
+
+    def testrinexwriteroptions(self):  # test RINEX writer with specified obs types
+        out = StringIO()
+        obstypes = {"G": ["C1C", "L1C"], "R": ["C1C", "L1C", "D1C"]}
+        tz = timezone(timedelta(hours=-5))
+        with open(
+            os.path.join(DIRNAME, "pygpsdata-NTRIP-USCL00CHL0.log"), "rb"
+        ) as stream:
+            rnx = RINEXObsWriter(
+                out,
+                version="4.01",
+                date=datetime(2023, 12, 31, 19, tzinfo=tz),
+                marker="USCL00CHL0",
+                observer="pyrtcm",
+                agency="semuadmin",
+                obstypes=obstypes,
+            )
+            for _, msg in RTCMReader(stream):
+                rnx.write(msg)
+            rnx.flush()
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[0][:20], "     4.01           ")
+        self.assertEqual(lines[2][:10], "USCL00CHL0")
+        self.assertEqual(lines[3][:29], "pyrtcm              semuadmin")
+        self.assertEqual(lines[7][:14], "        0.0343")  # 1006 height
+        self.assertEqual(
+            lines[8],
+            "G    2 C1C L1C                                              SYS / # / OBS TYPES",
+        )
+        self.assertEqual(lines[9][:18], "R    3 C1C L1C D1C")
+        self.assertEqual(lines[14][:15], "  8 R01  1 R07 ")
+        self.assertEqual(lines[17], "> 2024 01 03 16 35 45.0000000  0 18")
+        self.assertEqual(lines[18], "G01  20667626.122   108609052.784 8")
+        self.assertEqual(rnx.epochs, 1)
+        self.assertTrue(rnx.dropped > 0)
+        self.assertEqual(lines[-1], "R24  22588313.598   120789896.475 7      3412.741")
+        rnx.flush()  # nothing to write
+        self.assertEqual(rnx.epochs, 1)
+
+    def testrinexwriterepochs(self):  # test RINEX writer epoch and lock handling
+        def msm(identity, **kwargs):
+            return RTCMMessage(payload=encode_payload(identity, **kwargs))
+
+        out = StringIO()
+        rnx = RINEXObsWriter(out, date=datetime(2024, 1, 7, 0, 30))
+        masks = {"DF395": 1 << 30, "DF397_01": 70, "DF408_01": 40}
+        # end of previous GPS week, GIOVE-A and invalid rough range
+        rnx.write(
+            msm(
+                "1097",
+                DF248=604799000,
+                DF394=(1 << 62) | (1 << 63) | (1 << 13),
+                DF396=0b111,
+                DF407_01=10,
+                **{**masks, "DF397_02": 255},
+            )
+        )
+        # start of current GPS week, lock time decreased
+        rnx.write(msm("1097", DF248=1000, DF394=1 << 63, DF396=1, DF407_01=5, **masks))
+        # GLONASS day of week unknown, system not in header
+        rnx.write(msm("1087", DF416=7, DF034=10784000, DF394=1 << 63, DF396=1, **masks))
+        self.assertEqual(rnx.epochs, 2)
+        self.assertEqual(rnx.dropped, 4)
+        self.assertEqual(rnx._assembler.pending, 0)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(lines[8][:22], "E    4 C1C L1C D1C S1C")
+        self.assertEqual(lines[13], "> 2024 01 06 23 59 59.0000000  0  2")
+        self.assertEqual(
+            lines[14],
+            "E01  20985472.060   110279400.000 6        -0.000          40.000",
+        )
+        self.assertEqual(lines[15], "E02                                        -0.000")
+        self.assertEqual(lines[16], "> 2024 01 07 00 00  1.0000000  0  1")
+        self.assertEqual(lines[17][33:35], "16")  # LLI loss of lock
+        rnx = RINEXObsWriter(out)  # reference time now
+        self.assertTrue(rnx._ref > 1400000000000)
+
+    def testepochassembler(self):  # test MSM epoch assembly from stream
+        asm = RTCMEpochAssembler()
+        with open(os.path.join(DIRNAME, "pygpsdata-RTCM3.log"), "rb") as stream:
+            epochs = list(asm.assemble(RTCMReader(stream, lazy=True)))
+        self.assertEqual(
+            str(epochs),
+            "[MSMEpoch(station=0, tow=204137001, messages=['1077', '1087', '1097', '1127'], complete=True), "
+            "MSMEpoch(station=0, tow=385820000, messages=['1117'], complete=False)]",
+        )
+        self.assertEqual((asm.epochs, asm.incomplete, asm.pending), (1, 1, 0))
+        asm = RTCMEpochAssembler()
+        with open(
+            os.path.join(DIRNAME, "pygpsdata-NTRIP-USCL00CHL0.log"), "rb"
+        ) as stream:
+            epochs = list(asm.assemble(RTCMReader(stream)))
+        self.assertEqual(len(epochs), 1)
+        self.assertEqual(epochs[0].tow, 318945000)
+        self.assertEqual(len(epochs[0].messages), 14)
+        self.assertTrue(epochs[0].complete)
+
+    def testepochassemblerwindow(self):  # test incomplete MSM epoch handling
+        def msm(identity, more=1, station=0, **kwargs):
+            kwargs = {"DF393": more, "DF003": station, "DF394": 1 << 63, **kwargs}
+            kwargs = {"DF395": 1 << 30, "DF396": 1, **kwargs}
+            return RTCMMessage(payload=encode_payload(identity, **kwargs))
+
+        asm = RTCMEpochAssembler(window=2000)
+        self.assertEqual(asm.add(RTCMReader.parse(self._raw1005)), ())
+        self.assertEqual(asm.add(msm("1077", DF004=604799000)), ())
+        self.assertEqual(asm.add(msm("1077", station=1, DF004=604799000)), ())
+        self.assertEqual(asm.add(msm("1127", DF427=604785000)), ())  # BeiDou
+        self.assertEqual(asm.pending, 2)
+        # GLONASS day unknown, after midnight
+        self.assertEqual(asm.add(msm("1087", DF416=7, DF034=10782000)), ())
+        self.assertEqual(asm.add(msm("1097", DF248=0)), ())  # week rollover
+        # GLONASS day unknown, before midnight
+        ready = asm.add(msm("1087", more=0, DF416=7, DF034=10781000))
+        self.assertEqual(
+            [(e.station, e.tow, len(e.messages), e.complete) for e in ready],
+            [(0, 604799000, 3, True)],
+        )
+        self.assertEqual(asm.pending, 2)
+        ready = asm.add(msm("1097", DF248=1000))  # window exceeded
+        self.assertEqual(
+            [(e.station, e.tow, e.complete) for e in ready], [(1, 604799000, False)]
+        )
+        ready = asm.add(msm("1107", DF004=2000))  # SBAS, window exceeded
+        self.assertEqual(
+            [(e.tow, len(e.messages), e.complete) for e in ready], [(0, 2, False)]
+        )
+        ready = asm.add(msm("1077", more=0, DF004=2000))  # later epoch completes
+        self.assertEqual(
+            [(e.tow, e.complete) for e in ready], [(1000, False), (2000, True)]
+        )
+        self.assertEqual(
+            [msg.identity for msg in ready[1].messages], ["1107", "1077"]
+        )
+        self.assertEqual(asm.add(msm("1137", DF546=3000)), ())  # NavIC
+        self.assertEqual([e.tow for e in asm.flush()], [3000])
+        self.assertEqual(asm.flush(), ())
+        self.assertEqual((asm.epochs, asm.incomplete, asm.pending), (2, 4, 0))
+        epochs = list(asm.assemble([(b"", None), (b"", msm("1077", more=0, DF004=0))]))
+        self.assertEqual(epochs[0].tow, 0)
+
+    def testepochassemblerstations(self):  # test interleaved epochs from two stations
+        def msm(identity, more=1, station=0, **kwargs):
+            kwargs = {"DF393": more, "DF003": station, "DF394": 1 << 63, **kwargs}
+            kwargs = {"DF395": 1 << 30, "DF396": 1, **kwargs}
+            return RTCMMessage(payload=encode_payload(identity, **kwargs))
+
+        asm = RTCMEpochAssembler(window=5000)
+        self.assertEqual(asm.add(msm("1077", station=1, DF004=14000)), ())
+        ready = asm.add(msm("1077", more=0, station=2, DF004=14000))
+        self.assertEqual(
+            [(e.station, e.tow, e.complete) for e in ready], [(2, 14000, True)]
+        )
+        self.assertEqual(asm.pending, 1)
+        ready = asm.add(msm("1127", more=0, station=1, DF427=0))
+        self.assertEqual(
+            [(e.station, e.tow, len(e.messages), e.complete) for e in ready],
+            [(1, 14000, 2, True)],
+        )
+        # earlier epoch from same station is still expired on completion
+        self.assertEqual(asm.add(msm("1077", station=1, DF004=16000)), ())
+        self.assertEqual(asm.add(msm("1077", station=2, DF004=16000)), ())
+        ready = asm.add(msm("1077", more=0, station=1, DF004=17000))
+        self.assertEqual(
+            [(e.station, e.tow, e.complete) for e in ready],
+            [(1, 16000, False), (1, 17000, True)],
+        )
+        self.assertEqual((asm.epochs, asm.incomplete, asm.pending), (3, 1, 1))
+
+    def testepochassemblermanystations(self):  # test many interleaved stations
+        def msm(more, station, tow):
+            return RTCMMessage(
+                payload=encode_payload(
+                    "1077",
+                    DF393=more,
+                    DF003=station,
+                    DF004=tow,
+                    DF394=1 << 63,
+                    DF395=1 << 30,
+                    DF396=1,
+                )
+            )
+
+        stations = range(1, 51)
+        asm = RTCMEpochAssembler(window=60000)
+        for tow in (1000, 2000):
+            for stn in stations:
+                self.assertEqual(asm.add(msm(1, stn, tow)), ())
+        self.assertEqual(asm.pending, 100)
+        # odd stations complete 2nd epoch, even stations complete 1st epoch
+        for stn in reversed(stations):
+            ready = asm.add(msm(0, stn, 2000 if stn % 2 else 1000))
+            self.assertEqual(
+                [(e.station, e.tow, e.complete) for e in ready],
+                (
+                    [(stn, 1000, False), (stn, 2000, True)]
+                    if stn % 2
+                    else [(stn, 1000, True)]
+                ),
+            )
+        self.assertEqual((asm.epochs, asm.incomplete, asm.pending), (50, 25, 25))
+        self.assertEqual(
+            [(e.station, e.tow, e.complete) for e in asm.flush()],
+            [(stn, 2000, False) for stn in stations if not stn % 2],
+        )
+        self.assertEqual((asm.epochs, asm.incomplete, asm.pending), (50, 50, 0))
+
+    def testephemerisstore(self):  # test ephemeris store indexing and lookup
+        def eph(identity, **kwargs):
+            return RTCMMessage(payload=encode_payload(identity, **kwargs))
+
+        store = RTCMEphemerisStore()
+        with open(
+            os.path.join(DIRNAME, "pygpsdata-NTRIP-USCL00CHL0.log"), "rb"
+        ) as stream:
+            msgs = [msg for _, msg in RTCMReader(stream)]
+        self.assertEqual(sum(store.add(msg) for msg in msgs), 5)
+        self.assertEqual(sum(store.add(msg) for msg in msgs), 0)
+        self.assertEqual((len(store), store.duplicates), (5, 5))
+        self.assertEqual(
+            store.keys,
+            [
+                ("1019", 2, 185, 1394388000),
+                ("1020", 9, 79, 1394383518),
+                ("1042", 12, 3, 1394380814),
+                ("1045", 3, 22, 1394382000),
+                ("1046", 5, 22, 1394382000),
+            ],
+        )
+        self.assertTrue(("1019", 2, 185, 1394388000) in store)
+        gps = store.get("GPS", 2, 1394388000 + 7200)
+        self.assertEqual(gps.identity, "1019")
+        self.assertIsNone(store.get("GPS", 2, 1394388000 + 7201))
+        self.assertIs(store.get("1019", 2, 1394388000 - 7201, maxdiff=7201), gps)
+        self.assertIsNone(store.get("GPS", 3, 1394388000))
+        self.assertEqual(store.get("GLONASS", 9, 1394383518 - 1800).DF038, 9)
+        self.assertEqual(store.get("BEIDOU", 12, 1394380814).DF488, 12)
+        self.assertEqual(store.get("GALILEO", 3, 1394382000).identity, "1045")
+        self.assertEqual(store.get("GALILEO", 5, 1394382000).identity, "1046")
+        self.assertIsNone(store.get("NAVIC", 5, 1394382000))
+
+        # nearest toe, updated ephemeris with same key
+        gps = {"DF009": 2, "DF076": 257}
+        store.add(eph("1019", DF071=184, DF093=316800, **gps))
+        store.add(eph("1019", DF071=186, DF093=331200, **gps))
+        self.assertEqual(store.get("GPS", 2, 1394388000 + 3599).DF071, 185)
+        self.assertEqual(store.get("GPS", 2, 1394388000 + 3601).DF071, 186)
+        self.assertEqual(store.get("GPS", 2, 1394388000 - 3601).DF071, 184)
+        self.assertTrue(store.add(eph("1019", DF071=186, DF093=331200, DF137=1, **gps)))
+        self.assertEqual(store.get("GPS", 2, 1394395200).DF137, 1)
+        self.assertEqual(len(store), 7)
+        self.assertTrue(store.add(eph("1044", DF429=1, DF434=5, DF442=324000, DF452=257)))
+        self.assertEqual(store.keys[-1], ("1044", 1, 5, 1394388000))
+
+        # eviction
+        self.assertEqual(store.evict(1394382000), 2)  # 1042, 1019 IODE 184
+        self.assertEqual(store.evict(1394382000), 0)
+        self.assertEqual(len(store), 6)
+        store = RTCMEphemerisStore(maxage=7200)
+        for toe in (300000, 309600, 316800, 324000):
+            store.add(eph("1019", DF071=toe // 3600, DF093=toe, **gps))
+        self.assertEqual([key[2] for key in store.keys], [88, 90])
+
+        # GLONASS without date resolved to day of latest toe
+        store = RTCMEphemerisStore()
+        glo = {"DF038": 9, "DF131": 0}
+        self.assertFalse(store.add(eph("1020", DF110=79, **glo)))
+        self.assertFalse(store.add(RTCMReader.parse(self._raw1005)))
+        store.add(eph("1019", DF071=1, DF093=345600, **gps))  # Thursday 00:00
+        store.add(eph("1020", DF110=95, **glo))  # Wednesday 23:45 UTC(SU)
+        store.add(eph("1020", DF110=12, **glo))  # Thursday 03:00 UTC(SU)
+        store.add(eph("1020", DF110=8, **glo))  # Thursday 02:00 UTC(SU)
+        store.add(eph("1019", DF071=2, DF093=428400, **gps))  # Thursday 23:00
+        store.add(eph("1020", DF110=12, **glo))  # Friday 03:00 UTC(SU)
+        self.assertEqual(
+            [key[3] - 1394409600 for key in store.keys],
+            [0, -11682, 18, -3582, 82800, 86418],
+        )
+
+    def testmessagecache(self):  # test repeated static messages are parsed once
+        with open(os.path.join(DIRNAME, "pygpsdata-RTCM3.log"), "rb") as stream:
+            data = stream.read() * 3
+        EXPECTED_RESULTS = [str(parsed) for _, parsed in RTCMReader(BytesIO(data))]
+        cache = RTCMMessageCache()
+        msgs = [parsed for _, parsed in RTCMReader(BytesIO(data), cache=cache)]
+        self.assertEqual([str(msg) for msg in msgs], EXPECTED_RESULTS)
+        num = len(msgs) // 3
+        for i in range(num):  # only cached identities return the same object
+            self.assertEqual(
+                msgs[i] is msgs[i + num] is msgs[i + 2 * num],
+                msgs[i].identity in DEFAULT_CACHE_IDENTITIES,
+            )
+        self.assertEqual(len(cache), 3)
+        self.assertEqual(
+            cache.stats,
+            {
+                "hits": 6,
+                "misses": 3,
+                "evictions": 0,
+                "size": 3,
+                "maxsize": 256,
+                "identities": {
+                    "1005": {"hits": 2, "misses": 1},
+                    "1007": {"hits": 2, "misses": 1},
+                    "1230": {"hits": 2, "misses": 1},
+                },
+            },
+        )
+        # arguments which change the parsed message are part of the key
+        msg = cache.parse(self._raw1005, fields=["DF025"])
+        self.assertEqual(str(msg), "<RTCM(1005, DF025=4444030.802800001)>")
+        self.assertIs(cache.parse(self._raw1005, fields={"DF025"}), msg)
+        self.assertIsNot(cache.parse(self._raw1005, labelmsm=2), msgs[0])
+        self.assertEqual(len(cache), 5)
+        # invalid messages are never cached
+        badraw = self._raw1005[:-1] + b"\x00"
+        for _ in range(2):
+            with self.assertRaisesRegex(RTCMParseError, "RTCM3 message invalid - failed CRC"):
+                cache.parse(badraw)
+        self.assertIsNot(cache.parse(badraw, validate=0), msgs[0])
+        self.assertEqual(len(cache), 6)
+        cache.clear()
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.stats["hits"], 0)
+        # least recently used message evicted
+        cache = RTCMMessageCache(maxsize=2, identities={"1005", "1007", "1077"})
+        for _, parsed in RTCMReader(BytesIO(data), cache=cache):
+            pass
+        stats = cache.stats
+        self.assertEqual((stats["hits"], stats["misses"]), (0, 9))
+        self.assertEqual((stats["evictions"], stats["size"]), (7, 2))
+        # cache shared between mapped, async and multi readers
+        cache = RTCMMessageCache()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "cache.log")
+            with open(fname, "wb") as stream:
+                stream.write(data)
+            with RTCMMappedReader(fname, cache=cache) as rmr:
+                mapped = [parsed for _, parsed in rmr]
+        self.assertEqual([str(msg) for msg in mapped], EXPECTED_RESULTS)
+        self.assertEqual(mapped[0].payload, msgs[0].payload)
+        self.assertIsInstance(mapped[0]._payload, bytes)  # not a view of the file
+
+        async def readall():
+            arr = AsyncRTCMReader(AsyncStream(data), cache=cache)
+            return [parsed async for _, parsed in arr]
+
+        self.assertIs(asyncio.run(readall())[num], mapped[0])
+        rmr = RTCMMultiReader(cache=cache)
+        rmr.add_source(BytesIO(data), "s1")
+        self.assertIs([parsed for _, _, parsed in rmr][0], mapped[0])
+        self.assertEqual((cache.stats["hits"], cache.stats["misses"]), (24, 3))
+
+    def teststatistics(self):  # test stream statistics collector
+        def frame(payload):
+            msg = b"\xd3" + len(payload).to_bytes(2, "big") + payload
+            return msg + crc2bytes(msg)
+
+        raw4000 = frame(b"\xfa\x00\x01")  # unknown type
+        badcrc = self._raw1005[:-1] + b"\x00"
+        data = (
+            b"junk"
+            + self._raw1005
+            + b"\xd3\xff"  # invalid header
+            + raw4000
+            + badcrc
+            + b"\xd3\x00\x00"  # zero length
+            + frame(b"\x3e")  # too short to contain identity
+            + self._raw1005
+            + raw4000
+            + b"xyz"
+        )
+        statistics = RTCMStatistics(clock=iter(range(1000)).__next__)
+        msgs = [
+            parsed.identity
+            for _, parsed in RTCMReader(
+                BytesIO(data), quitonerror=ERR_IGNORE, statistics=statistics
+            )
+        ]
+        self.assertEqual(msgs, ["1005", "4000", "1005", "4000"])
+        self.assertEqual(
+            statistics.stats,
+            {
+                "frames": 5,
+                "bytes": 93,
+                "crc_failures": 1,
+                "errors": 2,
+                "discarded": 12,
+                "unknown": 2,
+                "types": {
+                    "1005": {
+                        "frames": 3,
+                        "bytes": 75,
+                        "unknown": False,
+                        "decoded": 2,
+                        "decode_time": 2,
+                        "decode_mean": 1.0,
+                        "gaps": 2,
+                        "gap_mean": 3.0,
+                        "gap_max": 4,
+                    },
+                    "4000": {
+                        "frames": 2,
+                        "bytes": 18,
+                        "unknown": True,
+                        "decoded": 2,
+                        "decode_time": 2,
+                        "decode_mean": 1.0,
+                        "gaps": 1,
+                        "gap_mean": 6.0,
+                        "gap_max": 6,
+                    },
+                },
+            },
+        )
+        statistics.reset()
+        self.assertEqual(statistics.stats["frames"], 0)
+        # frames are not decoded if only raw data or headers are returned
+        rdr = RTCMReader(
+            BytesIO(data), quitonerror=ERR_IGNORE, statistics=statistics
+        )
+        self.assertEqual(len(list(rdr.frames())), 4)
+        stats = statistics.stats
+        self.assertEqual((stats["frames"], stats["crc_failures"]), (5, 1))
+        self.assertEqual(stats["types"]["1005"]["decoded"], 0)
+        statistics.reset()
+        rdr = RTCMReader(
+            BytesIO(self._raw1005 * 2), parsed=False, statistics=statistics
+        )
+        self.assertEqual(rdr.read_header()[1], ("1005", 0, None))
+        self.assertIsNone(rdr.read()[1])
+        self.assertEqual(statistics.stats["types"]["1005"]["decoded"], 1)
+        # truncated frame
+        statistics.reset()
+        rdr = RTCMReader(BytesIO(self._raw1005[:-5]), statistics=statistics)
+        self.assertEqual(rdr.read(), (None, None))
+        self.assertEqual(statistics.stats["discarded"], 20)
+        # collector shared between mapped and multi readers
+        statistics.reset()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            fname = os.path.join(tmpdir, "statistics.log")
+            with open(fname, "wb") as stream:
+                stream.write(data)
+            with RTCMMappedReader(
+                fname, quitonerror=ERR_IGNORE, statistics=statistics
+            ) as rmr:
+                self.assertEqual(len(list(rmr)), 4)
+        rmr = RTCMMultiReader(quitonerror=ERR_IGNORE, statistics=statistics)
+        rmr.add_source(BytesIO(data), "s1")
+        self.assertEqual(len(list(rmr)), 4)
+        stats = statistics.stats
+        self.assertEqual((stats["frames"], stats["crc_failures"]), (10, 2))
+        self.assertEqual((stats["errors"], stats["discarded"]), (4, 24))
+        # async reader records the same statistics as RTCMReader
+        statistics.reset()
+
+        async def readall(readahead):
+            arr = AsyncRTCMReader(
+                AsyncStream(data),
+                quitonerror=ERR_IGNORE,
+                readahead=readahead,
+                statistics=statistics,
+            )
+            return [parsed.identity async for _, parsed in arr]
+
+        for readahead in (0, 1024):
+            self.assertEqual(asyncio.run(readall(readahead)), msgs)
+        stats = statistics.stats
+        self.assertEqual((stats["frames"], stats["crc_failures"]), (10, 2))
+        self.assertEqual((stats["errors"], stats["discarded"]), (4, 24))
+
 
 if __name__ == "__main__":
     # import sys;sys.argv = ['', 'Test.testName']